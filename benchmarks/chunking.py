@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from qdrant_client import AsyncQdrantClient, models
+from src.chat_pdf_api_service.helpers import estimate_tokens
+from src.chat_pdf_api_service.helpers.chunking import CHUNKING_STRATEGIES, chunking_config
+from src.chat_pdf_api_service.helpers.extraction import mapped_pdf, parse_pdf_pages
+from src.chat_pdf_api_service.helpers.splitter import split_doc
+from src.chat_pdf_api_service.services.qdrant import CollectionConfig, provision_collection, search_params, tenant_filter
+from .fixtures import write_pdf
+
+
+"""
+Compares chunking strategies on a fixed PDF corpus.
+
+For every strategy (at its default size and overlap, or at the sizes given with
+`--sizes`), the pages of the corpus are parsed once and then chunked, which
+reports chunks/sec, chunks per page and the estimated tokens sent to the
+embedding API. The chunks are then upserted with deterministic fake vectors
+into a collection provisioned like the app's, one tenant per document, and
+queried with `tenant_filter` to measure downstream retrieval latency, which
+grows with the number of points per document.
+
+The corpus is either the PDFs given with `--pdf` or synthetic ones from
+`fixtures.write_pdf`, so runs are comparable.
+
+Usage:
+    python -m benchmarks.chunking --documents 4 --pages 50
+    python -m benchmarks.chunking --pdf a.pdf b.pdf --strategies recursive page --sizes 500 1000 2000
+    python -m benchmarks.chunking --url http://localhost:6333
+"""
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def fake_vector(text: str, dim: int) -> list[float]:
+    rng = random.Random(hashlib.sha256(text.encode()).digest())
+    return [rng.random() for _ in range(dim)]
+
+
+def load_corpus(paths: list[str]) -> list[list]:
+    corpus = []
+    for path in paths:
+        with mapped_pdf(path) as stream:
+            corpus.append(list(parse_pdf_pages(stream, path)))
+    return corpus
+
+
+async def measure_retrieval(client, corpus_chunks: list[list], config, args) -> dict:
+    rng = random.Random(0)
+    point_id = 0
+    for doc, chunks in enumerate(corpus_chunks):
+        for start in range(0, len(chunks), 256):
+            points = []
+            for chunk in chunks[start : start + 256]:
+                points.append(
+                    models.PointStruct(
+                        id=point_id,
+                        vector=fake_vector(chunk.page_content, args.dim),
+                        payload={
+                            "page_content": chunk.page_content,
+                            "metadata": {**chunk.metadata, "user_id": f"user-{doc}", "doc_id": f"doc-{doc}"},
+                        },
+                    )
+                )
+                point_id += 1
+            await client.upsert(collection_name=config.collection_name, points=points)
+
+    latencies = []
+    for _ in range(args.queries):
+        doc = rng.randrange(len(corpus_chunks))
+        started = time.perf_counter()
+        await client.query_points(
+            collection_name=config.collection_name,
+            query=[rng.random() for _ in range(args.dim)],
+            limit=args.top_k,
+            search_params=search_params(config),
+            query_filter=tenant_filter(f"user-{doc}", f"doc-{doc}"),
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "retrieval_p50_ms": round(statistics.median(latencies), 2),
+        "retrieval_p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+async def run_strategy(client, corpus: list[list], chunking, args) -> dict:
+    pages = sum(len(pages) for pages in corpus)
+    started = time.perf_counter()
+    corpus_chunks = [split_doc(doc_pages, chunking) for doc_pages in corpus]
+    seconds = time.perf_counter() - started
+    chunks = sum(len(doc_chunks) for doc_chunks in corpus_chunks)
+
+    config = CollectionConfig(
+        collection_name=f"bench_chunking_{chunking.strategy}_{chunking.chunk_size}",
+        vector_size=args.dim,
+        quantization="none",
+        on_disk_vectors=False,
+        on_disk_payload=False,
+    )
+    if await client.collection_exists(config.collection_name):
+        await client.delete_collection(config.collection_name)
+    await provision_collection(client, config)
+    try:
+        retrieval = await measure_retrieval(client, corpus_chunks, config, args)
+    finally:
+        await client.delete_collection(config.collection_name)
+
+    return {
+        "chunking": chunking.to_metadata(),
+        "pages": pages,
+        "chunks": chunks,
+        "chunks_per_sec": round(chunks / seconds, 1),
+        "chunks_per_page": round(chunks / pages, 2),
+        "avg_chunk_chars": round(
+            sum(len(c.page_content) for doc_chunks in corpus_chunks for c in doc_chunks) / chunks
+        ),
+        "embedding_tokens": sum(
+            estimate_tokens(c.page_content) for doc_chunks in corpus_chunks for c in doc_chunks
+        ),
+        **retrieval,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", nargs="+", help="PDFs of the corpus. Synthetic ones are generated otherwise.")
+    parser.add_argument("--documents", type=int, default=4, help="Synthetic documents to generate.")
+    parser.add_argument("--pages", type=int, default=50, help="Pages per synthetic document.")
+    parser.add_argument("--strategies", nargs="+", default=sorted(CHUNKING_STRATEGIES))
+    parser.add_argument("--sizes", type=int, nargs="+", help="Chunk sizes to try, in each strategy's unit.")
+    parser.add_argument("--overlap", type=int, help="Chunk overlap; defaults to each strategy's.")
+    parser.add_argument("--url", default=":memory:", help="Qdrant URL, or :memory: for the local mode.")
+    parser.add_argument("--api-key")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.pdf
+        if not paths:
+            paths = []
+            for i in range(args.documents):
+                paths.append(os.path.join(tmp, f"doc-{i}.pdf"))
+                write_pdf(paths[-1], args.pages, seed=i)
+        corpus = load_corpus(paths)
+
+    client = (
+        AsyncQdrantClient(location=":memory:")
+        if args.url == ":memory:"
+        else AsyncQdrantClient(url=args.url, api_key=args.api_key, timeout=60.0)
+    )
+    results = []
+    try:
+        for strategy in args.strategies:
+            for size in args.sizes or [None]:
+                chunking = chunking_config(strategy, size, args.overlap)
+                results.append(await run_strategy(client, corpus, chunking, args))
+    finally:
+        await client.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
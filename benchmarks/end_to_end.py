@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from .fixtures import write_pdf
+
+
+"""
+Load-tests the real `main.app` offline, end to end.
+
+The app is served by uvicorn inside this process with the stand-ins from
+`fakes.py`: deterministic embeddings and a streaming chat model instead of
+Gemini, a local-mode in-memory Qdrant instead of Qdrant Cloud, and an
+in-process `mongomock_motor` database instead of Atlas (or a local server with
+`--mongo-uri`). The rate limiter is disabled. Everything else, middleware,
+routes, background ingestion and the RAG graph, runs unchanged.
+
+Three phases are driven over real HTTP and websocket connections:
+
+- auth: signup, login and token refresh for `--users` users;
+- uploads: `--uploads` distinct synthetic PDFs, timing both the upload request
+  and the background ingestion until the job completes;
+- chats: `--chats` concurrent websocket sessions asking `--questions`
+  questions each, timing time to first token and the full answer, followed by
+  a chat history request per session.
+
+Per route, the count, errors, p50/p95/p99 latency and requests/sec (over the
+phase's wall time) are reported as JSON with the commit they were measured on.
+`--compare` adds the relative change against a previous report.
+
+Usage:
+    python -m benchmarks.end_to_end --users 20 --uploads 20 --chats 50 --output before.json
+    python -m benchmarks.end_to_end --users 20 --uploads 20 --chats 50 --compare before.json
+    python -m benchmarks.end_to_end --embedding-latency 0.2 --token-latency 0.02
+"""
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.phase_seconds = {}
+        self.route_phase = {}
+
+    def record(self, phase: str, route: str, started: float, ok: bool = True):
+        self.route_phase[route] = phase
+        if ok:
+            self.latencies[route].append((time.perf_counter() - started) * 1000)
+        else:
+            self.errors[route] += 1
+
+    def report(self) -> dict:
+        routes = {}
+        for route, phase in self.route_phase.items():
+            latencies = self.latencies[route]
+            count = len(latencies) + self.errors[route]
+            routes[route] = {
+                "count": count,
+                "errors": self.errors[route],
+                "p50_ms": round(percentile(latencies, 0.50), 2) if latencies else None,
+                "p95_ms": round(percentile(latencies, 0.95), 2) if latencies else None,
+                "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None,
+                "requests_per_sec": round(count / self.phase_seconds[phase], 2),
+            }
+        return routes
+
+
+async def timed(recorder: Recorder, phase: str, route: str, request):
+    started = time.perf_counter()
+    try:
+        response = await request
+    except Exception:
+        recorder.record(phase, route, started, ok=False)
+        return None
+    recorder.record(phase, route, started, ok=response.is_success)
+    return response if response.is_success else None
+
+
+async def run_phase(recorder: Recorder, phase: str, tasks):
+    started = time.perf_counter()
+    results = await asyncio.gather(*tasks)
+    recorder.phase_seconds[phase] = time.perf_counter() - started
+    return results
+
+
+async def authenticate(http, recorder: Recorder, semaphore, i: int):
+    async with semaphore:
+        credentials = {"email": f"bench-{i}@example.com", "password": "benchmark-password"}
+        await timed(
+            recorder,
+            "auth",
+            "POST /api/v1/auth/signup",
+            http.post("/api/v1/auth/signup", json={"fullname": f"Bench User{i}", **credentials}),
+        )
+        response = await timed(
+            recorder, "auth", "POST /api/v1/auth/login", http.post("/api/v1/auth/login", json=credentials)
+        )
+        if response is None:
+            return None
+        token = response.json()["data"]["token"]["access_token"]
+        await timed(
+            recorder,
+            "auth",
+            "POST /api/v1/auth/refresh-token",
+            http.post("/api/v1/auth/refresh-token", headers={"Authorization": f"Bearer {token}"}),
+        )
+        return token
+
+
+async def upload(http, recorder: Recorder, semaphore, token: str, pdf: bytes, i: int, poll_interval: float):
+    async with semaphore:
+        headers = {"Authorization": f"Bearer {token}"}
+        started = time.perf_counter()
+        response = await timed(
+            recorder,
+            "uploads",
+            "POST /api/v1/chats/upload",
+            http.post(
+                "/api/v1/chats/upload",
+                files={"file": (f"bench-{i}.pdf", pdf, "application/pdf")},
+                headers=headers,
+            ),
+        )
+        if response is None:
+            return None
+
+    data = response.json()["data"]
+    while True:
+        job = await http.get(f"/api/v1/chats/jobs/{data['job_id']}", headers=headers)
+        status = job.json()["data"]["status"] if job.is_success else "failed"
+        if status in ("completed", "failed"):
+            recorder.record("uploads", "ingestion (upload to completed)", started, ok=status == "completed")
+            return (token, data["doc_id"]) if status == "completed" else None
+        await asyncio.sleep(poll_interval)
+
+
+async def chat(http, recorder: Recorder, ws_url: str, token: str, doc_id: str, session: int, questions: int):
+    from websockets.asyncio.client import connect
+
+    started = time.perf_counter()
+    try:
+        async with connect(f"{ws_url}/api/v1/chats/ws/{doc_id}?access_token=Bearer%20{token}") as ws:
+            await ws.recv()
+            recorder.record("chats", "WS /api/v1/chats/ws (connect and history)", started)
+
+            for question in range(questions):
+                started = time.perf_counter()
+                await ws.send(f"Session {session}, question {question}: what does the document say?")
+                first = True
+                while True:
+                    message = await ws.recv()
+                    if message.startswith('{"type"'):
+                        break
+                    if first:
+                        recorder.record("chats", "WS /api/v1/chats/ws (time to first token)", started)
+                        first = False
+                recorder.record("chats", "WS /api/v1/chats/ws (answer)", started)
+    except Exception:
+        recorder.record("chats", "WS /api/v1/chats/ws (answer)", started, ok=False)
+
+    await timed(
+        recorder,
+        "chats",
+        "GET /api/v1/chats/{doc_id}/history",
+        http.get(f"/api/v1/chats/{doc_id}/history", headers={"Authorization": f"Bearer {token}"}),
+    )
+
+
+def current_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(routes: dict, baseline: dict) -> dict:
+    changes = {}
+    for route, stats in routes.items():
+        before = baseline.get("routes", {}).get(route)
+        if before is None:
+            continue
+        changes[route] = {
+            f"{key}_change": round((stats[key] - before[key]) / before[key], 4)
+            for key in ("p50_ms", "p95_ms", "p99_ms", "requests_per_sec")
+            if stats.get(key) is not None and before.get(key)
+        }
+    return {"baseline_commit": baseline.get("commit"), "routes": changes}
+
+
+"""
+Serves the app with uvicorn on a free local port for the duration of the block
+and yields the port.
+"""
+@asynccontextmanager
+async def serve(app):
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            raise SystemExit("The app failed to start")
+        await asyncio.sleep(0.05)
+    try:
+        yield server.servers[0].sockets[0].getsockname()[1]
+    finally:
+        server.should_exit = True
+        await serving
+
+
+async def serve_and_drive(app, pdfs: list[bytes], args) -> Recorder:
+    import httpx
+
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async with serve(app) as port:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120.0) as http:
+            tokens = await run_phase(
+                recorder,
+                "auth",
+                [authenticate(http, recorder, semaphore, i) for i in range(args.users)],
+            )
+            tokens = [token for token in tokens if token]
+            if not tokens:
+                raise SystemExit("No user could sign up and log in")
+
+            documents = await run_phase(
+                recorder,
+                "uploads",
+                [
+                    upload(http, recorder, semaphore, tokens[i % len(tokens)], pdf, i, 0.05)
+                    for i, pdf in enumerate(pdfs)
+                ],
+            )
+            documents = [document for document in documents if document]
+            if not documents:
+                raise SystemExit("No upload was ingested")
+
+            await run_phase(
+                recorder,
+                "chats",
+                [
+                    chat(
+                        http,
+                        recorder,
+                        f"ws://127.0.0.1:{port}",
+                        *documents[session % len(documents)],
+                        session,
+                        args.questions,
+                    )
+                    for session in range(args.chats)
+                ],
+            )
+
+    return recorder
+
+
+"""
+Configures the environment, imports `main` and plugs in the stand-ins. Expects
+the `--embedding-latency`, `--first-token-latency`, `--token-latency`,
+`--mongo-uri` and `--qdrant-url` arguments.
+
+Returns:
+    module: The imported `main` module, whose `app` is ready to serve.
+"""
+async def prepare_app(args):
+    os.environ.setdefault("JWT_SECRET", "offline-benchmark-secret-not-for-production")
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+    os.environ.setdefault("INGESTION_POLL_INTERVAL", "0.2")
+    os.environ.setdefault("DELETION_POLL_INTERVAL", "0.2")
+    os.environ.setdefault("VECTOR_RETENTION_HOURS", "0")
+    if args.mongo_uri:
+        os.environ["DATABASE_URI"] = args.mongo_uri
+    if args.qdrant_url != ":memory:":
+        os.environ["QDRANT_URL"] = args.qdrant_url
+
+    import main as app_main
+    from .fakes import install_fakes, init_mock_database
+
+    install_fakes(
+        embedding_latency=args.embedding_latency,
+        first_token_latency=args.first_token_latency,
+        token_latency=args.token_latency,
+        qdrant_url=args.qdrant_url,
+    )
+    app_main.limiter.enabled = False
+    if not args.mongo_uri:
+        await init_mock_database()
+    return app_main
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--uploads", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=10, help="Pages per uploaded PDF.")
+    parser.add_argument("--chats", type=int, default=20, help="Concurrent websocket sessions.")
+    parser.add_argument("--questions", type=int, default=3, help="Questions per websocket session.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent auth and upload requests.")
+    parser.add_argument("--embedding-latency", type=float, default=0.0, help="Seconds per fake embedding call.")
+    parser.add_argument("--first-token-latency", type=float, default=0.0)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--mongo-uri", help="Local MongoDB to use instead of the in-process stand-in.")
+    parser.add_argument("--qdrant-url", default=":memory:", help="Qdrant server to use instead of the local mode.")
+    parser.add_argument("--output", help="Write the JSON report to this file.")
+    parser.add_argument("--compare", help="Previous JSON report to compare against.")
+    args = parser.parse_args()
+
+    app_main = await prepare_app(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["INGESTION_SPOOL_DIR"] = os.path.join(tmp, "uploads")
+        pdfs = []
+        for i in range(args.uploads):
+            path = os.path.join(tmp, f"bench-{i}.pdf")
+            write_pdf(path, args.pages, seed=i)
+            with open(path, "rb") as f:
+                pdfs.append(f.read())
+
+        recorder = await serve_and_drive(app_main.app, pdfs, args)
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "params": vars(args),
+        "phase_seconds": {phase: round(seconds, 3) for phase, seconds in recorder.phase_seconds.items()},
+        "routes": recorder.report(),
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(report["routes"], json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
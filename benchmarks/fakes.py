@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from typing import Any
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+"""
+Local stand-ins for the external services, so the real app can be benchmarked
+offline and without API costs.
+
+`install_fakes` plugs them into the app's lazy getters (`get_embedding_model`,
+`get_client`, `get_async_client`, `get_llm`) and its shared database client
+before the lifespan runs, so every route, worker and background job goes
+through its normal code path and only the network calls are replaced.
+"""
+
+
+"""
+Deterministic embeddings: every text maps to the same pseudo-random unit vector
+on every run. `latency` seconds are slept per call to stand in for the API.
+"""
+class FakeEmbeddings(Embeddings):
+    def __init__(self, size: int = 768, latency: float = 0.0):
+        self.size = size
+        self.latency = latency
+
+    def _vector(self, text: str) -> list[float]:
+        rng = random.Random(hashlib.sha256(text.encode()).digest())
+        vector = [rng.gauss(0, 1) for _ in range(self.size)]
+        norm = sum(value * value for value in vector) ** 0.5
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.latency)
+        return self._vector(text)
+
+
+"""
+A chat model that streams a fixed answer word by word, waiting
+`first_token_latency` seconds before the first token and `token_latency`
+seconds between tokens.
+"""
+class FakeStreamingChatModel(BaseChatModel):
+    answer: str = "This is a deterministic answer generated offline for the benchmark."
+    first_token_latency: float = 0.0
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming-chat"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        await asyncio.sleep(self.first_token_latency)
+        for i, word in enumerate(self.answer.split(" ")):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content=word if i == 0 else f" {word}")
+            )
+
+
+"""
+Serializes access to a local-mode `QdrantClient`, which is not thread-safe,
+between the ingestion worker threads and the event loop.
+"""
+class LockedQdrantClient:
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return call
+
+
+"""
+The async client interface over the same local-mode client, so the sync
+ingestion path and the async retrieval path see the same in-memory points
+(two `":memory:"` clients would each have their own).
+"""
+class LocalAsyncQdrantClient:
+    def __init__(self, client: LockedQdrantClient):
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(attr, *args, **kwargs)
+
+        return call
+
+
+"""
+Opens an in-process Mongo stand-in with `mongomock_motor` and initializes
+Beanie on it, exactly as `init_database` would for a real server.
+`mongomock_motor` is only needed for this mode, so it is imported here.
+"""
+async def init_mock_database():
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError as e:
+        raise SystemExit(
+            "The in-process Mongo stand-in needs mongomock-motor "
+            "(pip install mongomock-motor), or pass --mongo-uri for a local server"
+        ) from e
+    from beanie import init_beanie
+    from src.chat_pdf_api_service.helpers import database
+    from src.chat_pdf_api_service.modules import User, OTP, Chat, IngestionJob, DeletionJob
+
+    client = AsyncMongoMockClient()
+    await init_beanie(
+        database=client.chatPDF, document_models=[User, OTP, Chat, IngestionJob, DeletionJob]
+    )
+    database._client = client
+
+
+"""
+Plugs the stand-ins into the app. Must run before the app's lifespan starts.
+
+Args:
+    embedding_latency (float): Seconds per embedding call.
+    first_token_latency (float): Seconds before the first streamed token.
+    token_latency (float): Seconds between streamed tokens.
+    qdrant_url (str): `:memory:` for the local mode, or a Qdrant server to use
+        instead (the app's own clients are kept).
+"""
+def install_fakes(
+    embedding_latency: float = 0.0,
+    first_token_latency: float = 0.0,
+    token_latency: float = 0.0,
+    qdrant_url: str = ":memory:",
+):
+    from src.chat_pdf_api_service.modules.authentication import route as auth_route
+    from src.chat_pdf_api_service.services.embeddings import CachedEmbeddings
+    from src.chat_pdf_api_service.services.llm.gemini import gemini
+    from src.chat_pdf_api_service.services.qdrant import qdrant
+
+    qdrant._embedding_model = CachedEmbeddings(
+        FakeEmbeddings(latency=embedding_latency), model_name="fake-embedding"
+    )
+    if qdrant_url == ":memory:":
+        from qdrant_client import QdrantClient
+
+        client = LockedQdrantClient(QdrantClient(location=":memory:"))
+        qdrant._client = client
+        qdrant._async_client = LocalAsyncQdrantClient(client)
+
+    gemini._llm = FakeStreamingChatModel(
+        first_token_latency=first_token_latency, token_latency=token_latency
+    )
+    auth_route.send_verification_email = lambda *args: None
+    auth_route.send_password_reset_email = lambda *args: None
@@ -0,0 +1,66 @@
+import random
+
+
+WORDS = (
+    "document analysis retrieval vector search language model context answer "
+    "question embedding chunk page section result method conclusion data table "
+    "figure report summary value system process user service request response"
+).split()
+
+
+"""
+Writes a synthetic text-only PDF without third-party dependencies.
+
+Every page carries `lines_per_page` lines of pseudo-random words in Helvetica,
+which is enough for pypdf to do realistic text extraction work. The output is
+deterministic for a given seed, so benchmark runs are comparable.
+
+Args:
+    path (str): Destination path.
+    pages (int): Number of pages to write.
+    lines_per_page (int): Lines of text per page.
+    seed (int): Seed for the word generator.
+"""
+def write_pdf(path: str, pages: int, lines_per_page: int = 45, seed: int = 0):
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+
+    for _ in range(pages):
+        lines = []
+        for _ in range(lines_per_page):
+            words = " ".join(rng.choice(WORDS) for _ in range(12))
+            lines.append(f"({words}.) Tj T*")
+        stream = (
+            "BT /F1 10 Tf 14 TL 40 800 Td " + " ".join(lines) + " ET"
+        ).encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(
+            b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(objects) + 1, xref)
+        )
@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from src.chat_pdf_api_service.services.ingestion.scheduler import (
+    EmbeddingScheduler,
+    RateLimiter,
+)
+
+
+"""
+Measures ingestion throughput (chunks/sec) of the embedding scheduler against a
+sequential embed-then-upsert loop, using a fake embedding provider with a fixed
+per-call latency, an optional rate of injected 429 errors and a fake upsert.
+
+Usage:
+    python -m benchmarks.ingestion_scheduler --chunks 2000 --concurrency 4 --rpm 600
+"""
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self, latency: float, error_rate: float, size: int = 768):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.size = size
+        self.calls = 0
+
+    def _vector(self, text: str) -> list[float]:
+        rng = random.Random(text)
+        return [rng.random() for _ in range(self.size)]
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if random.random() < self.error_rate:
+            raise RateLimited("429 RESOURCE_EXHAUSTED")
+        return [self._vector(text) for text in texts]
+
+
+def make_batches(chunks: int, batch_size: int):
+    docs = (Document(page_content=f"chunk {i} " * 40, metadata={"i": i}) for i in range(chunks))
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def sequential(embeddings, upsert, chunks, batch_size) -> dict:
+    started = time.perf_counter()
+    for batch in make_batches(chunks, batch_size):
+        vectors = await embeddings.aembed_documents([doc.page_content for doc in batch])
+        await upsert(batch, vectors)
+    elapsed = time.perf_counter() - started
+    return {"mode": "sequential", "seconds": round(elapsed, 3), "chunks_per_sec": round(chunks / elapsed, 1)}
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--embed-latency", type=float, default=0.2)
+    parser.add_argument("--upsert-latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0)
+    parser.add_argument("--tpm", type=int, default=0)
+    args = parser.parse_args()
+
+    async def upsert(batch, vectors):
+        await asyncio.sleep(args.upsert_latency)
+
+    results = [
+        await sequential(
+            FakeEmbeddings(args.embed_latency, 0.0), upsert, args.chunks, args.batch_size
+        )
+    ]
+
+    embeddings = FakeEmbeddings(args.embed_latency, args.error_rate)
+    scheduler = EmbeddingScheduler(
+        embeddings=embeddings,
+        upsert=upsert,
+        concurrency=args.concurrency,
+        limiter=RateLimiter(args.rpm, args.tpm),
+        max_retries=10,
+        backoff_seconds=0.05,
+    )
+    stats = await scheduler.run(make_batches(args.chunks, args.batch_size))
+    results.append(
+        {
+            "mode": f"scheduler[concurrency={args.concurrency},rpm={args.rpm},tpm={args.tpm}]",
+            "seconds": round(stats.elapsed_seconds, 3),
+            "chunks_per_sec": stats.chunks_per_sec,
+            "embed_calls": embeddings.calls,
+            "rate_limit_retries": stats.retries,
+        }
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
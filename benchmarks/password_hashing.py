@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+from .end_to_end import Recorder, authenticate, chat, current_commit, prepare_app, run_phase, serve, upload
+from .fixtures import write_pdf
+
+
+"""
+Measures how password hashing affects the rest of the app, served offline as
+in `end_to_end.py`.
+
+After signing up `--users` users and ingesting one document, websocket chats
+are timed twice: alone, then while `--login-concurrency` clients send
+`--logins` logins in a loop. The report gives login throughput, login latency
+and the number of logins shed with a 503, next to the chats' time to first
+token and answer latency in both runs. With bcrypt on the event loop
+(`--inline`, the behaviour before the hashing pool) every login stalls the
+chats; with the pool, chat latency under load should stay close to idle.
+
+Usage:
+    python -m benchmarks.password_hashing --rounds 12 --logins 200 --chats 10
+    python -m benchmarks.password_hashing --rounds 12 --logins 200 --chats 10 --inline
+    python -m benchmarks.password_hashing --max-pending 8
+"""
+
+
+async def run_inline(operation: str, fn, *args):
+    return fn(*args)
+
+
+async def login_loop(http, recorder: Recorder, credentials: list[dict], worker: int, requests: int, shed: list):
+    for i in range(requests):
+        started = time.perf_counter()
+        try:
+            response = await http.post("/api/v1/auth/login", json=credentials[(worker + i) % len(credentials)])
+        except Exception:
+            recorder.record("chats", "POST /api/v1/auth/login", started, ok=False)
+            continue
+        if response.status_code == 503:
+            shed.append(1)
+        recorder.record("chats", "POST /api/v1/auth/login", started, ok=response.is_success)
+
+
+async def drive(app, pdf: bytes, args) -> dict:
+    import httpx
+
+    setup = Recorder()
+    idle = Recorder()
+    loaded = Recorder()
+    shed = []
+    async with serve(app) as port:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300.0) as http:
+            semaphore = asyncio.Semaphore(args.login_concurrency)
+            tokens = await run_phase(
+                setup, "auth", [authenticate(http, setup, semaphore, i) for i in range(args.users)]
+            )
+            credentials = [
+                {"email": f"bench-{i}@example.com", "password": "benchmark-password"}
+                for i, token in enumerate(tokens)
+                if token
+            ]
+            tokens = [token for token in tokens if token]
+            if not tokens:
+                raise SystemExit("No user could sign up and log in")
+            document = await run_phase(
+                setup, "uploads", [upload(http, setup, semaphore, tokens[0], pdf, 0, 0.05)]
+            )
+            if not document[0]:
+                raise SystemExit("The upload was not ingested")
+
+            ws_url = f"ws://127.0.0.1:{port}"
+
+            def sessions(recorder):
+                return [
+                    chat(http, recorder, ws_url, *document[0], session, args.questions)
+                    for session in range(args.chats)
+                ]
+
+            await run_phase(idle, "chats", sessions(idle))
+
+            per_worker = max(1, args.logins // args.login_concurrency)
+            await run_phase(
+                loaded,
+                "chats",
+                [
+                    *sessions(loaded),
+                    *[
+                        login_loop(http, loaded, credentials, worker, per_worker, shed)
+                        for worker in range(args.login_concurrency)
+                    ],
+                ],
+            )
+
+    login = loaded.report().get("POST /api/v1/auth/login", {})
+    return {
+        "setup": setup.report(),
+        "idle": idle.report(),
+        "under_login_load": loaded.report(),
+        "logins_shed": len(shed),
+        "successful_logins_per_sec": round(
+            (login.get("count", 0) - login.get("errors", 0)) / loaded.phase_seconds["chats"], 2
+        ),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--logins", type=int, default=100, help="Logins sent during the loaded run.")
+    parser.add_argument("--login-concurrency", type=int, default=20)
+    parser.add_argument("--chats", type=int, default=10, help="Concurrent websocket sessions.")
+    parser.add_argument("--questions", type=int, default=3, help="Questions per websocket session.")
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_ROUNDS.")
+    parser.add_argument("--workers", type=int, help="PASSWORD_HASH_WORKERS.")
+    parser.add_argument("--max-pending", type=int, help="PASSWORD_HASH_MAX_PENDING.")
+    parser.add_argument("--inline", action="store_true", help="Run bcrypt on the event loop.")
+    parser.add_argument("--pages", type=int, default=10, help="Pages of the ingested PDF.")
+    parser.add_argument("--embedding-latency", type=float, default=0.0)
+    parser.add_argument("--first-token-latency", type=float, default=0.0)
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--mongo-uri", help="Local MongoDB to use instead of the in-process stand-in.")
+    parser.add_argument("--qdrant-url", default=":memory:")
+    args = parser.parse_args()
+
+    os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    if args.max_pending:
+        os.environ["PASSWORD_HASH_MAX_PENDING"] = str(args.max_pending)
+
+    app_main = await prepare_app(args)
+    if args.inline:
+        from src.chat_pdf_api_service.helpers import passwords
+
+        passwords._run = run_inline
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["INGESTION_SPOOL_DIR"] = os.path.join(tmp, "uploads")
+        path = os.path.join(tmp, "bench.pdf")
+        write_pdf(path, args.pages, seed=0)
+        with open(path, "rb") as f:
+            pdf = f.read()
+
+        results = await drive(app_main.app, pdf, args)
+
+    print(
+        json.dumps(
+            {
+                "commit": current_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "params": vars(args),
+                **results,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
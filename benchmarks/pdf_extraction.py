@@ -0,0 +1,62 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from langchain_community.document_loaders import PyPDFLoader
+from src.chat_pdf_api_service.helpers.extraction import parallel_load_document
+from .fixtures import write_pdf
+
+
+"""
+Compares pages/sec of the single-threaded PyPDFLoader against the process-pool
+extraction engine on a multi-hundred-page PDF.
+
+Usage:
+    python -m benchmarks.pdf_extraction --pages 400 --workers 4 --pages-per-task 16
+"""
+
+
+def run(label: str, load, runs: int) -> dict:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        pages = sum(1 for _ in load())
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    return {"loader": label, "pages": pages, "seconds": round(best, 3), "pages_per_sec": round(pages / best, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", help="Existing PDF to benchmark. A synthetic one is generated otherwise.")
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pages-per-task", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.pdf
+        if path is None:
+            path = os.path.join(tmp, "bench.pdf")
+            write_pdf(path, args.pages)
+
+        results = [
+            run("pypdfloader", lambda: PyPDFLoader(path).lazy_load(), args.runs),
+            run(
+                f"process_pool[workers={args.workers},pages_per_task={args.pages_per_task}]",
+                lambda: parallel_load_document(
+                    path, workers=args.workers, pages_per_task=args.pages_per_task
+                ),
+                args.runs,
+            ),
+        ]
+
+    results[1]["speedup"] = round(results[1]["pages_per_sec"] / results[0]["pages_per_sec"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
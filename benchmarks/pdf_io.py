@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from fastapi import UploadFile
+from langchain_community.document_loaders import PyPDFLoader
+from src.chat_pdf_api_service.helpers.loader import load_document, lazy_load_document
+from .fixtures import write_pdf
+
+
+"""
+Compares the I/O of loading a large PDF by copying the upload to a temp file
+first against parsing it from the upload spool and from a memory map.
+
+Bytes read and written are taken from `/proc/self/io` (`rchar`/`wchar`), so
+they count every read and write syscall the loader makes. They are reported as
+null on platforms without it.
+
+Usage:
+    python -m benchmarks.pdf_io --pages 1000 --runs 3
+"""
+
+
+def io_counters() -> dict | None:
+    try:
+        with open("/proc/self/io") as f:
+            return {key: int(value) for key, value in (line.split(": ") for line in f)}
+    except OSError:
+        return None
+
+
+def upload_from(path: str) -> UploadFile:
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    with open(path, "rb") as f:
+        shutil.copyfileobj(f, spool)
+    spool.seek(0)
+    return UploadFile(file=spool, filename=os.path.basename(path))
+
+
+def temp_copy_load(upload: UploadFile):
+    # The loader this benchmark replaces: copy the upload, then re-read it.
+    upload.file.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tf:
+        while chunk := upload.file.read(1024 * 1024):
+            tf.write(chunk)
+    try:
+        return PyPDFLoader(tf.name).load()
+    finally:
+        os.remove(tf.name)
+
+
+def run(label: str, load, runs: int) -> dict:
+    timings, read, written = [], [], []
+    for _ in range(runs):
+        before = io_counters()
+        started = time.perf_counter()
+        pages = len(load())
+        timings.append(time.perf_counter() - started)
+        after = io_counters()
+        if before and after:
+            read.append(after["rchar"] - before["rchar"])
+            written.append(after["wchar"] - before["wchar"])
+
+    return {
+        "loader": label,
+        "pages": pages,
+        "seconds": round(min(timings), 3),
+        "bytes_read": min(read) if read else None,
+        "bytes_written": min(written) if written else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pdf", help="Existing PDF to benchmark. A synthetic one is generated otherwise.")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    # Keep the comparison on the calling thread; the process pool is measured
+    # by benchmarks.pdf_extraction.
+    os.environ["PDF_EXTRACT_WORKERS"] = "1"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.pdf
+        if path is None:
+            path = os.path.join(tmp, "bench.pdf")
+            write_pdf(path, args.pages)
+
+        upload = upload_from(path)
+        try:
+            results = [
+                run("temp_copy+pypdfloader", lambda: temp_copy_load(upload), args.runs),
+                run("upload_spool", lambda: load_document(upload), args.runs),
+                run("mmap", lambda: list(lazy_load_document(path)), args.runs),
+            ]
+        finally:
+            upload.file.close()
+
+        file_size = os.path.getsize(path)
+
+    baseline = results[0]
+    for result in results[1:]:
+        if result["bytes_written"] is not None:
+            result["bytes_saved"] = (
+                baseline["bytes_read"] + baseline["bytes_written"]
+                - result["bytes_read"] - result["bytes_written"]
+            )
+        result["speedup"] = round(baseline["seconds"] / result["seconds"], 2)
+
+    print(json.dumps({"file_size": file_size, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
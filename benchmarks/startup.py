@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+"""
+Measures cold-start cost: the time to import the app and the time until it
+serves its first request, each in a fresh interpreter.
+
+The first request goes through the full middleware stack over an in-process
+ASGI transport, without the lifespan, so no database or network is needed. The
+child also reports which heavy SDKs were loaded by then, which should be none
+of them now that the services are initialized lazily.
+
+Usage:
+    python -m benchmarks.startup --runs 5
+"""
+
+HEAVY_MODULES = [
+    "langgraph",
+    "langchain_google_genai",
+    "langchain_qdrant",
+    "langchain_text_splitters",
+    "qdrant_client",
+]
+
+CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return (await client.get("/")).status_code
+
+status = asyncio.run(first_request())
+served = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - started,
+    "first_request_seconds": served - started,
+    "status": status,
+    "heavy_modules_loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def run_once(heavy_modules: list[str]) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD % heavy_modules],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+        stdin=subprocess.DEVNULL,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_once(HEAVY_MODULES) for _ in range(args.runs)]
+    print(
+        json.dumps(
+            {
+                "runs": args.runs,
+                "import_seconds_p50": round(
+                    statistics.median(r["import_seconds"] for r in results), 3
+                ),
+                "first_request_seconds_p50": round(
+                    statistics.median(r["first_request_seconds"] for r in results), 3
+                ),
+                "status": results[-1]["status"],
+                "heavy_modules_loaded": results[-1]["heavy_modules_loaded"],
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from qdrant_client import AsyncQdrantClient, models
+from src.chat_pdf_api_service.services.qdrant import (
+    CollectionConfig,
+    provision_collection,
+    search_params,
+    tenant_filter,
+)
+
+
+"""
+Compares filtered search latency of the shared layout (one HNSW graph over all
+users, filtered on `user_id`/`doc_id`) against the multitenant layout (global
+graph disabled, per-tenant graphs on the tenant-flagged `user_id` index).
+
+Each layout gets its own temporary collection, provisioned through
+`provision_collection` exactly as the app does, filled with random vectors
+spread over the given numbers of tenants, and queried with `tenant_filter` for
+random tenants. Run it against a real Qdrant server; the local in-memory mode
+used by default ignores the index settings and only checks the wiring.
+
+Usage:
+    python -m benchmarks.tenant_search --url http://localhost:6333 --tenants 1000 100000
+"""
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def wait_for_indexing(client, collection_name: str):
+    while (await client.get_collection(collection_name)).status != models.CollectionStatus.GREEN:
+        await asyncio.sleep(0.5)
+
+
+async def run_layout(client, multitenant: bool, tenants: int, args) -> dict:
+    config = CollectionConfig(
+        collection_name=f"bench_{'tenant' if multitenant else 'shared'}_{tenants}",
+        vector_size=args.dim,
+        quantization="none",
+        on_disk_vectors=False,
+        on_disk_payload=False,
+        multitenant=multitenant,
+    )
+    if await client.collection_exists(config.collection_name):
+        await client.delete_collection(config.collection_name)
+    await provision_collection(client, config)
+
+    rng = random.Random(0)
+    total = tenants * args.points_per_tenant
+    try:
+        for start in range(0, total, 1000):
+            await client.upsert(
+                collection_name=config.collection_name,
+                points=[
+                    models.PointStruct(
+                        id=i,
+                        vector=[rng.random() for _ in range(args.dim)],
+                        payload={
+                            "metadata": {
+                                "user_id": f"user-{i % tenants}",
+                                "doc_id": f"doc-{i % tenants}",
+                            }
+                        },
+                    )
+                    for i in range(start, min(start + 1000, total))
+                ],
+            )
+        await wait_for_indexing(client, config.collection_name)
+
+        latencies = []
+        for _ in range(args.queries):
+            tenant = rng.randrange(tenants)
+            started = time.perf_counter()
+            await client.query_points(
+                collection_name=config.collection_name,
+                query=[rng.random() for _ in range(args.dim)],
+                limit=5,
+                search_params=search_params(config),
+                query_filter=tenant_filter(f"user-{tenant}", f"doc-{tenant}"),
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+    finally:
+        if not args.keep:
+            await client.delete_collection(config.collection_name)
+
+    return {
+        "layout": "multitenant" if multitenant else "shared",
+        "tenants": tenants,
+        "points": total,
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=":memory:", help="Qdrant URL, or :memory: for the local mode.")
+    parser.add_argument("--api-key")
+    parser.add_argument("--tenants", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--points-per-tenant", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark collections.")
+    args = parser.parse_args()
+
+    client = (
+        AsyncQdrantClient(location=":memory:")
+        if args.url == ":memory:"
+        else AsyncQdrantClient(url=args.url, api_key=args.api_key, timeout=60.0)
+    )
+    results = []
+    try:
+        for tenants in args.tenants:
+            for multitenant in (False, True):
+                results.append(await run_layout(client, multitenant, tenants, args))
+    finally:
+        await client.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
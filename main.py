@@ -1,14 +1,65 @@
-from fastapi import FastAPI
-from fastapi.responses import JSONResponse
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from src.chat_pdf_api_service import rag, authentication
+from src.chat_pdf_api_service.utils import (
+    init_database,
+    close_database,
+    database_status,
+    set_correlation_id,
+)
+from src.chat_pdf_api_service.services import (
+    ingestion_queue,
+    vector_expiry,
+    deletion_queue,
+    peek_embedding_model,
+    peek_answer_cache,
+    peek_user_cache,
+    close_user_cache,
+    context_builder,
+    ensure_collection,
+    close_clients,
+)
+from src.chat_pdf_api_service.utils.metrics import (
+    registry,
+    http_request_seconds,
+    stats_metrics,
+)
+from src.chat_pdf_api_service.helpers import (
+    shutdown_extraction_executor,
+    shutdown_password_executor,
+    PasswordHasherBusy,
+)
+from src.chat_pdf_api_service.dependencies import UploadSizeLimitMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_database()
+    await ensure_collection()
+    await ingestion_queue.start()
+    await vector_expiry.start()
+    await deletion_queue.start()
+    yield
+    await deletion_queue.stop()
+    await vector_expiry.stop()
+    await ingestion_queue.stop()
+    shutdown_extraction_executor()
+    shutdown_password_executor()
+    await close_clients()
+    await close_user_cache()
+    await close_database()
+
+
 limiter = Limiter(key_func=get_remote_address, default_limits=["10/minute"])
 app = FastAPI(
+    lifespan=lifespan,
     title="ChatPDF API",
     summary=" A powerful API for uploading PDF documents and interacting with their content through natural language chat. Supports authentication, real-time communication, and multi-user isolation using vector search and LLMs",
     servers=[
@@ -23,20 +74,153 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+"""
+Sheds signups, logins and password resets with a 503 while the bcrypt pool
+queue is full, instead of letting them pile up behind it.
+"""
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        content={"message": "Too many authentication requests, try again shortly"},
+        status_code=503,
+        headers={"Retry-After": "1"},
+    )
+
+
 app.add_middleware(SlowAPIMiddleware)
 
+app.add_middleware(UploadSizeLimitMiddleware, paths=["/api/v1/chats/upload"])
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
 
+"""
+Records the latency of every HTTP request in `chatpdf_http_request_seconds`,
+labelled with the route template (e.g. `/api/v1/chats/jobs/{job_id}`) rather
+than the raw path, so ids do not multiply the series.
+"""
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        http_request_seconds.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status,
+        )
+
+
+"""
+Tags every log line written while handling a request with its correlation id,
+taken from the `X-Request-ID` header or generated, and returns it in the
+response's `X-Request-ID` header.
+"""
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    request_id = set_correlation_id(request.headers.get("x-request-id"))
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 app.include_router(authentication)
 app.include_router(rag)
 
 
+"""
+Returns a scrape-time collector exporting a component's `stats()`. Lazily
+built components are read through their `peek_*` accessor and skipped until
+something else has built them, so a scrape never creates the Gemini client.
+"""
+def component_collector(prefix: str, documentation: str, component, counters=()):
+    def collect():
+        instance = component()
+        if instance is None:
+            return []
+        return stats_metrics(prefix, instance.stats(), documentation, counters)
+
+    collect.__name__ = f"collect_{prefix}"
+    return collect
+
+
+for collector in (
+    component_collector(
+        "chatpdf_embedding_cache",
+        "Embedding cache counters.",
+        peek_embedding_model,
+        counters=("hits", "disk_hits", "misses"),
+    ),
+    component_collector(
+        "chatpdf_answer_cache",
+        "Answer cache counters.",
+        peek_answer_cache,
+        counters=("exact_hits", "semantic_hits", "misses"),
+    ),
+    component_collector(
+        "chatpdf_user_cache",
+        "Authenticated user cache counters.",
+        peek_user_cache,
+        counters=("hits", "misses", "errors"),
+    ),
+    component_collector(
+        "chatpdf_context",
+        "Prompt context builder totals.",
+        lambda: context_builder,
+        counters=("queries", "chunks_retrieved", "chunks_used", "tokens_used", "tokens_saved"),
+    ),
+    component_collector(
+        "chatpdf_vector_expiry",
+        "Vector expiry job counters.",
+        lambda: vector_expiry,
+        counters=("runs", "points_reclaimed"),
+    ),
+):
+    registry.register_collector(collector)
+
+
 @app.get("/", tags=["Health"])
 def health_check():
     return JSONResponse(content={"message": "API is healthy"}, status_code=200)
+
+
+def stats_or_none(component) -> dict | None:
+    return component.stats() if component is not None else None
+
+
+@app.get("/health/ready", tags=["Health"])
+async def readiness_check():
+    status = await database_status()
+    return JSONResponse(
+        content={
+            "data": {
+                "database": status,
+                "embedding_cache": stats_or_none(peek_embedding_model()),
+                "answer_cache": stats_or_none(peek_answer_cache()),
+                "user_cache": stats_or_none(peek_user_cache()),
+                "context": context_builder.stats(),
+                "vector_expiry": vector_expiry.stats(),
+            }
+        },
+        status_code=200 if status["ready"] else 503,
+    )
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
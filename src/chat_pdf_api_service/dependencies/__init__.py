@@ -1,2 +1,2 @@
-from .file_validation import FileValidator
-from .jwt_verification import get_current_user, get_current_user_for_websocket
\ No newline at end of file
+from .file_validation import FileValidator, UploadSizeLimitMiddleware
+from .jwt_verification import get_current_user, get_current_user_for_websocket
@@ -1,11 +1,113 @@
 from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from pypdf import PdfReader
+from dotenv import load_dotenv
+from uuid import uuid4
+from ..helpers import mapped_pdf
+import hashlib
+import os
+
+load_dotenv()
+
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE_MB", "15")) * 1024 * 1024
+MAX_UPLOAD_PAGES = int(os.getenv("MAX_UPLOAD_PAGES", "2000"))
+# Room for the multipart boundaries and part headers around the file itself.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+"""
+An ASGI middleware that enforces the upload size limit before the body is parsed.
+
+FastAPI parses the whole multipart body before any dependency runs, so a
+dependency alone cannot stop an oversized upload from being received. This
+middleware rejects requests to the given paths whose `Content-Length` is over
+the limit (413) or not a number (400) without reading the body, and counts the
+bytes of streamed bodies, aborting with 413 as soon as they pass the limit.
+
+Attributes:
+    paths (set[str]): Request paths the limit applies to.
+    max_body_size (int): Maximum request body size in bytes.
+"""
+class UploadSizeLimitMiddleware:
+    def __init__(self, app, paths: list[str], max_body_size: int = MAX_UPLOAD_SIZE):
+        self.app = app
+        self.paths = set(paths)
+        self.max_body_size = max_body_size + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                content_length = int(content_length)
+            except ValueError:
+                await self.reject(scope, receive, send, 400, "Invalid Content-Length header")
+                return
+            if content_length > self.max_body_size:
+                await self.reject(scope, receive, send)
+                return
+
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size and not response_started:
+                    # Answer 413 now and make the app see a disconnect, so it
+                    # stops reading; whatever it responds with is dropped.
+                    rejected = True
+                    await self.reject(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+    async def reject(
+        self, scope, receive, send, status_code: int = 413, message: str | None = None
+    ):
+        response = JSONResponse(
+            content={"detail": {"message": message or file_too_large_message()}},
+            status_code=status_code,
+        )
+        await response(scope, receive, send)
+
+
+def file_too_large_message() -> str:
+    return f"File size exceeded {MAX_UPLOAD_SIZE // (1024 * 1024)}mb"
 
 
 """
 A class to validate uploaded files in a FastAPI application.
 
+The upload is validated in a single streaming pass that also writes it to the
+ingestion spool, so the file the parser reads is the validated copy and the
+upload is never buffered whole in memory.
+
 Attributes:
     file (UploadFile): The uploaded file to be validated.
+    path (str): Spool path the validated upload was written to.
+    sha256 (str): Hex SHA-256 digest of the upload.
+    size (int): Size of the upload in bytes.
+    page_count (int): Number of pages in the PDF.
 
 Methods:
     check_file_type() -> bool:
@@ -13,15 +115,32 @@ Methods:
         Raises an HTTPException if the file type is invalid.
 
     check_file_size() -> bool:
-        Validates the file size against a maximum allowed size of 5MB.
-        Raises an HTTPException if the file size exceeds the limit.
+        Streams the upload to the spool in 1MB chunks, checking the `%PDF`
+        magic bytes on the first chunk and aborting as soon as the size passes
+        the limit. Raises an HTTPException if either check fails.
+
+    check_page_count() -> bool:
+        Reads the page count from the PDF's page tree through a memory map of
+        the spooled file, without extracting any text or buffering the file. Raises an HTTPException if the PDF is unreadable, empty or has
+        too many pages.
 """
 class FileValidator:
     def __init__(self, file: UploadFile):
+        from ..services import spool_path
+
         self.file = file
+        self.path = spool_path(uuid4().hex)
+        self.sha256 = None
+        self.size = 0
+        self.page_count = 0
 
-        self.check_file_type()
-        self.check_file_size()
+        try:
+            self.check_file_type()
+            self.check_file_size()
+            self.check_page_count()
+        except Exception:
+            self.discard()
+            raise
 
     def check_file_type(self) -> bool:
         allowed_content_types = ["application/pdf"]
@@ -30,15 +149,53 @@ class FileValidator:
                 status_code=400, detail={"message": "Inavlid file type"}
             )
         else:
-            True
+            return True
 
     def check_file_size(self) -> bool:
-        allowed_file_size = 15 * 1024 * 1024  # 15mb
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        digest = hashlib.sha256()
 
         self.file.file.seek(0)
-        if len(self.file.file.read()) > allowed_file_size:
+        with open(self.path, "wb") as spool:
+            while chunk := self.file.file.read(1024 * 1024):  # 1MB chunks
+                if self.size == 0 and b"%PDF-" not in chunk[:1024]:
+                    raise HTTPException(
+                        status_code=400, detail={"message": "File is not a PDF"}
+                    )
+
+                self.size += len(chunk)
+                if self.size > MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=413, detail={"message": file_too_large_message()}
+                    )
+
+                digest.update(chunk)
+                spool.write(chunk)
+
+        self.sha256 = digest.hexdigest()
+        return True
+
+    def check_page_count(self) -> bool:
+        try:
+            # A path would make PdfReader read the whole file into a BytesIO.
+            with mapped_pdf(self.path) as stream:
+                self.page_count = len(PdfReader(stream).pages)
+        except Exception as e:
             raise HTTPException(
-                status_code=400, detail={"message": "File size exceded 5mb"}
+                status_code=400, detail={"message": f"Unreadable PDF: {e}"}
             )
-        else:
-            return True
+
+        if self.page_count == 0:
+            raise HTTPException(status_code=400, detail={"message": "PDF has no pages"})
+        if self.page_count > MAX_UPLOAD_PAGES:
+            raise HTTPException(
+                status_code=413,
+                detail={"message": f"PDF exceeded {MAX_UPLOAD_PAGES} pages"},
+            )
+        return True
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
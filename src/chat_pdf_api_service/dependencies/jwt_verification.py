@@ -9,6 +9,7 @@ from fastapi import (
     WebSocketException,
 )
 from ..utils import connect_to_database, logger
+from ..services.users import get_user_cache
 import os
 from dotenv import load_dotenv
 
@@ -16,6 +17,30 @@ load_dotenv()
 from motor.motor_asyncio import AsyncIOMotorClient
 
 
+"""
+Returns the projection of the user with the given id, from the user cache or,
+on a miss, from MongoDB (then cached). Returns None if the user does not exist.
+"""
+async def load_authenticated_user(user_id: str | None):
+    from ..modules import User, AuthenticatedUser
+
+    if user_id is None:
+        return None
+
+    cache = get_user_cache()
+    projection = await cache.get(user_id)
+    if projection is None:
+        user = await User.get(user_id)
+        if user is None:
+            return None
+        projection = AuthenticatedUser.model_validate(
+            user.model_dump(include=set(AuthenticatedUser.model_fields))
+        ).model_dump(mode="json")
+        await cache.set(user_id, projection)
+
+    return AuthenticatedUser.model_validate(projection)
+
+
 """
 Retrieve the current user based on the provided JWT token.
 
@@ -31,7 +56,8 @@ Parameters:
         database client.
 
 Returns:
-    User: The user object associated with the token.
+    AuthenticatedUser: The cached projection of the user associated with the
+        token.
 
 Raises:
     HTTPException: If the token is missing, invalid, expired, or if
@@ -45,8 +71,6 @@ async def get_current_user(
     token: Annotated[HTTPAuthorizationCredentials, Depends(security)],
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
 ):
-    from ..modules import User
-
     if token.credentials is None:
         raise HTTPException(
             status_code=400,
@@ -57,7 +81,7 @@ async def get_current_user(
         payload = jwt.decode(
             token.credentials, os.getenv("JWT_SECRET"), algorithms=["HS256"]
         )
-        user = await User.get(payload.get("sub"))
+        user = await load_authenticated_user(payload.get("sub"))
         if user is None:
             raise HTTPException(
                 detail={
@@ -93,7 +117,8 @@ Parameters:
         database client.
 
 Returns:
-    User: The user object associated with the token.
+    AuthenticatedUser: The cached projection of the user associated with the
+        token.
 
 Raises:
     WebSocketException: If the token is missing, invalid, expired, or if
@@ -103,8 +128,6 @@ async def get_current_user_for_websocket(
     access_token: Annotated[str, Query()],
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
 ):
-    from ..modules import User
-
     if access_token is None or not access_token.startswith("Bearer"):
         raise WebSocketException(code=400, reason="Access token required!")
 
@@ -112,7 +135,7 @@ async def get_current_user_for_websocket(
         payload = jwt.decode(
             access_token.split(" ")[1], os.getenv("JWT_SECRET"), algorithms=["HS256"]
         )
-        user = await User.get(payload.get("sub"))
+        user = await load_authenticated_user(payload.get("sub"))
         if user is None:
             raise WebSocketException(
                 code=404, reason="Account associated with this token does not exist"
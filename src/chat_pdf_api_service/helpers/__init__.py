@@ -1,5 +1,23 @@
-from .loader import load_document
-from .splitter import split_doc
+from .loader import (
+    load_document,
+    load_document_from_path,
+    lazy_load_document,
+)
+from .extraction import mapped_pdf, parallel_load_document, shutdown_extraction_executor
+from .splitter import split_doc, split_pages, batch_chunks
+from .chunking import (
+    CHUNKING_STRATEGIES,
+    ChunkingConfig,
+    chunking_config,
+    register_chunking_strategy,
+)
+from .tokens import estimate_tokens
 from .websocket import WebsocketConnectionManager
 from .otp import generate_otp
-from .token_generator import generate_tokens
\ No newline at end of file
+from .token_generator import generate_tokens
+from .passwords import (
+    PasswordHasherBusy,
+    hash_password,
+    verify_password,
+    shutdown_password_executor,
+)
@@ -0,0 +1,249 @@
+import os
+import re
+from dataclasses import dataclass, asdict
+from typing import Callable
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from .tokens import estimate_tokens
+
+load_dotenv()
+
+
+"""
+A registered chunking strategy.
+
+Attributes:
+    name (str): Name used in `CHUNKING_STRATEGY` and recorded on every chunk.
+    build (Callable): Takes `(chunk_size, chunk_overlap)` and returns a function
+        splitting one page `Document` into chunk `Document`s.
+    chunk_size (int): Default chunk size.
+    chunk_overlap (int): Default overlap between consecutive chunks.
+    unit (str): Unit of the size and overlap, `chars` or `tokens`.
+"""
+@dataclass
+class ChunkingStrategy:
+    name: str
+    build: Callable
+    chunk_size: int
+    chunk_overlap: int
+    unit: str = "chars"
+
+
+"""
+The strategy and parameters a document is chunked with. Stored on the
+`IngestionJob` and stamped on every chunk as `metadata["chunking"]`.
+"""
+@dataclass
+class ChunkingConfig:
+    strategy: str = "recursive"
+    chunk_size: int = 1000
+    chunk_overlap: int = 200
+
+    def to_metadata(self) -> dict:
+        return asdict(self)
+
+
+CHUNKING_STRATEGIES: dict[str, ChunkingStrategy] = {}
+
+
+"""
+Registers a chunking strategy under `name`.
+
+The decorated function receives the chunk size and overlap and returns the
+per-page split function, so any setup (e.g. building a text splitter) happens
+once per document rather than once per page.
+"""
+def register_chunking_strategy(name: str, chunk_size: int, chunk_overlap: int, unit: str = "chars"):
+    def decorator(build):
+        CHUNKING_STRATEGIES[name] = ChunkingStrategy(name, build, chunk_size, chunk_overlap, unit)
+        return build
+
+    return decorator
+
+
+def get_text_splitter(
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    length_function=len,
+    add_start_index: bool = True,
+):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=length_function,
+        add_start_index=add_start_index,
+    )
+
+
+@register_chunking_strategy("recursive", chunk_size=1000, chunk_overlap=200)
+def recursive_chunker(chunk_size: int, chunk_overlap: int):
+    text_splitter = get_text_splitter(chunk_size, chunk_overlap)
+    return lambda page: text_splitter.split_documents([page])
+
+
+"""
+Keeps each page whole as a single chunk, and falls back to the recursive
+splitter only for pages longer than `chunk_size`. Produces the fewest chunks
+for typical pages, at the cost of coarser retrieval.
+"""
+@register_chunking_strategy("page", chunk_size=4000, chunk_overlap=200)
+def page_chunker(chunk_size: int, chunk_overlap: int):
+    text_splitter = get_text_splitter(chunk_size, chunk_overlap)
+
+    def split(page: Document) -> list[Document]:
+        if not page.page_content.strip():
+            return []
+        if len(page.page_content) <= chunk_size:
+            return [
+                Document(
+                    page_content=page.page_content,
+                    metadata={**page.metadata, "start_index": 0},
+                )
+            ]
+        return text_splitter.split_documents([page])
+
+    return split
+
+
+"""
+Recursive splitting measured in estimated tokens instead of characters, so
+chunk sizes line up with the embedding and prompt budgets.
+
+`start_index` is located here rather than by the splitter, whose offset
+arithmetic assumes the overlap is measured in characters.
+"""
+@register_chunking_strategy("token", chunk_size=256, chunk_overlap=32, unit="tokens")
+def token_chunker(chunk_size: int, chunk_overlap: int):
+    text_splitter = get_text_splitter(
+        chunk_size, chunk_overlap, length_function=estimate_tokens, add_start_index=False
+    )
+
+    def split(page: Document) -> list[Document]:
+        chunks = []
+        index = -1
+        for text in text_splitter.split_text(page.page_content):
+            index = page.page_content.find(text, index + 1)
+            chunks.append(
+                Document(page_content=text, metadata={**page.metadata, "start_index": index})
+            )
+        return chunks
+
+    return split
+
+
+SENTENCE_PATTERN = re.compile(r"\S.*?(?:[.!?](?=\s|$)|$)", re.S)
+
+
+"""
+Packs whole sentences into chunks of at most `chunk_size` characters, sliding
+the window so the trailing sentences of a chunk (up to `chunk_overlap`
+characters) start the next one. Chunks never cut a sentence in half; a single
+sentence longer than `chunk_size` becomes its own chunk.
+
+Each chunk is an exact slice of the page with its `start_index`, so the context
+builder can merge overlapping windows back into the original text.
+"""
+@register_chunking_strategy("sentence-window", chunk_size=1000, chunk_overlap=200)
+def sentence_window_chunker(chunk_size: int, chunk_overlap: int):
+    def split(page: Document) -> list[Document]:
+        text = page.page_content
+        sentences = [match.span() for match in SENTENCE_PATTERN.finditer(text)]
+        chunks = []
+        first = 0
+        while first < len(sentences):
+            last = first
+            while (
+                last + 1 < len(sentences)
+                and sentences[last + 1][1] - sentences[first][0] <= chunk_size
+            ):
+                last += 1
+
+            start, end = sentences[first][0], sentences[last][1]
+            chunks.append(
+                Document(
+                    page_content=text[start:end],
+                    metadata={**page.metadata, "start_index": start},
+                )
+            )
+            if last + 1 >= len(sentences):
+                break
+
+            next_first = last + 1
+            while (
+                next_first - 1 > first
+                and end - sentences[next_first - 1][0] <= chunk_overlap
+            ):
+                next_first -= 1
+            first = next_first
+        return chunks
+
+    return split
+
+
+"""
+Resolves a chunking config, validating it against the registry.
+
+The strategy defaults to `CHUNKING_STRATEGY`. Size and overlap default to
+`CHUNK_SIZE`/`CHUNK_OVERLAP` when the strategy is the configured one, and to
+the strategy's own defaults otherwise, since the units differ between
+strategies. When only the size is given, the default overlap is capped at a
+fifth of it, so only an overlap the caller passed explicitly can be rejected.
+
+Raises:
+    ValueError: If the strategy is unknown or the parameters are invalid.
+"""
+def chunking_config(
+    strategy: str | None = None,
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+) -> ChunkingConfig:
+    default_strategy = os.getenv("CHUNKING_STRATEGY", "recursive")
+    strategy = strategy or default_strategy
+    if strategy not in CHUNKING_STRATEGIES:
+        raise ValueError(
+            f"Unknown chunking strategy {strategy!r}; expected one of {sorted(CHUNKING_STRATEGIES)}"
+        )
+
+    registered = CHUNKING_STRATEGIES[strategy]
+    default_size, default_overlap = registered.chunk_size, registered.chunk_overlap
+    if strategy == default_strategy:
+        default_size = int(os.getenv("CHUNK_SIZE", default_size))
+        default_overlap = int(os.getenv("CHUNK_OVERLAP", default_overlap))
+    if chunk_overlap is None:
+        # A default overlap must not invalidate a chunk size the caller chose.
+        chunk_overlap = (
+            min(default_overlap, chunk_size // 5) if chunk_size else default_overlap
+        )
+    chunk_size = chunk_size or default_size
+
+    if chunk_size <= 0 or not 0 <= chunk_overlap < chunk_size:
+        raise ValueError(
+            f"Invalid chunking parameters: chunk_size={chunk_size}, chunk_overlap={chunk_overlap}"
+        )
+    return ChunkingConfig(strategy, chunk_size, chunk_overlap)
+
+
+"""
+Builds the per-page split function for a config. Every chunk it returns is
+stamped with the config under `metadata["chunking"]`.
+
+Args:
+    config (ChunkingConfig, optional): Defaults to `chunking_config()`.
+
+Returns:
+    Callable[[Document], list[Document]]: Splits one page into chunks.
+"""
+def get_chunker(config: ChunkingConfig | None = None):
+    config = config or chunking_config()
+    split = CHUNKING_STRATEGIES[config.strategy].build(config.chunk_size, config.chunk_overlap)
+    metadata = config.to_metadata()
+
+    def chunker(page: Document) -> list[Document]:
+        chunks = split(page)
+        for chunk in chunks:
+            chunk.metadata["chunking"] = dict(metadata)
+        return chunks
+
+    return chunker
@@ -1,4 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from pymongo.errors import PyMongoError
 from dotenv import load_dotenv
 from beanie import init_beanie
@@ -8,27 +9,127 @@ load_dotenv()
 import os
 
 from ..utils.logger import logger
+from ..utils.metrics import mongo_command_seconds
 
 
 """
-Establishes a connection to the database using an asynchronous MongoDB client.
+Tracks connection pool activity for the shared MongoDB client.
 
-This function initializes the Beanie ODM with the specified database and document models.
-Logs a message upon successful connection or logs an error if an exception occurs.
+PyMongo does not expose pool statistics directly, so this listener keeps
+running counters from the pool events it publishes. The counters are read
+by the readiness probe to report how many connections are open and how many
+are currently checked out by requests.
+"""
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self.open_connections = 0
+        self.checked_out = 0
+        self.checkout_failures = 0
+        self.pools_cleared = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pools_cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open_connections = max(self.open_connections - 1, 0)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out = max(self.checked_out - 1, 0)
+
+    def stats(self) -> dict:
+        return {
+            "open_connections": self.open_connections,
+            "checked_out": self.checked_out,
+            "checkout_failures": self.checkout_failures,
+            "pools_cleared": self.pools_cleared,
+        }
+
+
+"""
+Records the latency of every MongoDB command in `chatpdf_mongo_command_seconds`,
+by command name (find, insert, update, ...) and outcome, from the duration the
+driver reports with each command event.
+"""
+class CommandMonitor(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_seconds.observe(
+            event.duration_micros / 1e6, command=event.command_name, outcome="succeeded"
+        )
+
+    def failed(self, event):
+        mongo_command_seconds.observe(
+            event.duration_micros / 1e6, command=event.command_name, outcome="failed"
+        )
+
+
+pool_monitor = PoolMonitor()
+command_monitor = CommandMonitor()
+_client: AsyncIOMotorClient | None = None
+
+
+"""
+Opens the shared MongoDB client and initializes Beanie once per process.
+
+Called from the FastAPI lifespan in `main.py`. Pool size and timeouts are read
+from the environment so they can be tuned per deployment without code changes.
 
 Raises:
     PyMongoError: If there is an error connecting to the MongoDB database.
     Exception: For any other exceptions that may occur during the connection process.
 """
-async def connect_to_database():
-    from ..modules import User, Chat
+async def init_database() -> AsyncIOMotorClient:
+    from ..modules import User, OTP, Chat, IngestionJob, DeletionJob
+
+    global _client
+    if _client is not None:
+        return _client
 
     try:
-        client = AsyncIOMotorClient(os.getenv("DATABASE_URI"))
+        client = AsyncIOMotorClient(
+            os.getenv("DATABASE_URI"),
+            maxPoolSize=int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+            minPoolSize=int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+            maxIdleTimeMS=int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+            connectTimeoutMS=int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000")),
+            serverSelectionTimeoutMS=int(
+                os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000")
+            ),
+            waitQueueTimeoutMS=int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+            event_listeners=[pool_monitor, command_monitor],
+        )
         await init_beanie(
-            database=client.chatPDF, document_models=[User, Chat]
+            database=client.chatPDF, document_models=[User, OTP, Chat, IngestionJob, DeletionJob]
         )
+        _client = client
         logger.info("Database connected")
+        return client
 
     except PyMongoError as e:
         logger.error(e)
@@ -37,3 +138,51 @@ async def connect_to_database():
     except Exception as e:
         logger.error(e)
         raise
+
+
+"""
+Closes the shared MongoDB client. Called from the FastAPI lifespan on shutdown.
+"""
+async def close_database():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+        logger.info("Database connection closed")
+
+
+"""
+Returns the shared MongoDB client as a FastAPI dependency.
+
+The client and the Beanie models are initialized once at startup, so this
+dependency is only a cheap lookup; it no longer opens a connection per request.
+
+Raises:
+    RuntimeError: If the database has not been initialized by the lifespan.
+"""
+async def connect_to_database() -> AsyncIOMotorClient:
+    if _client is None:
+        raise RuntimeError("Database is not initialized")
+    return _client
+
+
+"""
+Pings the database and reports the connection pool status for the readiness probe.
+
+Returns:
+    dict: `ready` is False when the client is missing or the ping fails.
+"""
+async def database_status() -> dict:
+    status = {"ready": False, "pool": pool_monitor.stats()}
+    if _client is None:
+        return status
+
+    try:
+        await _client.admin.command("ping")
+        status["ready"] = True
+    except PyMongoError as e:
+        logger.error(e)
+
+    status["pool"]["max_pool_size"] = _client.options.pool_options.max_pool_size
+    status["pool"]["min_pool_size"] = _client.options.pool_options.min_pool_size
+    return status
@@ -0,0 +1,219 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from langchain_core.documents import Document
+from pypdf import PdfReader
+from dotenv import load_dotenv
+import mmap
+import os
+
+load_dotenv()
+
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def default_workers() -> int:
+    return int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+
+
+def default_pages_per_task() -> int:
+    return int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+
+
+def parallel_min_pages() -> int:
+    return int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+
+
+"""
+Returns the process pool used for PDF text extraction, creating it on first use.
+"""
+def get_extraction_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=default_workers())
+    return _executor
+
+
+"""
+Shuts down the extraction process pool. Called from the FastAPI lifespan on shutdown.
+"""
+def shutdown_extraction_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+"""
+Memory-maps a PDF read-only for the duration of the block.
+
+`PdfReader` seeks around the file while resolving objects; reading from the
+mapping serves those reads from the page cache without a buffered copy of the
+whole file or a second file on disk.
+
+Args:
+    path (str): Path to the PDF file.
+
+Yields:
+    mmap.mmap: The read-only mapping.
+"""
+@contextmanager
+def mapped_pdf(path: str):
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+"""
+Builds the document-level metadata `PyPDFLoader` attaches to every page.
+
+The PDF info dictionary is merged over PyPDF's defaults, keys lose their
+leading slash and are lowercased, and PDF dates are converted to ISO 8601, so
+pages parsed here carry exactly the metadata of the LangChain loader.
+
+Args:
+    reader (PdfReader): The opened PDF.
+    source (str): Value of the `source` key.
+
+Returns:
+    dict: Metadata shared by all pages of the document.
+"""
+def document_metadata(reader: PdfReader, source: str) -> dict:
+    raw = (
+        {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+        | dict(reader.metadata or {})
+        | {"source": source, "total_pages": len(reader.pages)}
+    )
+
+    metadata = {}
+    for key, value in raw.items():
+        if type(value) not in (str, int):
+            value = str(value)
+        key = key.removeprefix("/").lower()
+        if key in ("creationdate", "moddate"):
+            try:
+                metadata[key] = datetime.strptime(
+                    value.replace("'", ""), "D:%Y%m%d%H%M%S%z"
+                ).isoformat("T")
+            except ValueError:
+                metadata[key] = value
+        else:
+            metadata[key] = value.strip() if isinstance(value, str) else value
+    return metadata
+
+
+"""
+Lazily parse the pages of an opened PDF stream on the calling thread.
+
+Args:
+    stream: A seekable binary stream or mapping holding the PDF, such as the
+        `SpooledTemporaryFile` behind an `UploadFile` or a `mapped_pdf`.
+    source (str): Value of the `source` metadata key.
+
+Yields:
+    Document: One document per page, with `PyPDFLoader`'s text and metadata.
+"""
+def parse_pdf_pages(stream, source: str):
+    reader = PdfReader(stream)
+    metadata = document_metadata(reader, source)
+    for i, page in enumerate(reader.pages):
+        yield Document(
+            page_content=page.extract_text(extraction_mode="plain").strip(),
+            metadata=metadata | {"page": i, "page_label": reader.page_labels[i]},
+        )
+
+
+"""
+Extracts the text of a contiguous page range. Runs inside a pool worker, so it
+re-opens the PDF from its path instead of receiving parsed objects.
+
+Args:
+    path (str): Path to the PDF file.
+    start (int): First page index (inclusive).
+    stop (int): Last page index (exclusive).
+
+Returns:
+    list: `(text, page_label)` tuples, in page order.
+"""
+def _extract_page_range(path: str, start: int, stop: int) -> list[tuple[str, str]]:
+    with mapped_pdf(path) as stream:
+        reader = PdfReader(stream)
+        return [
+            (
+                reader.pages[i].extract_text(extraction_mode="plain").strip(),
+                reader.page_labels[i],
+            )
+            for i in range(start, stop)
+        ]
+
+
+"""
+Lazily load a PDF by extracting page ranges in parallel across a process pool.
+
+The document is cut into ranges of `pages_per_task` pages that are extracted
+concurrently, then yielded back in page order. At most two ranges per worker
+are in flight at a time, so memory stays bounded even if the consumer is slower
+than extraction. Each page carries the same metadata as `parse_pdf_pages`.
+
+Args:
+    path (str): Path to the PDF file.
+    workers (int, optional): Number of workers. When given without an executor,
+        a dedicated pool of that size is used. Defaults to `PDF_EXTRACT_WORKERS`.
+    pages_per_task (int, optional): Pages per task. Defaults to `PDF_PAGES_PER_TASK`.
+    executor (ProcessPoolExecutor, optional): Pool to use instead of the shared one.
+
+Yields:
+    Document: One document per page.
+"""
+def parallel_load_document(
+    path: str,
+    workers: int | None = None,
+    pages_per_task: int | None = None,
+    executor: ProcessPoolExecutor | None = None,
+):
+    step = pages_per_task or default_pages_per_task()
+    owns_executor = executor is None and workers is not None
+    if executor is None:
+        executor = (
+            ProcessPoolExecutor(max_workers=workers)
+            if owns_executor
+            else get_extraction_executor()
+        )
+    workers = workers or default_workers()
+
+    with mapped_pdf(path) as stream:
+        metadata = document_metadata(PdfReader(stream), path)
+    total_pages = metadata["total_pages"]
+    ranges = iter(range(0, total_pages, step))
+    pending = deque()
+
+    def submit_next():
+        start = next(ranges, None)
+        if start is not None:
+            stop = min(start + step, total_pages)
+            pending.append((start, executor.submit(_extract_page_range, path, start, stop)))
+
+    try:
+        for _ in range(workers * 2):
+            submit_next()
+
+        while pending:
+            start, future = pending.popleft()
+            pages = future.result()
+            submit_next()
+
+            for offset, (text, page_label) in enumerate(pages):
+                yield Document(
+                    page_content=text,
+                    metadata=metadata | {"page": start + offset, "page_label": page_label},
+                )
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown()
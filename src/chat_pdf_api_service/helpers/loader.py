@@ -1,34 +1,75 @@
-from langchain_community.document_loaders import PyPDFLoader
 from fastapi import UploadFile
-import os
-import tempfile
+from pypdf import PdfReader
+from .extraction import (
+    default_workers,
+    mapped_pdf,
+    parallel_load_document,
+    parallel_min_pages,
+    parse_pdf_pages,
+)
+from ..utils.metrics import document_load_seconds
 
 
 """
 Load a PDF document from an uploaded file.
 
-This function reads a PDF file from an UploadFile object, temporarily saves it
-to disk, and uses the PyPDFLoader to load and parse the document. The temporary
-file is removed after loading.
+The PDF is parsed straight from the upload's `SpooledTemporaryFile`, which
+holds small uploads in memory and larger ones in a temp file Starlette already
+wrote, so the upload is not copied to another file first.
 
 Args:
     file (UploadFile): The uploaded file object containing the PDF.
 
 Returns:
-    list: A list of documents parsed from the PDF.
+    list: A list of documents parsed from the PDF, one per page.
 """
 def load_document(file: UploadFile):
-    file.file.seek(0)
+    with document_load_seconds.time():
+        file.file.seek(0)
+        return list(parse_pdf_pages(file.file, file.filename))
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tf:
-        while chunk := file.file.read(1024 * 1024):  # 1MB chunks
-            tf.write(chunk)
-        tf_path = tf.name
 
-    try:
-        loader = PyPDFLoader(tf_path)
-        docs = loader.load()
-    finally:
-        os.remove(tf_path)
+"""
+Load a PDF document that is already on disk.
+
+Args:
+    path (str): Path to the PDF file.
+
+Returns:
+    list: A list of documents parsed from the PDF, one per page.
+"""
+def load_document_from_path(path: str):
+    with document_load_seconds.time(), mapped_pdf(path) as stream:
+        return list(parse_pdf_pages(stream, path))
+
+
+"""
+Lazily load a PDF document that is already on disk, one page at a time.
+
+The file is memory-mapped and parsed in place. Pages are parsed only as the
+caller iterates, so a consumer that processes and discards each page keeps
+memory bounded regardless of the document's length. Documents with at least
+`PDF_PARALLEL_MIN_PAGES` pages are extracted across the process pool in
+`helpers/extraction.py` instead of on the calling thread.
+
+The time spent parsing, excluding the time the caller spends on each page, is
+recorded in `chatpdf_document_load_seconds` once the document is exhausted.
+
+Args:
+    path (str): Path to the PDF file.
+
+Yields:
+    Document: One document per page, with the same metadata as `load_document`.
+"""
+def lazy_load_document(path: str):
+    yield from document_load_seconds.time_iteration(_lazy_pages(path))
+
+
+def _lazy_pages(path: str):
+    with mapped_pdf(path) as stream:
+        parallel = default_workers() > 1 and len(PdfReader(stream).pages) >= parallel_min_pages()
+        if not parallel:
+            yield from parse_pdf_pages(stream, path)
+            return
 
-    return docs
+    yield from parallel_load_document(path)
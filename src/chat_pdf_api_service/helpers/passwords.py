@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from ..utils.metrics import password_hash_seconds, password_hash_rejected_total
+import asyncio
+import bcrypt
+import os
+import threading
+import time
+
+load_dotenv()
+
+
+"""
+Raised when the password hashing pool already has `PASSWORD_HASH_MAX_PENDING`
+operations queued or running. The app answers it with a 503 so a burst of
+logins is shed instead of queueing without bound.
+"""
+class PasswordHasherBusy(Exception):
+    pass
+
+
+_executor: ThreadPoolExecutor | None = None
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def bcrypt_rounds() -> int:
+    return int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+
+def default_workers() -> int:
+    return int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+
+def max_pending() -> int:
+    return int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+"""
+Returns the thread pool that runs bcrypt, creating it on first use. bcrypt
+releases the GIL while it works, so threads hash in parallel and the event
+loop keeps serving requests and websocket chats meanwhile.
+"""
+def get_password_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=default_workers(), thread_name_prefix="bcrypt"
+        )
+    return _executor
+
+
+"""
+Shuts down the password hashing pool. Called from the FastAPI lifespan on shutdown.
+"""
+def shutdown_password_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def _release(_future):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+"""
+Runs a bcrypt call on the pool and records its latency, including the time it
+waited for a worker. The slot is released when the call finishes rather than
+when its awaiter does, so cancelled requests still count until their hash is
+done.
+
+Raises:
+    PasswordHasherBusy: If `PASSWORD_HASH_MAX_PENDING` operations are pending.
+"""
+async def _run(operation: str, fn, *args):
+    global _pending
+    with _pending_lock:
+        if _pending >= max_pending():
+            password_hash_rejected_total.inc()
+            raise PasswordHasherBusy()
+        _pending += 1
+
+    started = time.perf_counter()
+    try:
+        future = get_password_executor().submit(fn, *args)
+    except BaseException:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+    try:
+        return await asyncio.wrap_future(future)
+    finally:
+        password_hash_seconds.observe(time.perf_counter() - started, operation=operation)
+
+
+"""
+Hashes a password with bcrypt at `BCRYPT_ROUNDS` rounds, off the event loop.
+
+Args:
+    password (str): The plain-text password.
+
+Returns:
+    str: The bcrypt hash.
+"""
+async def hash_password(password: str) -> str:
+    hashed = await _run(
+        "hash", bcrypt.hashpw, password.encode(), bcrypt.gensalt(rounds=bcrypt_rounds())
+    )
+    return hashed.decode()
+
+
+"""
+Checks a password against a bcrypt hash, off the event loop. The hash carries
+its own work factor, so hashes made before a `BCRYPT_ROUNDS` change still verify.
+
+Args:
+    password (str): The plain-text password.
+    hashed (str): The stored bcrypt hash.
+
+Returns:
+    bool: Whether the password matches.
+"""
+async def verify_password(password: str, hashed: str) -> bool:
+    return await _run("verify", bcrypt.checkpw, password.encode(), hashed.encode())
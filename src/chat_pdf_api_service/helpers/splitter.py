@@ -1,19 +1,67 @@
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import time
+from itertools import islice
+from .chunking import ChunkingConfig, get_chunker
+from ..utils.metrics import document_split_seconds
 
 
 """
-Splits a given document into smaller chunks using a recursive character-based text splitter.
+Splits documents into chunks with the configured chunking strategy.
 
 Args:
-    docs (str): The document to be split into smaller chunks.
+    docs (list[Document]): The pages to be split into smaller chunks.
+    config (ChunkingConfig, optional): Strategy and parameters; defaults to
+        `CHUNKING_STRATEGY`/`CHUNK_SIZE`/`CHUNK_OVERLAP`.
 
 Returns:
-    list: A list of text chunks, each with a specified maximum size and overlap.
+    list: The chunks, each tagged with `metadata["chunking"]`.
 """
-def split_doc(docs: str):
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000, chunk_overlap=200, add_start_index=True
-    )
-    
-    all_splits = text_splitter.split_documents(docs)
-    return all_splits
+def split_doc(docs, config: ChunkingConfig | None = None):
+    chunker = get_chunker(config)
+
+    with document_split_seconds.time():
+        return [chunk for doc in docs for chunk in chunker(doc)]
+
+
+"""
+Splits pages into chunks as they arrive from a lazy loader.
+
+Each page is split on its own, so only the current page and its chunks are
+held in memory. `start_index` is relative to the page the chunk came from.
+The splitting time of the whole document is recorded in
+`chatpdf_document_split_seconds`.
+
+Args:
+    pages (Iterable[Document]): Pages, typically from `lazy_load_document`.
+    config (ChunkingConfig, optional): Strategy and parameters, as in `split_doc`.
+
+Yields:
+    Document: The chunks of each page, in page order.
+"""
+def split_pages(pages, config: ChunkingConfig | None = None):
+    chunker = get_chunker(config)
+
+    elapsed = 0.0
+    try:
+        for page in pages:
+            started = time.perf_counter()
+            chunks = chunker(page)
+            elapsed += time.perf_counter() - started
+            yield from chunks
+    finally:
+        document_split_seconds.observe(elapsed)
+
+
+"""
+Groups an iterable of chunks into lists of at most `size` items.
+
+Args:
+    chunks (Iterable[Document]): The chunks to group.
+    size (int): Maximum number of chunks per batch.
+
+Yields:
+    list: Consecutive batches of chunks.
+"""
+def batch_chunks(chunks, size: int):
+    iterator = iter(chunks)
+    while batch := list(islice(iterator, size)):
+        yield batch
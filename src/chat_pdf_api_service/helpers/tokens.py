@@ -0,0 +1,8 @@
+"""
+Estimates the number of tokens in a text as characters / 4. The embedding
+scheduler budgets its tokens-per-minute limit with it, the `token` chunking
+strategy measures chunks with it and the context builder fills its prompt
+budget with it, so the three agree on what a token is.
+"""
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
@@ -1,10 +1,14 @@
 from fastapi import WebSocket
+from ..utils.metrics import websocket_connections_active, websocket_connections_total
 
 
 """
 Manages WebSocket connections, allowing for connection, disconnection, 
 and message sending to active WebSocket clients.
 
+The number of open connections and the total accepted are exported as
+`chatpdf_websocket_connections_active` and `chatpdf_websocket_connections_total`.
+
 Attributes:
     active_connections (list[WebSocket]): A list of currently active WebSocket connections.
 
@@ -23,9 +27,12 @@ class WebsocketConnectionManager:
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
+        websocket_connections_total.inc()
+        websocket_connections_active.set(len(self.active_connections))
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
+        websocket_connections_active.set(len(self.active_connections))
 
     async def send_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
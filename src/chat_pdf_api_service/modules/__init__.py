@@ -1,2 +1,2 @@
-from .rag import Chat, rag
-from .authentication import User, authentication
\ No newline at end of file
+from .rag import Chat, IngestionJob, DeletionJob, rag
+from .authentication import User, AuthenticatedUser, OTP, authentication
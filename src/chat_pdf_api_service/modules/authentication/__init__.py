@@ -1,5 +1,5 @@
 from .route import authentication
-from .model import User
+from .model import User, AuthenticatedUser, OTP
 
 
 """_summary_
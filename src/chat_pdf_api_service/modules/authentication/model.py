@@ -1,20 +1,42 @@
-from beanie import Document, before_event, Insert, Replace, Save, Indexed
+from beanie import (
+    Document,
+    PydanticObjectId,
+    before_event,
+    after_event,
+    Insert,
+    Replace,
+    Save,
+    SaveChanges,
+    Update,
+    Delete,
+    Indexed,
+)
 from datetime import datetime, timezone
-from typing import Annotated, Optional
-import bcrypt
+from typing import Annotated
 from pydantic import BaseModel
+from pymongo import ReturnDocument
+from ...services.users import get_user_cache
+from ...helpers import hash_password, generate_otp
+import os
+import pymongo
 
 
-class OTPData(BaseModel):
-    password: str
-    expiry_at: datetime
-    
+"""
+The fields of a `User` the authenticated routes need, as returned by
+`get_current_user`. Unlike the document it carries no password hash or OTP, so
+it can be cached and shared between workers.
+"""
+class AuthenticatedUser(BaseModel):
+    id: PydanticObjectId
+    fullname: str
+    email: str
+    verified: bool = False
+
 class User(Document):
     fullname: str
     email: Annotated[str, Indexed(unique=True)]
     password: str
     verified: bool = False
-    OTP_data: Optional[OTPData] = None
     created_at: datetime = None
     updated_at: datetime = None
 
@@ -22,11 +44,100 @@ class User(Document):
         name = "users"
 
     @before_event(Insert)
-    def set_timestamp_and_hash_password(self):
+    async def set_timestamp_and_hash_password(self):
         self.created_at = datetime.now(timezone.utc)
         self.updated_at = datetime.now(timezone.utc)
-        self.password = bcrypt.hashpw(self.password.encode(), bcrypt.gensalt()).decode()
+        self.password = await hash_password(self.password)
 
     @before_event(Replace, Save)
     def update_timestamp(self):
         self.updated_at = datetime.now(timezone.utc)
+
+    @after_event(Replace, Save, SaveChanges, Update, Delete)
+    async def invalidate_cached_user(self):
+        await get_user_cache().invalidate(str(self.id))
+
+
+"""
+A one-time password sent to an email address for a purpose, `verification`
+or `password_reset`. There is at most one per (email, purpose), and issuing a
+new one replaces it. The unique index on that pair serves every lookup. A TTL
+index on `expires_at` lets MongoDB delete expired codes by itself. `attempts`
+counts wrong guesses; after `OTP_MAX_ATTEMPTS` the code is discarded and a new
+one has to be requested.
+"""
+class OTP(Document):
+    email: str
+    purpose: str  # verification | password_reset
+    code: str
+    attempts: int = 0
+    expires_at: datetime
+    created_at: datetime = None
+
+    class Settings:
+        name = "otps"
+        indexes = [
+            pymongo.IndexModel(
+                [("email", pymongo.ASCENDING), ("purpose", pymongo.ASCENDING)],
+                unique=True,
+            ),
+            pymongo.IndexModel([("expires_at", pymongo.ASCENDING)], expireAfterSeconds=0),
+        ]
+
+    """
+    Generates a code for the email and purpose, replacing any previous one.
+
+    Returns:
+        str: The code to send.
+    """
+    @classmethod
+    async def issue(cls, email: str, purpose: str) -> str:
+        otp = generate_otp()
+        await cls.get_motor_collection().update_one(
+            {"email": email, "purpose": purpose},
+            {
+                "$set": {
+                    "code": otp["password"],
+                    "expires_at": otp["expiry_at"],
+                    "attempts": 0,
+                    "created_at": datetime.now(timezone.utc),
+                }
+            },
+            upsert=True,
+        )
+        return otp["password"]
+
+    """
+    Checks a code and deletes it when it matches, in one indexed
+    `find_one_and_delete`. Only a failed check costs another round trip, to
+    count the attempt and to discard a code that has expired (ahead of the TTL
+    monitor, which runs once a minute) or has run out of attempts.
+
+    Returns:
+        str: `verified`, `invalid`, `expired`, `too_many_attempts`, or
+            `missing` when no code was issued for the email and purpose.
+    """
+    @classmethod
+    async def consume(cls, email: str, purpose: str, code: str) -> str:
+        collection = cls.get_motor_collection()
+        now = datetime.now(timezone.utc)
+        max_attempts = int(os.getenv("OTP_MAX_ATTEMPTS", "5"))
+        key = {"email": email, "purpose": purpose}
+
+        if await collection.find_one_and_delete(
+            {**key, "code": code, "expires_at": {"$gt": now}, "attempts": {"$lt": max_attempts}}
+        ):
+            return "verified"
+
+        otp = await collection.find_one_and_update(
+            key, {"$inc": {"attempts": 1}}, return_document=ReturnDocument.AFTER
+        )
+        if otp is None:
+            return "missing"
+        if otp["expires_at"].replace(tzinfo=timezone.utc) <= now:
+            await collection.delete_one({"_id": otp["_id"]})
+            return "expired"
+        if otp["attempts"] >= max_attempts:
+            await collection.delete_one({"_id": otp["_id"]})
+            return "too_many_attempts"
+        return "invalid"
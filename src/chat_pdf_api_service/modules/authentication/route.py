@@ -11,17 +11,34 @@ from .schema import (
 )
 from typing import Annotated
 from ...utils import logger, connect_to_database
-from ...helpers import generate_otp, generate_tokens
+from ...helpers import generate_tokens, hash_password, verify_password
 from motor.motor_asyncio import AsyncIOMotorClient
-from .model import User
+from .model import User, OTP
 from ...dependencies import get_current_user
 from ...services import send_verification_email, send_password_reset_email
-from datetime import datetime, timezone
-import bcrypt
 
 authentication = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 
 
+OTP_ERRORS = {
+    "missing": (404, "OTP does not exist or has expired"),
+    "invalid": (400, "Invalid OTP"),
+    "expired": (400, "OTP has expired"),
+    "too_many_attempts": (429, "Too many attempts, request a new OTP"),
+}
+
+
+"""
+Consumes the OTP for the email and purpose, raising the matching HTTP error
+if it cannot be verified.
+"""
+async def consume_otp(email: str, purpose: str, code: str):
+    result = await OTP.consume(email, purpose, code)
+    if result != "verified":
+        status_code, message = OTP_ERRORS[result]
+        raise HTTPException(status_code=status_code, detail={"message": message})
+
+
 @authentication.post("/signup")
 async def signup(
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
@@ -34,17 +51,17 @@ async def signup(
             status_code=409, detail={"message": "Account already exist"}
         )
 
-    otp_data = generate_otp()
-    new_user = User(**validated_request.model_dump(mode="json"), OTP_data=otp_data)
+    new_user = User(**validated_request.model_dump(mode="json"))
+    await new_user.create()
+
+    code = await OTP.issue(new_user.email, "verification")
     background_tasks.add_task(
         send_verification_email,
         new_user.email,
         validated_request.fullname.split(" ")[0],
-        otp_data.get("password"),
+        code,
     )
 
-    await new_user.create()
-
     return JSONResponse(content={"message": "Account created"}, status_code=201)
 
 
@@ -53,18 +70,14 @@ async def verify_OTP(
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     validated_request: VerifyOTPSchema,
 ):
-    user = await User.find_one(User.OTP_data.password == validated_request.password)
-    if user is None:
-        raise HTTPException(status_code=404, detail={"message": "OTP does not exist"})
+    await consume_otp(validated_request.email, "verification", validated_request.password)
 
-    if datetime.now(timezone.utc) > user.OTP_data.expiry_at.replace(
-        tzinfo=timezone.utc
-    ):
-        user.OTP_data = None
-        await user.save()
-        raise HTTPException(status_code=400, detail={"message": "OTP has expired"})
+    user = await User.find_one(User.email == validated_request.email)
+    if user is None:
+        raise HTTPException(
+            status_code=404, detail={"message": "Account does not exist"}
+        )
 
-    user.OTP_data = None
     user.verified = True
     await user.save()
 
@@ -80,7 +93,7 @@ async def resend_verification_email(
     user = await User.find_one(User.email == validated_request.email)
     if user is None:
         raise HTTPException(
-            status_code=409, detail={"message": "Account already exist"}
+            status_code=404, detail={"message": "Account does not exist"}
         )
 
     if user.verified:
@@ -88,12 +101,12 @@ async def resend_verification_email(
             status_code=409, detail={"message": "Account already verified"}
         )
 
-    otp_data = generate_otp()
+    code = await OTP.issue(user.email, "verification")
     background_tasks.add_task(
         send_verification_email,
         user.email,
-        validated_request.fullname.split(" ")[0],
-        otp_data.get("password"),
+        user.fullname.split(" ")[0],
+        code,
     )
 
     return JSONResponse(content={"message": "Email sent"}, status_code=200)
@@ -110,10 +123,7 @@ async def login(
             status_code=404, detail={"message": "Account does not exist"}
         )
 
-    compare_password = bcrypt.checkpw(
-        validated_request.password.encode(),
-        user.password.encode(),
-    )
+    compare_password = await verify_password(validated_request.password, user.password)
     if not compare_password:
         raise HTTPException(status_code=401, detail={"message": "Invalid credentials"})
 
@@ -142,15 +152,12 @@ async def forgot_password(
             status_code=404, detail={"message": "Account does not exist"}
         )
 
-    otp_data = generate_otp()
-    user.OTP_data = otp_data
-    await user.save()
-
+    code = await OTP.issue(user.email, "password_reset")
     background_tasks.add_task(
         send_password_reset_email,
         validated_request.email,
         user.fullname.split(" ")[0],
-        otp_data.get("password"),
+        code,
     )
 
     return JSONResponse(content={"message": "Email sent"}, status_code=200)
@@ -161,21 +168,15 @@ async def reset_password(
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     validated_request: ResetPasswordSchema,
 ):
-    user = await User.find_one(User.OTP_data.password == validated_request.otp)
+    await consume_otp(validated_request.email, "password_reset", validated_request.otp)
+
+    user = await User.find_one(User.email == validated_request.email)
     if user is None:
-        raise HTTPException(status_code=404, detail={"message": "OTP does not exist"})
-
-    if datetime.now(timezone.utc) > user.OTP_data.expiry_at.replace(
-        tzinfo=timezone.utc
-    ):
-        user.OTP_data = None
-        await user.save()
-        raise HTTPException(status_code=400, detail={"message": "OTP has expired"})
-
-    user.password = bcrypt.hashpw(
-        validated_request.password.encode(), bcrypt.gensalt()
-    ).decode()
-    user.OTP_data = None
+        raise HTTPException(
+            status_code=404, detail={"message": "Account does not exist"}
+        )
+
+    user.password = await hash_password(validated_request.password)
     await user.save()
 
     return JSONResponse(
@@ -12,6 +12,7 @@ class ResendVerificationEmailSchema(BaseModel):
 
 
 class VerifyOTPSchema(BaseModel):
+    email: EmailStr
     password: str = Field(min_length=3, max_length=3)
 
 
@@ -25,6 +26,7 @@ class ForgotPasswordSchema(BaseModel):
 
 
 class ResetPasswordSchema(BaseModel):
+    email: EmailStr
     otp: str = Field(min_length=3, max_length=3)
     password: str = Field(min_length=9, max_length=256)
     confirm_password: str
@@ -1,2 +1,2 @@
 from .route import rag
-from .model import Chat
\ No newline at end of file
+from .model import Chat, IngestionJob, DeletionJob
@@ -1,5 +1,7 @@
-from beanie import Document, Link, Insert, Update, Replace, before_event, after_event
+from beanie import Document, Link, Insert, Update, Replace, Save, before_event, after_event, Indexed
 from datetime import datetime, timezone
+from typing import Annotated, Optional
+import pymongo
 from ..authentication.model import User
 
 
@@ -13,6 +15,14 @@ class Chat(Document):
 
     class Settings:
         name = "chats"
+        indexes = [
+            [
+                ("doc_id", pymongo.ASCENDING),
+                ("recipient", pymongo.ASCENDING),
+                ("created_at", pymongo.DESCENDING),
+                ("_id", pymongo.DESCENDING),
+            ],
+        ]
 
     @before_event(Insert)
     def set_timestamp(self):
@@ -22,3 +32,74 @@ class Chat(Document):
     @after_event(Update, Replace)
     def update_timestamp(self):
         self.updated_at = datetime.now(timezone.utc)
+
+
+class IngestionJob(Document):
+    doc_id: Annotated[str, Indexed(unique=True)]
+    user_id: str
+    filename: Optional[str] = None
+    file_path: str
+    host: Optional[str] = None  # host whose INGESTION_SPOOL_DIR holds file_path
+    content_hash: Optional[str] = None
+    source_doc_id: Optional[str] = None
+    chunking: Optional[dict] = None  # ChunkingConfig: strategy, chunk_size, chunk_overlap
+    status: str = "queued"  # queued | processing | completed | failed | cancelled | deleted
+    pages_parsed: int = 0
+    chunks_embedded: int = 0
+    points_upserted: int = 0
+    chunks_per_sec: Optional[float] = None
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime = None
+    updated_at: datetime = None
+
+    class Settings:
+        name = "ingestion_jobs"
+        indexes = [
+            [("status", pymongo.ASCENDING), ("created_at", pymongo.ASCENDING)],
+            [
+                ("content_hash", pymongo.ASCENDING),
+                ("status", pymongo.ASCENDING),
+                ("user_id", pymongo.ASCENDING),
+            ],
+        ]
+
+    @before_event(Insert)
+    def set_timestamp(self):
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = datetime.now(timezone.utc)
+
+    @before_event(Replace, Save)
+    def update_timestamp(self):
+        self.updated_at = datetime.now(timezone.utc)
+
+
+class DeletionJob(Document):
+    doc_id: str
+    user_id: str
+    status: str = "queued"  # queued | processing | completed | failed
+    chats_deleted: int = 0
+    points_deleted: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime = None
+    updated_at: datetime = None
+
+    class Settings:
+        name = "deletion_jobs"
+        indexes = [
+            pymongo.IndexModel(
+                [("doc_id", pymongo.ASCENDING), ("user_id", pymongo.ASCENDING)],
+                unique=True,
+            ),
+            [("status", pymongo.ASCENDING)],
+        ]
+
+    @before_event(Insert)
+    def set_timestamp(self):
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = datetime.now(timezone.utc)
+
+    @before_event(Replace, Save)
+    def update_timestamp(self):
+        self.updated_at = datetime.now(timezone.utc)
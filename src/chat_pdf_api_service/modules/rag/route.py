@@ -1,6 +1,7 @@
 from fastapi import (
     APIRouter,
     Path,
+    Query,
     UploadFile,
     Depends,
     WebSocket,
@@ -9,48 +10,200 @@ from fastapi import (
 )
 from fastapi.responses import JSONResponse
 from typing import Annotated
-from qdrant_client.http import models
 from ...dependencies import (
     FileValidator,
     get_current_user,
     get_current_user_for_websocket,
 )
-from ...helpers import load_document, split_doc, WebsocketConnectionManager
-from ...services import vector_store, graph, client
-from ...utils import logger, connect_to_database
-from ..authentication.model import User
-from .model import Chat
+from ...helpers import WebsocketConnectionManager, chunking_config
+from ...services import (
+    get_graph,
+    get_answer_cache,
+    get_async_client,
+    collection_config,
+    tenant_filter,
+    ingestion_queue,
+    deletion_queue,
+    spool_host,
+)
+from ...utils import logger, connect_to_database, set_correlation_id
+from ..authentication.model import User, AuthenticatedUser
+from .model import Chat, IngestionJob, DeletionJob
 from fastapi.security import HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+from bson import DBRef, ObjectId
+from bson.errors import InvalidId
+from datetime import datetime
 from uuid import uuid4
 import json
+import os
 
 rag = APIRouter(prefix="/api/v1/chats", tags=["Rag"])
 
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20"))
+
+
+"""
+Accept a PDF upload and queue it for background ingestion.
+
+`FileValidator` validates the upload in one streaming pass that writes it to
+the ingestion spool and fingerprints it with SHA-256; that spooled file is what
+the worker parses, so there is no second copy. An `IngestionJob` is persisted
+and the ingestion workers are notified. Parsing, embedding and upserting happen
+off the request path, so the route returns the `doc_id` and job id
+immediately. Progress can be polled from `GET /api/v1/chats/jobs/{job_id}`.
+The SHA-256 lets the worker reuse the vectors of an identical document.
 
+The optional `chunking`, `chunk_size` and `chunk_overlap` query parameters
+pick the chunking strategy for this document; the resolved settings are stored
+on the job and recorded in the metadata of every chunk.
+"""
 @rag.post("/upload")
-def upload_pdf(
+async def upload_pdf(
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     file: UploadFile,
-    validate_file: Annotated[bool, Depends(FileValidator)],
+    validate_file: Annotated[FileValidator, Depends(FileValidator)],
+    chunking: Annotated[str | None, Query()] = None,
+    chunk_size: Annotated[int | None, Query(ge=1)] = None,
+    chunk_overlap: Annotated[int | None, Query(ge=0)] = None,
 ):
-    docs = load_document(file)
-    splits = split_doc(docs)
+    try:
+        chunking_settings = chunking_config(chunking, chunk_size, chunk_overlap)
+    except ValueError as e:
+        validate_file.discard()
+        raise HTTPException(status_code=400, detail={"message": str(e)})
 
     doc_id = str(uuid4())
-    user_id = str(current_user.id)
 
-    for doc in splits:
-        doc.metadata.update({"user_id": user_id, "doc_id": doc_id})
+    job = IngestionJob(
+        doc_id=doc_id,
+        user_id=str(current_user.id),
+        filename=file.filename,
+        file_path=validate_file.path,
+        host=spool_host(),
+        content_hash=validate_file.sha256,
+        chunking=chunking_settings.to_metadata(),
+    )
+    try:
+        await job.insert()
+    except Exception:
+        validate_file.discard()
+        raise
+    ingestion_queue.notify()
+
+    return JSONResponse(
+        content={"data": {"doc_id": doc_id, "job_id": str(job.id)}},
+        status_code=202,
+    )
+
+
+@rag.get("/jobs/{job_id}")
+async def get_ingestion_job(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    job_id: Annotated[str, Path()],
+):
+    job = await IngestionJob.get(job_id) if ObjectId.is_valid(job_id) else None
+    if job is None or job.user_id != str(current_user.id):
+        raise HTTPException(status_code=404, detail={"message": "Job does not exist"})
+
+    return JSONResponse(
+        content={"data": job.model_dump(mode="json", exclude={"file_path", "host", "user_id"})},
+        status_code=200,
+    )
+
+
+"""
+Parses a history cursor, `<created_at ISO timestamp>_<chat id>`. A bare
+timestamp is accepted too, and then matches on `created_at` alone.
+
+Returns:
+    tuple: The `created_at` of the cursor and the chat id, or None.
+
+Raises:
+    HTTPException: If the cursor is malformed.
+"""
+def parse_history_cursor(cursor: str) -> tuple[datetime, ObjectId | None]:
+    created_at, _, chat_id = cursor.partition("_")
+    try:
+        return (
+            datetime.fromisoformat(created_at),
+            ObjectId(chat_id) if chat_id else None,
+        )
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail={"message": "Invalid cursor"})
+
+
+"""
+Fetch one page of a user's chats about a document, newest page first.
+
+Pages are cut with a compound cursor on (`created_at`, `_id`), so chats saved
+within the same millisecond are neither skipped nor repeated across pages.
+The compound (doc_id, recipient, created_at, _id) index on `Chat` serves it,
+so each page costs one indexed range read no matter how long the
+conversation is.
+
+Parameters:
+    doc_id (str): The document ID for which the chats are fetched.
+    user_id (ObjectId): The recipient of the chats.
+    before (str, optional): Only chats older than this cursor are returned.
+    limit (int): Maximum number of chats in the page.
+
+Returns:
+    tuple: The chats in chronological order, and the cursor of the next
+    (older) page, or None when there are no older chats.
+"""
+async def fetch_chat_history(
+    doc_id: str, user_id: ObjectId, before: str | None, limit: int
+):
+    query = {
+        "doc_id": doc_id,
+        "recipient": DBRef(User.get_collection_name(), user_id),
+    }
+    if before is not None:
+        created_at, chat_id = parse_history_cursor(before)
+        if chat_id is None:
+            query["created_at"] = {"$lt": created_at}
+        else:
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": chat_id}},
+            ]
+
+    chats = (
+        await Chat.find(query)
+        .sort(-Chat.created_at, -Chat.id)
+        .limit(limit + 1)
+        .to_list()
+    )
+    next_cursor = None
+    if len(chats) > limit:
+        chats = chats[:limit]
+        next_cursor = f"{chats[-1].created_at.isoformat()}_{chats[-1].id}"
+
+    return list(reversed(chats)), next_cursor
 
-    vector_store.add_documents(
-        documents=splits,
+
+@rag.get("/{doc_id}/history")
+async def get_chat_history(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    doc_id: Annotated[str, Path()],
+    before: Annotated[str | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = CHAT_HISTORY_PAGE_SIZE,
+):
+    chats, next_cursor = await fetch_chat_history(
+        doc_id, current_user.id, before, limit
     )
 
     return JSONResponse(
-        content={"data": {"doc_id": doc_id}},
-        status_code=201,
+        content={
+            "data": [chat.model_dump(mode="json") for chat in chats],
+            "next_cursor": next_cursor,
+        },
+        status_code=200,
     )
 
 
@@ -58,10 +211,15 @@ def upload_pdf(
 WebSocket endpoint for handling real-time chat interactions.
 
 This endpoint manages WebSocket connections for a specific document ID,
-allowing users to send and receive chat messages in real-time. It retrieves
-existing chats for the document, sends them to the client, and processes
-incoming messages to generate AI responses. The responses are streamed back
-to the client and stored in the database.
+allowing users to send and receive chat messages in real-time. On connect it
+sends the latest page of the user's chats for the document once, as
+`{"type": "history", "data": [...], "next_cursor": ...}`; older pages are
+fetched from `GET /api/v1/chats/{doc_id}/history`. It then processes incoming
+messages to generate AI responses. The responses are streamed back to the
+client, stored in the database, and only the new chat is sent afterwards as
+`{"type": "chat", "data": {...}}`. Answers to questions already asked
+about the document (exactly or near-duplicates) are replayed from the answer
+cache in the same chunked format instead of being generated again.
 
 Parameters:
     doc_id (str): The document ID for which the chat is associated.
@@ -79,31 +237,49 @@ manager = WebsocketConnectionManager()
 @rag.websocket("/ws/{doc_id}")
 async def websocket_endpoint(
     doc_id: Annotated[str, Path()],
-    current_user: Annotated[User, Depends(get_current_user_for_websocket)],
+    current_user: Annotated[AuthenticatedUser, Depends(get_current_user_for_websocket)],
     websocket: WebSocket,
 ):
+    set_correlation_id(websocket.headers.get("x-request-id") or f"ws-{uuid4().hex}")
     await manager.connect(websocket)
     try:
-        while True:
-            chats = await Chat.find(Chat.doc_id == doc_id).to_list()
-            await manager.send_message(
-                json.dumps([chat.model_dump(mode="json") for chat in chats]),
-                websocket,
-            )
+        chats, next_cursor = await fetch_chat_history(
+            doc_id, current_user.id, None, CHAT_HISTORY_PAGE_SIZE
+        )
+        await manager.send_message(
+            json.dumps(
+                {
+                    "type": "history",
+                    "data": [chat.model_dump(mode="json") for chat in chats],
+                    "next_cursor": next_cursor,
+                }
+            ),
+            websocket,
+        )
 
+        while True:
             data = await websocket.receive_text()
 
-            streamed_ai_responses = []
-            for message_chunk, metadata in graph.stream(
-                {
-                    "question": data,
-                    "doc_id": doc_id,
-                    "user_id": str(current_user.id),
-                },
-                stream_mode="messages",
-            ):
-                streamed_ai_responses.append(message_chunk.content)
-                await manager.send_message(message_chunk.content, websocket)
+            user_id = str(current_user.id)
+            answer_cache = get_answer_cache()
+            cached_answer = await answer_cache.lookup(doc_id, user_id, data)
+            if cached_answer is not None:
+                streamed_ai_responses = cached_answer
+                for chunk in cached_answer:
+                    await manager.send_message(chunk, websocket)
+            else:
+                streamed_ai_responses = []
+                async for message_chunk, metadata in get_graph().astream(
+                    {
+                        "question": data,
+                        "doc_id": doc_id,
+                        "user_id": user_id,
+                    },
+                    stream_mode="messages",
+                ):
+                    streamed_ai_responses.append(message_chunk.content)
+                    await manager.send_message(message_chunk.content, websocket)
+                await answer_cache.store(doc_id, user_id, data, streamed_ai_responses)
 
             new_chat = Chat(
                 prompt=data,
@@ -113,40 +289,96 @@ async def websocket_endpoint(
             )
 
             await new_chat.insert()
+            await manager.send_message(
+                json.dumps({"type": "chat", "data": new_chat.model_dump(mode="json")}),
+                websocket,
+            )
     except WebSocketDisconnect as e:
         logger.error(e)
-        manager.disconnect(websocket)
         raise
+    finally:
+        # Also on errors other than a disconnect, so the active connection
+        # count stays accurate.
+        manager.disconnect(websocket)
 
 
+"""
+Check whether a user has anything stored for a document: an ingestion job,
+chats, or vectors (documents uploaded before ingestion jobs existed only have
+the latter).
+"""
+async def document_exists(doc_id: str, user_id: ObjectId) -> bool:
+    if await IngestionJob.find_one({"doc_id": doc_id, "user_id": str(user_id)}):
+        return True
+    if await Chat.find_one(
+        {"doc_id": doc_id, "recipient": DBRef(User.get_collection_name(), user_id)}
+    ):
+        return True
+    result = await get_async_client().count(
+        collection_name=collection_config.collection_name,
+        count_filter=tenant_filter(str(user_id), doc_id),
+        exact=True,
+    )
+    return result.count > 0
 
 
+"""
+Accept the deletion of a document's chats and vectors.
 
+The deletion runs in the background (see `DeletionQueue`) and is tracked in a
+`DeletionJob`, so the route returns 202 as soon as it is accepted. Repeating
+the request is idempotent: it returns the existing job, and resubmits it only
+if it failed. Progress can be polled from `GET /api/v1/chats/{doc_id}/deletion`.
+"""
 @rag.delete("/{doc_id}")
 async def delete_chat_and_pdf(
     init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
     current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
     doc_id: Annotated[str, Path()],
 ):
-    chat = await Chat.find(Chat.doc_id == doc_id).delete()
-    if chat.deleted_count == 0:
-        raise HTTPException(
-            status_code=404, detail={"message": "Document does not exist"}
-        )
+    user_id = str(current_user.id)
+    job = await DeletionJob.find_one({"doc_id": doc_id, "user_id": user_id})
 
-    client.delete(
-        collection_name="chatpdf",
-        points_selector=models.FilterSelector(
-            filter=models.Filter(
-                must=[
-                    models.FieldCondition(
-                        key="metadata.doc_id", match=models.MatchValue(value=doc_id)
-                    )
-                ]
+    if job is None:
+        if not await document_exists(doc_id, current_user.id):
+            raise HTTPException(
+                status_code=404, detail={"message": "Document does not exist"}
             )
-        ),
+        job = DeletionJob(doc_id=doc_id, user_id=user_id)
+        try:
+            await job.insert()
+            deletion_queue.submit(job)
+        except DuplicateKeyError:
+            # A concurrent request recorded the deletion first.
+            job = await DeletionJob.find_one({"doc_id": doc_id, "user_id": user_id})
+    elif job.status == "failed":
+        job.status = "queued"
+        job.attempts = 0
+        await job.save()
+        deletion_queue.submit(job)
+
+    return JSONResponse(
+        content={
+            "message": "Chat and related vectors are being deleted",
+            "data": job.model_dump(mode="json", exclude={"user_id"}),
+        },
+        status_code=202,
     )
 
+
+@rag.get("/{doc_id}/deletion")
+async def get_deletion_job(
+    init_database: Annotated[AsyncIOMotorClient, Depends(connect_to_database)],
+    current_user: Annotated[HTTPAuthorizationCredentials, Depends(get_current_user)],
+    doc_id: Annotated[str, Path()],
+):
+    job = await DeletionJob.find_one({"doc_id": doc_id, "user_id": str(current_user.id)})
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail={"message": "Deletion does not exist"}
+        )
+
     return JSONResponse(
-        content={"message": "Chat and related vectors deleted"}, status_code=200
+        content={"data": job.model_dump(mode="json", exclude={"user_id"})},
+        status_code=200,
     )
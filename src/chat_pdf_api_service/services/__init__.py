@@ -1,3 +1,16 @@
-from .llm import graph
-from .qdrant import vector_store, client
-from .email import send_verification_email, send_password_reset_email
\ No newline at end of file
+from .llm import get_graph, get_llm, get_answer_cache, peek_answer_cache, context_builder
+from .qdrant import (
+    get_client,
+    get_async_client,
+    get_embedding_model,
+    peek_embedding_model,
+    ensure_collection,
+    close_clients,
+    collection_config,
+    tenant_filter,
+)
+from .email import send_verification_email, send_password_reset_email
+from .ingestion import ingestion_queue, spool_host, spool_path
+from .expiry import vector_expiry
+from .deletion import deletion_queue
+from .users import get_user_cache, peek_user_cache, close_user_cache
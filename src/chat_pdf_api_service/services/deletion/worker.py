@@ -0,0 +1,146 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from bson import DBRef, ObjectId
+from dotenv import load_dotenv
+from ..qdrant import delete_points_in_batches, tenant_filter
+from ..llm import peek_answer_cache
+from ..ingestion.worker import remove_spooled_file
+from ...utils import logger, set_correlation_id
+
+load_dotenv()
+
+
+"""
+Deletes documents in the background, tracking each deletion in a `DeletionJob`.
+
+The delete route only records the job and submits it here, so it returns as
+soon as the deletion is accepted. A job first cancels the document's queued
+ingestion (waiting for one that is already running, so it cannot write points
+after the delete), then removes the user's chats about the document and its
+cached answers, deletes its vectors in batches through the async Qdrant
+client, and finally marks its ingestion job as deleted. Every step is idempotent: a failed job can be resubmitted, and
+jobs interrupted by a restart are resumed by `start`.
+
+Attributes:
+    batch_size (int): Points deleted per Qdrant request.
+    poll_interval (float): Seconds between checks for a running ingestion.
+    max_attempts (int): Attempts before a job is left as failed.
+"""
+class DeletionQueue:
+    def __init__(self):
+        self.batch_size = int(os.getenv("DELETION_BATCH_SIZE", "1000"))
+        self.poll_interval = float(os.getenv("DELETION_POLL_INTERVAL", "2"))
+        self.max_attempts = int(os.getenv("DELETION_MAX_ATTEMPTS", "3"))
+        self._tasks: set[asyncio.Task] = set()
+
+    async def start(self):
+        from ...modules import DeletionJob
+
+        pending = await DeletionJob.find(
+            {"status": {"$in": ["queued", "processing"]}}
+        ).to_list()
+        for job in pending:
+            self.submit(job)
+        if pending:
+            logger.info(f"Resumed {len(pending)} document deletions")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def submit(self, job):
+        task = asyncio.create_task(self._process(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    """
+    Cancels the document's queued ingestion and waits for a running one to
+    finish. A running job that fails is put back in the queue, so both states
+    are checked on every pass until neither remains.
+    """
+    async def _cancel_ingestion(self, doc_id: str):
+        from ...modules import IngestionJob
+
+        collection = IngestionJob.get_motor_collection()
+        while True:
+            await collection.update_many(
+                {"doc_id": doc_id, "status": "queued"}, {"$set": {"status": "cancelled"}}
+            )
+            pending = await collection.find_one(
+                {"doc_id": doc_id, "status": {"$in": ["queued", "processing"]}}
+            )
+            if pending is None:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+    """
+    Marks the document's ingestion as deleted once its data is gone, so its job
+    no longer reports it as completed and is never used as a duplicate source,
+    and removes its spooled upload if it was never ingested.
+    """
+    async def _mark_ingestion_deleted(self, doc_id: str):
+        from ...modules import IngestionJob
+
+        collection = IngestionJob.get_motor_collection()
+        async for ingestion in collection.find({"doc_id": doc_id}):
+            remove_spooled_file(ingestion["file_path"])
+        await collection.update_many(
+            {"doc_id": doc_id},
+            {"$set": {"status": "deleted", "updated_at": datetime.now(timezone.utc)}},
+        )
+
+    async def _process(self, job):
+        from ...modules import Chat, User
+
+        set_correlation_id(f"deletion-{job.doc_id}")
+        job.status = "processing"
+        job.attempts += 1
+        job.error = None
+        await job.save()
+
+        try:
+            await self._cancel_ingestion(job.doc_id)
+
+            result = await Chat.find(
+                {
+                    "doc_id": job.doc_id,
+                    "recipient": DBRef(User.get_collection_name(), ObjectId(job.user_id)),
+                }
+            ).delete()
+            job.chats_deleted += result.deleted_count if result else 0
+            # The answer cache lives in memory, so one that was never built
+            # holds nothing to invalidate and is not built (with its Gemini
+            # client) just for this.
+            answer_cache = peek_answer_cache()
+            if answer_cache is not None:
+                answer_cache.invalidate(job.doc_id, job.user_id)
+
+            async for deleted in delete_points_in_batches(
+                tenant_filter(job.user_id, job.doc_id), self.batch_size
+            ):
+                job.points_deleted += deleted
+                await job.save()
+
+            await self._mark_ingestion_deleted(job.doc_id)
+            job.status = "completed"
+            await job.save()
+            logger.info(
+                f"Deleted document {job.doc_id} ({job.chats_deleted} chats, "
+                f"{job.points_deleted} points)"
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Deletion of document {job.doc_id} failed: {e}")
+            job.error = str(e)
+            job.status = "queued" if job.attempts < self.max_attempts else "failed"
+            await job.save()
+            if job.status == "queued":
+                await asyncio.sleep(self.poll_interval)
+                self.submit(job)
+
+
+deletion_queue = DeletionQueue()
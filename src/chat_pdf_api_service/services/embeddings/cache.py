@@ -0,0 +1,180 @@
+from array import array
+from collections import OrderedDict
+from langchain_core.embeddings import Embeddings
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+
+"""
+A persistent embedding store backed by a local SQLite file.
+
+Vectors are stored as packed doubles keyed by the cache key. Every read
+refreshes `accessed_at`, and once the store holds more than `max_entries`
+vectors the least recently used tenth is evicted in one statement.
+
+Attributes:
+    path (str): Path to the SQLite file. Parent directories are created.
+    max_entries (int): Maximum number of vectors kept on disk.
+"""
+class DiskEmbeddingStore:
+    def __init__(self, path: str, max_entries: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)"
+        )
+        self._connection.commit()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            rows = self._connection.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                batch,
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = array("d", blob).tolist()
+
+        if found:
+            now = time.time()
+            self._connection.executemany(
+                "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+            self._connection.commit()
+        return found
+
+    def set_many(self, items: dict[str, list[float]]):
+        now = time.time()
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, accessed_at) VALUES (?, ?, ?)",
+            [(key, array("d", vector).tobytes(), now) for key, vector in items.items()],
+        )
+        (count,) = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        if count > self.max_entries:
+            evict = count - self.max_entries + self.max_entries // 10
+            self._connection.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY accessed_at LIMIT ?)",
+                (evict,),
+            )
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+
+"""
+An `Embeddings` wrapper that caches vectors per (model, task, text hash).
+
+Lookups go through an in-process LRU tier first and an optional persistent
+tier second; only texts missing from both are sent to the wrapped model, in a
+single call, and the results are written back to both tiers. Document and
+query embeddings are cached separately because providers such as Gemini embed
+them with different task types.
+
+Attributes:
+    embeddings (Embeddings): The wrapped embedding model.
+    model_name (str): Model identifier used in the cache key.
+    max_entries (int): Maximum number of vectors kept in memory.
+    store (DiskEmbeddingStore, optional): Persistent tier.
+    hits (int): Lookups served from memory.
+    disk_hits (int): Lookups served from the persistent tier.
+    misses (int): Lookups that required an API call.
+"""
+class CachedEmbeddings(Embeddings):
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        max_entries: int = 10000,
+        store: DiskEmbeddingStore | None = None,
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.store = store
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, task: str, text: str) -> str:
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        return f"{self.model_name}:{task}:{digest}"
+
+    def _remember(self, key: str, vector: list[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+            self.hits += len(found)
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if self.store is not None and missing:
+                from_disk = self.store.get_many(missing)
+                self.disk_hits += len(from_disk)
+                for key, vector in from_disk.items():
+                    self._remember(key, vector)
+                found.update(from_disk)
+        return found
+
+    def _save(self, computed: dict[str, list[float]]):
+        with self._lock:
+            self.misses += len(computed)
+            for key, vector in computed.items():
+                self._remember(key, vector)
+            if self.store is not None and computed:
+                self.store.set_many(computed)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [self._key("document", text) for text in texts]
+        found = self._lookup(keys)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._save(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = self._key("query", text)
+        found = self._lookup([key])
+        if key in found:
+            return found[key]
+
+        vector = self.embeddings.embed_query(text)
+        self._save({key: vector})
+        return vector
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone, timedelta
+from dotenv import load_dotenv
+import pymongo
+from ..qdrant import delete_points_in_batches, INGESTED_AT_FIELD
+from ...utils import logger
+
+load_dotenv()
+
+CHAT_TTL_INDEX = "created_at_ttl"
+
+
+"""
+Expires vectors and chats older than the retention window.
+
+Every point carries the time it was written in `metadata.ingested_at`, which
+has a datetime payload index (see `provisioning.py`). A background task wakes
+up every `interval_seconds` and deletes the points ingested before the cutoff
+with `delete_points_in_batches`, `batch_size` points per request, so a large
+backlog is reclaimed in bounded requests instead of one huge filtered delete.
+Points written before timestamps were stamped have no `ingested_at` and are
+left alone.
+
+Chats are expired by MongoDB itself, through a TTL index on `Chat.created_at`
+kept in line with the same retention window by `ensure_chat_ttl_index`.
+
+Attributes:
+    retention_hours (float): Age after which vectors and chats are removed.
+        0 disables expiry.
+    interval_seconds (float): Seconds between expiry runs.
+    batch_size (int): Points deleted per request.
+    runs (int): Completed expiry runs.
+    points_reclaimed (int): Points deleted since startup.
+    last_run (dict): Cutoff, reclaimed points, duration and error of the last run.
+"""
+class VectorExpiryJob:
+    def __init__(self):
+        self.retention_hours = float(os.getenv("VECTOR_RETENTION_HOURS", "24"))
+        self.interval_seconds = float(os.getenv("VECTOR_EXPIRY_INTERVAL_SECONDS", "3600"))
+        self.batch_size = int(os.getenv("VECTOR_EXPIRY_BATCH_SIZE", "1000"))
+        self.runs = 0
+        self.points_reclaimed = 0
+        self.last_run = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_hours > 0
+
+    async def start(self):
+        try:
+            await self.ensure_chat_ttl_index()
+        except Exception as e:
+            logger.warning(f"Could not update the chat TTL index: {e}")
+
+        if self.enabled:
+            self._task = asyncio.create_task(self._run())
+            logger.info(
+                f"Vector expiry started (retention {self.retention_hours}h, "
+                f"every {self.interval_seconds}s)"
+            )
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.expire()
+            await asyncio.sleep(self.interval_seconds)
+
+    """
+    Creates, updates or drops the TTL index on `Chat.created_at` so chats
+    expire after the retention window.
+    """
+    async def ensure_chat_ttl_index(self):
+        from ...modules import Chat
+
+        collection = Chat.get_motor_collection()
+        current = (await collection.index_information()).get(CHAT_TTL_INDEX)
+        expire_after = int(self.retention_hours * 3600)
+
+        if not self.enabled:
+            if current is not None:
+                await collection.drop_index(CHAT_TTL_INDEX)
+        elif current is None:
+            await collection.create_index(
+                [("created_at", pymongo.ASCENDING)],
+                name=CHAT_TTL_INDEX,
+                expireAfterSeconds=expire_after,
+            )
+        elif current.get("expireAfterSeconds") != expire_after:
+            await collection.database.command(
+                {
+                    "collMod": collection.name,
+                    "index": {"name": CHAT_TTL_INDEX, "expireAfterSeconds": expire_after},
+                }
+            )
+
+    """
+    Deletes every point ingested before the retention cutoff.
+
+    Returns:
+        int: The number of points deleted. Errors are logged and recorded in
+        `last_run`; the next run picks up where this one stopped.
+    """
+    async def expire(self) -> int:
+        from qdrant_client import models
+
+        started = time.perf_counter()
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=self.retention_hours)
+        expired = models.Filter(
+            must=[models.FieldCondition(key=INGESTED_AT_FIELD, range=models.DatetimeRange(lt=cutoff))]
+        )
+        reclaimed = 0
+        error = None
+        try:
+            async for deleted in delete_points_in_batches(expired, self.batch_size):
+                reclaimed += deleted
+                self.points_reclaimed += deleted
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Vector expiry failed after reclaiming {reclaimed} points: {e}")
+
+        self.runs += 1
+        self.last_run = {
+            "cutoff": cutoff.isoformat(),
+            "points_reclaimed": reclaimed,
+            "duration_seconds": round(time.perf_counter() - started, 3),
+            "error": error,
+        }
+        if reclaimed:
+            logger.info(f"Vector expiry reclaimed {reclaimed} points ingested before {cutoff.isoformat()}")
+        return reclaimed
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "retention_hours": self.retention_hours,
+            "runs": self.runs,
+            "points_reclaimed": self.points_reclaimed,
+            "last_run": self.last_run,
+        }
+
+
+vector_expiry = VectorExpiryJob()
@@ -0,0 +1,2 @@
+from .worker import ingestion_queue, spool_host, spool_path
+from .scheduler import EmbeddingScheduler, RateLimiter, SchedulerStats
@@ -0,0 +1,255 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from ...helpers import estimate_tokens
+from ...utils.metrics import embedding_batch_seconds, vector_upsert_seconds
+
+
+"""
+An async token bucket for a requests-per-minute and tokens-per-minute budget.
+
+Both buckets refill continuously. A limit of 0 disables that bucket. Requests
+larger than the whole token budget are let through once the bucket is full,
+so a single oversized batch cannot block forever.
+"""
+class RateLimiter:
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(
+            self.requests_per_minute,
+            self._requests + elapsed * self.requests_per_minute / 60,
+        )
+        self._tokens = min(
+            self.tokens_per_minute,
+            self._tokens + elapsed * self.tokens_per_minute / 60,
+        )
+
+    async def acquire(self, tokens: int):
+        async with self._lock:
+            while True:
+                self._refill()
+                tokens_needed = min(tokens, self.tokens_per_minute)
+                request_wait = (
+                    (1 - self._requests) * 60 / self.requests_per_minute
+                    if self.requests_per_minute and self._requests < 1
+                    else 0
+                )
+                token_wait = (
+                    (tokens_needed - self._tokens) * 60 / self.tokens_per_minute
+                    if self.tokens_per_minute and self._tokens < tokens_needed
+                    else 0
+                )
+                if request_wait <= 0 and token_wait <= 0:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens_needed
+                    return
+                await asyncio.sleep(max(request_wait, token_wait))
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if status == 429:
+        return True
+    message = str(error)
+    return (
+        type(error).__name__ == "ResourceExhausted"
+        or "429" in message
+        or "RESOURCE_EXHAUSTED" in message
+    )
+
+
+@dataclass
+class SchedulerStats:
+    chunks_embedded: int = 0
+    points_upserted: int = 0
+    batches: int = 0
+    retries: int = 0
+    embed_seconds: float = 0.0
+    upsert_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        if not self.elapsed_seconds:
+            return 0.0
+        return round(self.points_upserted / self.elapsed_seconds, 2)
+
+
+"""
+Embeds chunk batches with bounded concurrency and pipelines them into upserts.
+
+Up to `concurrency` batches are embedded at once while a single consumer
+upserts finished batches, so the vector store write for one batch overlaps
+with embedding the next ones. Every embedding call first takes its share of
+the requests/tokens-per-minute budget from the `RateLimiter`, and calls that
+fail with a rate-limit error (HTTP 429 / RESOURCE_EXHAUSTED) are retried with
+exponential backoff and jitter.
+
+The embedding provider and the upsert function are injected, so the scheduler
+can be driven with a fake provider in benchmarks.
+
+Attributes:
+    embeddings (Embeddings): Provider used for `aembed_documents`.
+    upsert (Callable): `async (documents, vectors) -> None` writing one batch.
+    concurrency (int): Maximum number of batches being embedded at once.
+    limiter (RateLimiter): Requests/tokens-per-minute budget.
+    max_retries (int): Retries of a batch after rate-limit errors.
+    backoff_seconds (float): Base delay of the exponential backoff.
+"""
+class EmbeddingScheduler:
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        upsert: Callable[[list[Document], list[list[float]]], Awaitable[None]],
+        concurrency: int = 4,
+        limiter: RateLimiter | None = None,
+        max_retries: int = 5,
+        backoff_seconds: float = 1.0,
+    ):
+        self.embeddings = embeddings
+        self.upsert = upsert
+        self.concurrency = concurrency
+        self.limiter = limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+
+    async def _embed(self, batch: list[Document], stats: SchedulerStats):
+        texts = [doc.page_content for doc in batch]
+        tokens = sum(estimate_tokens(text) for text in texts)
+
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(tokens)
+            started = time.perf_counter()
+            try:
+                vectors = await self.embeddings.aembed_documents(texts)
+                elapsed = time.perf_counter() - started
+                stats.embed_seconds += elapsed
+                embedding_batch_seconds.observe(elapsed)
+                return vectors
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                stats.retries += 1
+                delay = self.backoff_seconds * 2**attempt
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    """
+    Runs the pipeline until `batches` is exhausted.
+
+    Args:
+        batches (Iterable[list[Document]]): Chunk batches. A plain iterator is
+            advanced in a worker thread, so lazy PDF parsing stays off the loop.
+        on_progress (Callable, optional): `async (stats) -> None` called after
+            every upserted batch.
+
+    Returns:
+        SchedulerStats: Counters and timings, including chunks/sec.
+    """
+    async def run(
+        self,
+        batches: Iterable[list[Document]],
+        on_progress: Callable[[SchedulerStats], Awaitable[None]] | None = None,
+    ) -> SchedulerStats:
+        stats = SchedulerStats()
+        started = time.perf_counter()
+        embedded: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks: set[asyncio.Task] = set()
+        errors: list[BaseException] = []
+
+        async def embed(batch):
+            try:
+                vectors = await self._embed(batch, stats)
+                stats.chunks_embedded += len(batch)
+                await embedded.put((batch, vectors))
+            except Exception as e:
+                # Raised from `run`; re-raising here would leave it unretrieved
+                # once the finished task is discarded.
+                errors.append(e)
+            finally:
+                slots.release()
+
+        async def upsert_loop():
+            while (item := await embedded.get()) is not None:
+                if errors:
+                    # Keep draining so embedding tasks never block on a full queue.
+                    continue
+                batch, vectors = item
+                try:
+                    upsert_started = time.perf_counter()
+                    await self.upsert(batch, vectors)
+                    elapsed = time.perf_counter() - upsert_started
+                    stats.upsert_seconds += elapsed
+                    vector_upsert_seconds.observe(elapsed)
+                    stats.points_upserted += len(batch)
+                    stats.batches += 1
+                    if on_progress is not None:
+                        await on_progress(stats)
+                except Exception as e:
+                    errors.append(e)
+
+        iterator = iter(batches)
+        idle = threading.Event()
+        idle.set()
+
+        def advance():
+            try:
+                return next(iterator, None)
+            finally:
+                idle.set()
+
+        async def next_batch():
+            idle.clear()
+            return await asyncio.to_thread(advance)
+
+        upserter = asyncio.create_task(upsert_loop())
+        try:
+            while batch := await next_batch():
+                await slots.acquire()
+                if errors:
+                    slots.release()
+                    raise errors[0]
+
+                task = asyncio.create_task(embed(batch))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            await asyncio.gather(*tasks)
+            await embedded.put(None)
+            await upserter
+            if errors:
+                raise errors[0]
+        except BaseException:
+            upserter.cancel()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(upserter, *tasks, return_exceptions=True)
+            raise
+        finally:
+            if hasattr(iterator, "close"):
+                # A cancelled `to_thread` leaves `next` running in its worker
+                # thread; closing the generator before it returns would raise
+                # "generator already executing" over the original error.
+                if not idle.is_set():
+                    await asyncio.to_thread(idle.wait)
+                iterator.close()
+
+        stats.elapsed_seconds = time.perf_counter() - started
+        return stats
@@ -0,0 +1,387 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timezone, timedelta
+from uuid import uuid4
+from dotenv import load_dotenv
+from pymongo import ReturnDocument
+from ..qdrant import (
+    collection_config,
+    get_client,
+    get_embedding_model,
+    tenant_filter,
+    tenant_metadata,
+)
+from .scheduler import EmbeddingScheduler, RateLimiter
+from ...helpers import (
+    lazy_load_document,
+    split_pages,
+    batch_chunks,
+    ChunkingConfig,
+    chunking_config,
+)
+from ...utils import logger, set_correlation_id
+
+load_dotenv()
+
+
+"""
+Raised when a claimed job's spooled upload is not on this host's disk. Retrying
+cannot bring the file back, so the job fails without using up its attempts.
+"""
+class SpoolFileMissing(Exception):
+    pass
+
+
+"""
+A Mongo-backed queue that ingests uploaded PDFs in the background.
+
+Upload requests only persist the file to the spool directory and insert an
+`IngestionJob`; a bounded set of worker coroutines claims queued jobs with an
+atomic `find_one_and_update` and streams pages through parsing and splitting
+into the `EmbeddingScheduler`, which embeds and upserts fixed-size batches off
+the request path. Progress counters on
+the job are updated after every upserted batch, and the job's `updated_at`
+doubles as a lease: jobs left in `processing` for longer than the lease (e.g.
+after a crash or restart) are put back on the queue.
+
+Uploads are spooled to `INGESTION_SPOOL_DIR`, which every process claiming
+from the queue must be able to read: a shared volume when the API runs on
+several hosts, or `INGESTION_PIN_TO_HOST=true` so each host only claims the
+jobs it spooled. A job whose file is missing fails at once instead of using up
+its attempts.
+
+Attributes:
+    workers (int): Number of worker coroutines draining the queue.
+    batch_size (int): Number of chunks embedded and upserted per batch.
+    max_attempts (int): Attempts before a job is marked as failed.
+    lease_seconds (int): How long a job may stay in `processing` without progress.
+    poll_interval (float): Seconds between queue polls when nothing is notified.
+    dedup_across_users (bool): Reuse vectors of identical PDFs ingested by other
+        users, not only by the uploader.
+    embed_concurrency (int): Batches of one job being embedded at once.
+    limiter (RateLimiter): Requests/tokens-per-minute budget for the embedding API.
+    host (str): Name recorded on the jobs spooled by this process.
+    pin_to_host (bool): Only claim jobs spooled by this host (or by no known host).
+"""
+class IngestionQueue:
+    def __init__(self):
+        self.workers = int(os.getenv("INGESTION_WORKERS", "2"))
+        self.batch_size = int(os.getenv("INGESTION_BATCH_SIZE", "64"))
+        self.max_attempts = int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+        self.lease_seconds = int(os.getenv("INGESTION_JOB_LEASE_SECONDS", "600"))
+        self.poll_interval = float(os.getenv("INGESTION_POLL_INTERVAL", "5"))
+        self.dedup_across_users = (
+            os.getenv("INGESTION_DEDUP_ACROSS_USERS", "false").lower() == "true"
+        )
+        self.embed_concurrency = int(os.getenv("INGESTION_EMBED_CONCURRENCY", "4"))
+        # Shared by every job so the embedding API budget is global to the process.
+        self.limiter = RateLimiter(
+            requests_per_minute=int(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "1500")),
+            tokens_per_minute=int(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "0")),
+        )
+        self.host = spool_host()
+        self.pin_to_host = os.getenv("INGESTION_PIN_TO_HOST", "false").lower() == "true"
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        await self.requeue_stale_jobs()
+        for i in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._run(i)))
+        logger.info(f"Ingestion queue started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def requeue_stale_jobs(self):
+        from ...modules import IngestionJob
+
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+        result = await IngestionJob.get_motor_collection().update_many(
+            {"status": "processing", "updated_at": {"$lt": stale_before}},
+            {"$set": {"status": "queued"}},
+        )
+        if result.modified_count:
+            logger.info(f"Requeued {result.modified_count} stale ingestion jobs")
+
+    async def _claim(self):
+        from ...modules import IngestionJob
+
+        query = {"status": "queued"}
+        if self.pin_to_host:
+            query["host"] = {"$in": [self.host, None]}
+        raw = await IngestionJob.get_motor_collection().find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": "processing",
+                    "updated_at": datetime.now(timezone.utc),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if raw is None:
+            return None
+        return await IngestionJob.get(raw["_id"])
+
+    async def _run(self, worker_id: int):
+        while True:
+            try:
+                job = await self._claim()
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(
+                            self._wakeup.wait(), timeout=self.poll_interval
+                        )
+                    except asyncio.TimeoutError:
+                        await self.requeue_stale_jobs()
+                    continue
+
+                await self._process(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ingestion worker {worker_id} error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _process(self, job):
+        set_correlation_id(f"ingestion-{job.doc_id}")
+        try:
+            if job.attempts > 1:
+                # A previous attempt may have upserted part of the document.
+                await asyncio.to_thread(delete_document_points, job.doc_id, job.user_id)
+                job.chunks_embedded = 0
+                job.points_upserted = 0
+
+            if job.chunking is None:
+                job.chunking = chunking_config().to_metadata()
+            if await self._reuse_duplicate(job):
+                return
+            if not os.path.exists(job.file_path):
+                raise SpoolFileMissing(
+                    f"Spooled upload {job.file_path} not found on {self.host}"
+                    + (f" (spooled on {job.host})" if job.host else "")
+                )
+
+            pages_parsed = 0
+            chunking = ChunkingConfig(**job.chunking)
+
+            def count_pages(pages):
+                nonlocal pages_parsed
+                for page in pages:
+                    pages_parsed += 1
+                    yield page
+
+            def tag_chunks(chunks):
+                for doc in chunks:
+                    tenant_metadata(doc.metadata, job.user_id, job.doc_id)
+                    yield doc
+
+            async def save_progress(stats):
+                job.pages_parsed = pages_parsed
+                job.chunks_embedded = stats.chunks_embedded
+                job.points_upserted = stats.points_upserted
+                await job.save()
+
+            # Pages are parsed, split, embedded and upserted one batch at a time so
+            # peak memory stays bounded by the batch size, not the document size.
+            batches = batch_chunks(
+                tag_chunks(
+                    split_pages(count_pages(lazy_load_document(job.file_path)), chunking)
+                ),
+                self.batch_size,
+            )
+            scheduler = EmbeddingScheduler(
+                embeddings=get_embedding_model(),
+                upsert=upsert_points,
+                concurrency=self.embed_concurrency,
+                limiter=self.limiter,
+                max_retries=int(os.getenv("EMBEDDING_MAX_RETRIES", "5")),
+                backoff_seconds=float(os.getenv("EMBEDDING_BACKOFF_SECONDS", "1")),
+            )
+            stats = await scheduler.run(batches, on_progress=save_progress)
+
+            job.pages_parsed = pages_parsed
+            job.chunks_embedded = stats.chunks_embedded
+            job.points_upserted = stats.points_upserted
+            job.chunks_per_sec = stats.chunks_per_sec
+            job.status = "completed"
+            job.error = None
+            await job.save()
+            remove_spooled_file(job.file_path)
+            logger.info(
+                f"Ingested document {job.doc_id} ({job.points_upserted} points, "
+                f"{job.chunks_per_sec} chunks/sec, {stats.retries} rate-limit retries)"
+            )
+
+        except Exception as e:
+            logger.error(f"Ingestion of document {job.doc_id} failed: {e}")
+            job.error = str(e)
+            if isinstance(e, SpoolFileMissing) or job.attempts >= self.max_attempts:
+                job.status = "failed"
+                remove_spooled_file(job.file_path)
+            else:
+                job.status = "queued"
+                self.notify()
+            await job.save()
+
+    async def _find_duplicate(self, job):
+        from ...modules import IngestionJob
+
+        if job.content_hash is None:
+            return None
+
+        query = {
+            "content_hash": job.content_hash,
+            "status": "completed",
+            "doc_id": {"$ne": job.doc_id},
+            # Vectors are only reusable if they were chunked the same way.
+            "chunking": job.chunking,
+        }
+        if not self.dedup_across_users:
+            query["user_id"] = job.user_id
+
+        return await IngestionJob.find_one(query, sort=[("created_at", -1)])
+
+    """
+    Completes the job by copying the points of an identical, already ingested
+    PDF under the new `doc_id`/`user_id`, skipping parsing and the embedding API.
+
+    Returns:
+        bool: False when there is no duplicate or its points are gone (e.g.
+        the source document was deleted), so the caller ingests from scratch.
+    """
+    async def _reuse_duplicate(self, job) -> bool:
+        source = await self._find_duplicate(job)
+        if source is None:
+            return False
+
+        copied = await asyncio.to_thread(
+            clone_document_points, source.doc_id, source.user_id, job.doc_id, job.user_id
+        )
+        if copied == 0:
+            return False
+
+        job.source_doc_id = source.doc_id
+        job.pages_parsed = source.pages_parsed
+        job.points_upserted = copied
+        job.status = "completed"
+        job.error = None
+        await job.save()
+        remove_spooled_file(job.file_path)
+        logger.info(
+            f"Reused {copied} points of document {source.doc_id} for {job.doc_id}"
+        )
+        return True
+
+
+"""
+Copies every point of `source_doc_id` (owned by `source_user_id`) to new points
+owned by `doc_id` and `user_id`, keeping the stored vectors so nothing is
+re-embedded. The copies get a fresh `ingested_at`, so they expire on their own
+schedule rather than the source's.
+
+Returns:
+    int: The number of points copied.
+"""
+def clone_document_points(
+    source_doc_id: str, source_user_id: str, doc_id: str, user_id: str
+) -> int:
+    from qdrant_client.http import models
+
+    client = get_client()
+    copied = 0
+    offset = None
+    while True:
+        records, offset = client.scroll(
+            collection_name=collection_config.collection_name,
+            scroll_filter=tenant_filter(source_user_id, source_doc_id),
+            limit=256,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if records:
+            points = []
+            ingested_at = datetime.now(timezone.utc).isoformat()
+            for record in records:
+                payload = dict(record.payload)
+                payload["metadata"] = tenant_metadata(
+                    dict(payload.get("metadata", {})), user_id, doc_id
+                )
+                payload["metadata"]["ingested_at"] = ingested_at
+                points.append(
+                    models.PointStruct(
+                        id=uuid4().hex, vector=record.vector, payload=payload
+                    )
+                )
+            client.upsert(collection_name=collection_config.collection_name, points=points)
+            copied += len(points)
+
+        if offset is None:
+            return copied
+
+
+"""
+Writes one batch of embedded chunks to Qdrant, using the same payload layout as
+`QdrantVectorStore` so documents read back identically in `retrieve`. Each
+point is stamped with `metadata.ingested_at` for the expiry job.
+"""
+async def upsert_points(documents: list, vectors: list[list[float]]):
+    from qdrant_client.http import models
+
+    ingested_at = datetime.now(timezone.utc).isoformat()
+    points = [
+        models.PointStruct(
+            id=uuid4().hex,
+            vector=vector,
+            payload={
+                "page_content": doc.page_content,
+                "metadata": {**doc.metadata, "ingested_at": ingested_at},
+            },
+        )
+        for doc, vector in zip(documents, vectors)
+    ]
+    await asyncio.to_thread(get_client().upsert, collection_name=collection_config.collection_name, points=points)
+
+
+def delete_document_points(doc_id: str, user_id: str):
+    from qdrant_client.http import models
+
+    get_client().delete(
+        collection_name=collection_config.collection_name,
+        points_selector=models.FilterSelector(filter=tenant_filter(user_id, doc_id)),
+    )
+
+
+def remove_spooled_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+"""
+Names this host on the jobs it spools, for `INGESTION_PIN_TO_HOST`. Set
+`INGESTION_HOST` to a name that survives restarts when the hostname does not
+(e.g. a container id).
+"""
+def spool_host() -> str:
+    return os.getenv("INGESTION_HOST") or socket.gethostname()
+
+
+def spool_path(doc_id: str) -> str:
+    return os.path.join(os.getenv("INGESTION_SPOOL_DIR", "uploads"), f"{doc_id}.pdf")
+
+
+ingestion_queue = IngestionQueue()
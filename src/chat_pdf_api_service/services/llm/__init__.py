@@ -1 +1,3 @@
-from .gemini import graph
\ No newline at end of file
+from .gemini import get_graph, get_llm
+from .answer_cache import get_answer_cache, peek_answer_cache
+from .context import context_builder, ContextBuilder
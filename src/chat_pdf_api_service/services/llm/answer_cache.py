@@ -0,0 +1,210 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from langchain_core.embeddings import Embeddings
+from dotenv import load_dotenv
+from ..qdrant import get_embedding_model
+import asyncio
+import math
+import os
+import re
+import time
+
+load_dotenv()
+
+
+def normalize_question(question: str) -> str:
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.strip(" ?!.")
+
+
+def cosine_similarity(a: list[float], b: list[float], norm_a: float, norm_b: float) -> float:
+    if not norm_a or not norm_b:
+        return 0.0
+    return sum(x * y for x, y in zip(a, b)) / (norm_a * norm_b)
+
+
+"""
+Finds the cached question most similar to `embedding`, at or above `threshold`.
+
+Args:
+    embedding (list[float]): Embedding of the asked question.
+    norm (float): Its Euclidean norm.
+    candidates (list[tuple[str, list[float], float]]): Cached questions with
+        their embeddings and norms.
+    threshold (float): Minimum cosine similarity.
+
+Returns:
+    str | None: The best matching question, if any.
+"""
+def best_match(
+    embedding: list[float],
+    norm: float,
+    candidates: list[tuple[str, list[float], float]],
+    threshold: float,
+) -> str | None:
+    best_question, best_score = None, threshold
+    for question, candidate, candidate_norm in candidates:
+        score = cosine_similarity(embedding, candidate, norm, candidate_norm)
+        if score >= best_score:
+            best_question, best_score = question, score
+    return best_question
+
+
+@dataclass
+class CachedAnswer:
+    chunks: list[str]
+    embedding: list[float] | None
+    norm: float
+    expires_at: float
+
+
+"""
+An in-process cache of generated answers, scoped by `doc_id` and `user_id`.
+
+A question is first matched exactly on its normalized text. On a miss, its
+embedding is compared with the cached questions of the same scope and the best
+match above `similarity_threshold` is returned. Entries are stored per
+document and user, so lookups and `invalidate` only touch that scope, and the
+similarity scan runs in a worker thread to keep the event loop free. Answers are stored as the list
+of chunks that were streamed, so a cached answer can be replayed over the
+websocket in exactly the format of a live one. Entries expire after
+`ttl_seconds`, the least recently used entries are evicted beyond
+`max_entries`, and `invalidate` drops a document's answers when it is deleted.
+
+Attributes:
+    embeddings (Embeddings): Model used to embed questions for near-duplicate
+        matching. The question embedding is cached, so `retrieve` reuses it.
+    max_entries (int): Maximum number of cached answers across all scopes.
+    ttl_seconds (float): Lifetime of a cached answer.
+    similarity_threshold (float): Minimum cosine similarity of a near-duplicate.
+        Values above 1 disable semantic matching.
+"""
+class AnswerCache:
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.95,
+    ):
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._documents: dict[str, dict[str, dict[str, CachedAnswer]]] = {}
+        # Recency across all scopes, oldest first, for the `max_entries` bound.
+        self._lru: OrderedDict[tuple[str, str, str], None] = OrderedDict()
+
+    def _scope(self, doc_id: str, user_id: str) -> dict[str, CachedAnswer]:
+        return self._documents.get(doc_id, {}).get(user_id, {})
+
+    def _touch(self, doc_id: str, user_id: str, question: str):
+        self._lru.move_to_end((doc_id, user_id, question))
+
+    def _remove(self, doc_id: str, user_id: str, question: str):
+        users = self._documents[doc_id]
+        del users[user_id][question]
+        self._lru.pop((doc_id, user_id, question), None)
+        if not users[user_id]:
+            del users[user_id]
+            if not users:
+                del self._documents[doc_id]
+
+    def _live_entries(self, doc_id: str, user_id: str) -> list[tuple[str, CachedAnswer]]:
+        now = time.monotonic()
+        entries = []
+        for question, entry in list(self._scope(doc_id, user_id).items()):
+            if entry.expires_at <= now:
+                self._remove(doc_id, user_id, question)
+            else:
+                entries.append((question, entry))
+        return entries
+
+    async def lookup(self, doc_id: str, user_id: str, question: str) -> list[str] | None:
+        normalized = normalize_question(question)
+
+        entry = self._scope(doc_id, user_id).get(normalized)
+        if entry is not None and entry.expires_at > time.monotonic():
+            self._touch(doc_id, user_id, normalized)
+            self.exact_hits += 1
+            return entry.chunks
+
+        candidates = [
+            (cached_question, entry.embedding, entry.norm)
+            for cached_question, entry in self._live_entries(doc_id, user_id)
+            if entry.embedding is not None
+        ]
+        if candidates and self.similarity_threshold <= 1:
+            embedding = await self.embeddings.aembed_query(question)
+            norm = math.sqrt(sum(x * x for x in embedding))
+            match = await asyncio.to_thread(
+                best_match, embedding, norm, candidates, self.similarity_threshold
+            )
+            # The scope may have changed while the embedding was computed.
+            entry = self._scope(doc_id, user_id).get(match) if match else None
+            if entry is not None:
+                self._touch(doc_id, user_id, match)
+                self.semantic_hits += 1
+                return entry.chunks
+
+        self.misses += 1
+        return None
+
+    async def store(self, doc_id: str, user_id: str, question: str, chunks: list[str]):
+        if not "".join(chunks).strip():
+            return
+
+        embedding = None
+        if self.similarity_threshold <= 1:
+            embedding = await self.embeddings.aembed_query(question)
+
+        normalized = normalize_question(question)
+        scope = self._documents.setdefault(doc_id, {}).setdefault(user_id, {})
+        scope[normalized] = CachedAnswer(
+            chunks=list(chunks),
+            embedding=embedding,
+            norm=math.sqrt(sum(x * x for x in embedding)) if embedding else 0.0,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._lru[(doc_id, user_id, normalized)] = None
+        self._touch(doc_id, user_id, normalized)
+        while len(self._lru) > self.max_entries:
+            self._remove(*next(iter(self._lru)))
+
+    def invalidate(self, doc_id: str, user_id: str | None = None):
+        users = self._documents.get(doc_id, {})
+        for scope_user in [user_id] if user_id is not None else list(users):
+            for question in list(users.get(scope_user, {})):
+                self._remove(doc_id, scope_user, question)
+
+    def stats(self) -> dict:
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "entries": len(self._lru),
+        }
+
+
+_answer_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache:
+    global _answer_cache
+    if _answer_cache is None:
+        _answer_cache = AnswerCache(
+            embeddings=get_embedding_model(),
+            max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000")),
+            ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+            similarity_threshold=float(
+                os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.95")
+            ),
+        )
+    return _answer_cache
+
+
+def peek_answer_cache() -> AnswerCache | None:
+    return _answer_cache
@@ -0,0 +1,169 @@
+import os
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from ...helpers import estimate_tokens
+from ...utils import logger
+
+load_dotenv()
+
+
+@dataclass
+class ContextBlock:
+    source: tuple
+    start: int
+    end: int
+    text: str
+    score: float
+    chunks: int = 1
+
+
+@dataclass
+class ContextStats:
+    queries: int = 0
+    chunks_retrieved: int = 0
+    chunks_used: int = 0
+    tokens_retrieved: int = 0
+    tokens_used: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_retrieved - self.tokens_used
+
+
+@dataclass
+class BuiltContext:
+    text: str
+    chunks_retrieved: int
+    chunks_used: int
+    blocks: int
+    tokens_retrieved: int
+    tokens_used: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_retrieved - self.tokens_used
+
+
+"""
+Assembles the prompt context from retrieved chunks within a token budget.
+
+Chunks are split per page with a 200 character overlap, so neighbouring hits
+repeat text. The builder drops hits scoring below `score_threshold`, then adds
+the remaining ones in score order, merging chunks of the same page whose
+`start_index` ranges overlap or touch into a single block without the repeated
+text. A chunk is skipped when the merged context would exceed `token_budget`,
+so the number of chunks used adapts to their size and relevance. The best hit
+is always kept, even above the budget, so a question never runs without context.
+
+Tokens are estimated as characters / 4, like the embedding scheduler does.
+
+Attributes:
+    token_budget (int): Maximum estimated tokens of the assembled context.
+    score_threshold (float): Minimum similarity score of a chunk.
+    totals (ContextStats): Totals across queries, including tokens saved.
+"""
+class ContextBuilder:
+    def __init__(self, token_budget: int = 1500, score_threshold: float = 0.0):
+        self.token_budget = token_budget
+        self.score_threshold = score_threshold
+        self.totals = ContextStats()
+
+    @staticmethod
+    def _merge(blocks: list[ContextBlock], doc: Document, score: float) -> list[ContextBlock]:
+        metadata = doc.metadata
+        start = metadata.get("start_index")
+        source = (metadata.get("doc_id"), metadata.get("source"), metadata.get("page"))
+        text = doc.page_content
+        if start is None:
+            return blocks + [ContextBlock(source, -1, -1, text, score)]
+
+        candidate = ContextBlock(source, start, start + len(text), text, score)
+        merged = []
+        for block in blocks:
+            if (
+                block.source == candidate.source
+                and block.start >= 0
+                and block.start <= candidate.end
+                and candidate.start <= block.end
+            ):
+                first, second = sorted([block, candidate], key=lambda b: b.start)
+                if second.end > first.end:
+                    text = first.text + second.text[first.end - second.start :]
+                else:
+                    text = first.text
+                candidate = ContextBlock(
+                    source,
+                    first.start,
+                    max(first.end, second.end),
+                    text,
+                    max(first.score, second.score),
+                    first.chunks + second.chunks,
+                )
+            else:
+                merged.append(block)
+        return merged + [candidate]
+
+    @staticmethod
+    def _tokens(blocks: list[ContextBlock]) -> int:
+        return sum(estimate_tokens(block.text) for block in blocks)
+
+    """
+    Builds the context for one query and records its token savings.
+
+    Args:
+        docs (list[Document]): Retrieved chunks. The similarity score is read
+            from `metadata["score"]`; chunks without one are kept in order.
+
+    Returns:
+        BuiltContext: The context text and the chunk/token counts.
+    """
+    def build(self, docs: list[Document]) -> BuiltContext:
+        scored = [(doc, doc.metadata.get("score")) for doc in docs]
+        scored.sort(key=lambda item: item[1] if item[1] is not None else float("-inf"), reverse=True)
+
+        blocks: list[ContextBlock] = []
+        for doc, score in scored:
+            if score is not None and score < self.score_threshold and blocks:
+                break
+            merged = self._merge(blocks, doc, score if score is not None else 0.0)
+            if blocks and self._tokens(merged) > self.token_budget:
+                continue
+            blocks = merged
+
+        blocks.sort(key=lambda block: block.score, reverse=True)
+        context = BuiltContext(
+            text="\n\n".join(block.text for block in blocks),
+            chunks_retrieved=len(docs),
+            chunks_used=sum(block.chunks for block in blocks),
+            blocks=len(blocks),
+            tokens_retrieved=sum(estimate_tokens(doc.page_content) for doc in docs),
+            tokens_used=self._tokens(blocks),
+        )
+
+        self.totals.queries += 1
+        self.totals.chunks_retrieved += context.chunks_retrieved
+        self.totals.chunks_used += context.chunks_used
+        self.totals.tokens_retrieved += context.tokens_retrieved
+        self.totals.tokens_used += context.tokens_used
+        logger.info(
+            f"Context: {context.chunks_used}/{context.chunks_retrieved} chunks in "
+            f"{context.blocks} blocks, {context.tokens_used} tokens "
+            f"({context.tokens_saved} saved)"
+        )
+        return context
+
+    def stats(self) -> dict:
+        return {
+            "queries": self.totals.queries,
+            "chunks_retrieved": self.totals.chunks_retrieved,
+            "chunks_used": self.totals.chunks_used,
+            "tokens_used": self.totals.tokens_used,
+            "tokens_saved": self.totals.tokens_saved,
+        }
+
+
+context_builder = ContextBuilder(
+    token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500")),
+    score_threshold=float(os.getenv("RETRIEVAL_SCORE_THRESHOLD", "0.3")),
+)
@@ -1 +1 @@
-from .gemini import graph
\ No newline at end of file
+from .gemini import get_graph, get_llm
@@ -1,32 +1,62 @@
-import getpass
-import os
 from dotenv import load_dotenv
 from langchain_core.documents import Document
 from typing_extensions import List, TypedDict
-from langchain import hub
-from langgraph.graph import START, StateGraph
-from ...qdrant import vector_store
-from qdrant_client.models import Filter, FieldCondition, MatchValue
+from ...qdrant import (
+    collection_config,
+    get_async_client,
+    get_embedding_model,
+    search_params,
+    tenant_filter,
+)
+from .prompt import build_rag_prompt
+from ..context import context_builder
+from ....utils.metrics import (
+    retrieval_seconds,
+    llm_time_to_first_token_seconds,
+    llm_generation_seconds,
+)
+import os
+import time
 
 load_dotenv()
 
-if not os.environ.get("GOOGLE_API_KEY"):
-    os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter API key for Google Gemini: ")
-
-from langchain.chat_models import init_chat_model
-
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "8"))
 
 
 """
-Initializes a chat model and defines functions for document retrieval and response generation
-using a state graph. The `retrieve` function performs a similarity search on a vector store
-to find relevant documents based on a user's question and metadata filters. The `generate`
-function constructs a response by invoking a language model with the retrieved documents'
-content and the user's question. The state graph orchestrates the sequence of these operations.
+Defines functions for document retrieval and response generation using a state graph.
+The `retrieve` function performs a similarity search on the vector store with the async
+Qdrant client to find relevant documents based on a user's question and metadata filters.
+The `generate` function constructs a response by invoking a language model with the
+context assembled from the retrieved documents by `context_builder` (overlapping chunks
+merged, low scores dropped, within a token budget) and the user's question. Both nodes are async, so the graph is
+consumed with `graph.astream` and never blocks the event loop. Retrieval latency, LLM time
+to first token and total generation time are recorded in `utils/metrics.py`.
+
+The chat model, the prompt and the compiled graph are built on first use by
+`get_llm`, `get_prompt` and `get_graph`, so importing this module neither loads
+LangGraph nor reaches the network.
 """
 
-llm = init_chat_model("gemini-2.0-flash", model_provider="google_genai")
-prompt = hub.pull("rlm/rag-prompt")
+_llm = None
+_prompt = None
+_graph = None
+
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        from langchain.chat_models import init_chat_model
+
+        _llm = init_chat_model("gemini-2.0-flash", model_provider="google_genai")
+    return _llm
+
+
+def get_prompt():
+    global _prompt
+    if _prompt is None:
+        _prompt = build_rag_prompt()
+    return _prompt
 
 
 class State(TypedDict):
@@ -37,31 +67,52 @@ class State(TypedDict):
     answer: str
 
 
-def retrieve(state: State):
-    retrieved_docs = vector_store.similarity_search(
-        state["question"],
-        k=5,
-        filter=Filter(
-            must=[
-                FieldCondition(
-                    key="metadata.doc_id", match=MatchValue(value=state["doc_id"])
-                ),
-                FieldCondition(
-                    key="metadata.user_id", match=MatchValue(value=state["user_id"])
-                ),
-            ]
-        ),
-    )
+async def retrieve(state: State):
+    with retrieval_seconds.time():
+        query_vector = await get_embedding_model().aembed_query(state["question"])
+        response = await get_async_client().query_points(
+            collection_name=collection_config.collection_name,
+            query=query_vector,
+            limit=RETRIEVAL_TOP_K,
+            search_params=search_params(),
+            query_filter=tenant_filter(state["user_id"], state["doc_id"]),
+            with_payload=True,
+        )
+    retrieved_docs = [
+        Document(
+            page_content=point.payload.get("page_content", ""),
+            metadata={**(point.payload.get("metadata") or {}), "score": point.score},
+        )
+        for point in response.points
+    ]
     return {"context": retrieved_docs}
 
 
-def generate(state: State):
-    docs_content = "\n\n".join(doc.page_content for doc in state["context"])
-    messages = prompt.invoke({"question": state["question"], "context": docs_content})
-    response = llm.invoke(messages)
-    return {"answer": response.content}
+async def generate(state: State):
+    context = context_builder.build(state["context"])
+    messages = await get_prompt().ainvoke(
+        {"question": state["question"], "context": context.text}
+    )
+    # Streamed so time to first token can be measured; the "messages" stream
+    # mode of the graph still forwards every token to the websocket.
+    started = time.perf_counter()
+    response = None
+    async for chunk in get_llm().astream(messages):
+        if response is None:
+            llm_time_to_first_token_seconds.observe(time.perf_counter() - started)
+            response = chunk
+        else:
+            response += chunk
+    llm_generation_seconds.observe(time.perf_counter() - started)
+    return {"answer": response.content if response is not None else ""}
+
 
+def get_graph():
+    global _graph
+    if _graph is None:
+        from langgraph.graph import START, StateGraph
 
-graph_builder = StateGraph(State).add_sequence([retrieve, generate])
-graph_builder.add_edge(START, "retrieve")
-graph = graph_builder.compile()
+        graph_builder = StateGraph(State).add_sequence([retrieve, generate])
+        graph_builder.add_edge(START, "retrieve")
+        _graph = graph_builder.compile()
+    return _graph
@@ -0,0 +1,20 @@
+"""
+The RAG prompt, bundled with the service instead of being pulled from the
+LangChain Hub at startup. The text is that of `rlm/rag-prompt`.
+"""
+
+RAG_PROMPT_TEMPLATE = (
+    "You are an assistant for question-answering tasks. Use the following pieces "
+    "of retrieved context to answer the question. If you don't know the answer, "
+    "just say that you don't know. Use three sentences maximum and keep the "
+    "answer concise.\n"
+    "Question: {question} \n"
+    "Context: {context} \n"
+    "Answer:"
+)
+
+
+def build_rag_prompt():
+    from langchain_core.prompts import ChatPromptTemplate
+
+    return ChatPromptTemplate.from_messages([("human", RAG_PROMPT_TEMPLATE)])
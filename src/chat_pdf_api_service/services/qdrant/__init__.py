@@ -1 +1,18 @@
-from .qdrant import vector_store, client
+from .qdrant import (
+    get_client,
+    get_async_client,
+    get_embedding_model,
+    peek_embedding_model,
+    ensure_collection,
+    close_clients,
+    delete_points_in_batches,
+)
+from .provisioning import (
+    INGESTED_AT_FIELD,
+    CollectionConfig,
+    collection_config,
+    load_collection_config,
+    provision_collection,
+    search_params,
+)
+from .tenancy import tenant_filter, tenant_metadata
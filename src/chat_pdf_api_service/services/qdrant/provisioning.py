@@ -0,0 +1,283 @@
+import os
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from .tenancy import TENANT_FIELD, DOCUMENT_FIELD
+
+load_dotenv()
+
+INGESTED_AT_FIELD = "metadata.ingested_at"
+
+
+"""
+Settings of the Qdrant collection and of searches against it, read from the
+environment.
+
+Attributes:
+    collection_name (str): Name of the collection.
+    vector_size (int): Dimension of the embeddings (768 for `models/embedding-001`).
+    distance (str): Qdrant distance name: Cosine, Dot, Euclid or Manhattan.
+    quantization (str): `scalar`, `product` or `none`.
+    quantization_always_ram (bool): Keep the quantized vectors in RAM while the
+        original vectors stay on disk.
+    product_compression (str): Compression ratio of product quantization (x4 to x64).
+    on_disk_vectors (bool): Store the original vectors on disk (memmap).
+    on_disk_payload (bool): Store payloads on disk.
+    hnsw_m (int): Edges per node in the HNSW graph.
+    hnsw_ef_construct (int): Neighbours considered while building the graph.
+    multitenant (bool): Partition the HNSW index by tenant (`metadata.user_id`)
+        instead of building one graph over all users. See `tenancy.py`.
+    hnsw_payload_m (int): Edges per node in the per-tenant graphs.
+    search_hnsw_ef (int): Neighbours considered at search time.
+    search_rescore (bool): Re-rank quantized candidates with the original vectors.
+    search_oversampling (float): Quantized candidates fetched per result before
+        rescoring.
+    migrate (bool): Apply the storage, HNSW and quantization settings to an
+        existing collection. Off by default, so a deployment is only
+        reconfigured when asked to.
+"""
+@dataclass
+class CollectionConfig:
+    collection_name: str = "chatpdf"
+    vector_size: int = 768
+    distance: str = "Cosine"
+    quantization: str = "scalar"
+    quantization_always_ram: bool = True
+    product_compression: str = "x16"
+    on_disk_vectors: bool = True
+    on_disk_payload: bool = True
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    multitenant: bool = True
+    hnsw_payload_m: int = 16
+    search_hnsw_ef: int = 128
+    search_rescore: bool = True
+    search_oversampling: float = 2.0
+    migrate: bool = False
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+def load_collection_config() -> CollectionConfig:
+    return CollectionConfig(
+        collection_name=os.getenv("QDRANT_COLLECTION", "chatpdf"),
+        vector_size=int(os.getenv("QDRANT_VECTOR_SIZE", "768")),
+        distance=os.getenv("QDRANT_DISTANCE", "Cosine"),
+        quantization=os.getenv("QDRANT_QUANTIZATION", "scalar").lower(),
+        quantization_always_ram=_env_bool("QDRANT_QUANTIZATION_ALWAYS_RAM", True),
+        product_compression=os.getenv("QDRANT_PRODUCT_COMPRESSION", "x16"),
+        on_disk_vectors=_env_bool("QDRANT_ON_DISK_VECTORS", True),
+        on_disk_payload=_env_bool("QDRANT_ON_DISK_PAYLOAD", True),
+        hnsw_m=int(os.getenv("QDRANT_HNSW_M", "16")),
+        hnsw_ef_construct=int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100")),
+        multitenant=_env_bool("QDRANT_MULTITENANT", True),
+        hnsw_payload_m=int(os.getenv("QDRANT_HNSW_PAYLOAD_M", "16")),
+        search_hnsw_ef=int(os.getenv("QDRANT_SEARCH_HNSW_EF", "128")),
+        search_rescore=_env_bool("QDRANT_SEARCH_RESCORE", True),
+        search_oversampling=float(os.getenv("QDRANT_SEARCH_OVERSAMPLING", "2.0")),
+        migrate=_env_bool("QDRANT_MIGRATE_COLLECTION", False),
+    )
+
+
+collection_config = load_collection_config()
+
+
+def quantization_config(config: CollectionConfig):
+    from qdrant_client import models
+
+    if config.quantization == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=config.quantization_always_ram,
+            )
+        )
+    if config.quantization == "product":
+        return models.ProductQuantization(
+            product=models.ProductQuantizationConfig(
+                compression=models.CompressionRatio(config.product_compression),
+                always_ram=config.quantization_always_ram,
+            )
+        )
+    if config.quantization == "none":
+        return None
+    raise ValueError(f"Unknown quantization {config.quantization!r}")
+
+
+"""
+Returns the HNSW settings of the collection.
+
+In multitenant mode the global graph is disabled (`m=0`) and Qdrant builds one
+graph per value of the tenant index (`payload_m`), so a search filtered on a
+user only walks that user's graph instead of filtering a graph shared by every
+tenant.
+"""
+def hnsw_config(config: CollectionConfig):
+    from qdrant_client import models
+
+    if config.multitenant:
+        return models.HnswConfigDiff(
+            m=0, payload_m=config.hnsw_payload_m, ef_construct=config.hnsw_ef_construct
+        )
+    return models.HnswConfigDiff(m=config.hnsw_m, ef_construct=config.hnsw_ef_construct)
+
+
+def search_params(config: CollectionConfig = collection_config):
+    from qdrant_client import models
+
+    return models.SearchParams(
+        hnsw_ef=config.search_hnsw_ef,
+        quantization=(
+            models.QuantizationSearchParams(
+                rescore=config.search_rescore,
+                oversampling=config.search_oversampling,
+            )
+            if config.quantization != "none"
+            else None
+        ),
+    )
+
+
+"""
+Compares an existing collection with the config and returns the arguments of
+the `update_collection` call that brings it in line, or an empty dict when it
+already matches.
+
+The vector size and distance cannot be changed in place; a mismatch raises a
+`ValueError`, since the collection has to be recreated and re-ingested.
+
+Args:
+    info (CollectionInfo): Result of `get_collection`.
+    config (CollectionConfig): Desired settings.
+
+Returns:
+    dict: Keyword arguments for `update_collection`.
+"""
+def collection_update(info, config: CollectionConfig) -> dict:
+    from qdrant_client import models
+
+    params = info.config.params
+    vectors = params.vectors
+    if not isinstance(vectors, models.VectorParams):
+        raise ValueError(
+            f"Collection {config.collection_name!r} uses named vectors; expected a single unnamed vector"
+        )
+    if vectors.size != config.vector_size or vectors.distance != models.Distance(config.distance):
+        raise ValueError(
+            f"Collection {config.collection_name!r} has {vectors.size}-d {vectors.distance.value} "
+            f"vectors, config expects {config.vector_size}-d {config.distance}; "
+            "recreate the collection and re-ingest the documents"
+        )
+
+    update = {}
+    if bool(vectors.on_disk) != config.on_disk_vectors:
+        update["vectors_config"] = {"": models.VectorParamsDiff(on_disk=config.on_disk_vectors)}
+    if bool(params.on_disk_payload) != config.on_disk_payload:
+        update["collection_params"] = models.CollectionParamsDiff(
+            on_disk_payload=config.on_disk_payload
+        )
+
+    hnsw = info.config.hnsw_config
+    desired_hnsw = hnsw_config(config)
+    if (
+        hnsw.m != desired_hnsw.m
+        or hnsw.ef_construct != desired_hnsw.ef_construct
+        or (config.multitenant and hnsw.payload_m != desired_hnsw.payload_m)
+    ):
+        update["hnsw_config"] = desired_hnsw
+
+    desired = quantization_config(config)
+    if info.config.quantization_config != desired:
+        update["quantization_config"] = desired or models.Disabled.DISABLED
+
+    return update
+
+
+"""
+Creates the collection from the config, or compares an existing one with it,
+and creates the keyword payload indexes used by the `doc_id`/`user_id` filters.
+The `user_id` index is flagged as the tenant index in multitenant mode, and a
+datetime index on `ingested_at` serves the expiry job.
+
+Every step is idempotent, so this runs on every startup. The settings of an
+existing collection that differ from the config are only updated in place
+when `config.migrate` is set; otherwise they are reported as pending. Works
+with `AsyncQdrantClient`, including the local `AsyncQdrantClient(":memory:")`,
+which accepts but ignores the storage and index settings.
+
+Args:
+    client (AsyncQdrantClient): Client to provision through.
+    config (CollectionConfig): Desired settings.
+
+Returns:
+    dict: `{"created": bool, "updated": list, "pending": list, "changes": dict}`
+        with the names of the applied and of the unapplied settings, and the
+        new value of each.
+"""
+async def provision_collection(client, config: CollectionConfig = collection_config) -> dict:
+    from qdrant_client import models
+
+    created = False
+    updated = []
+    pending = []
+    changes = {}
+    if not await client.collection_exists(config.collection_name):
+        await client.create_collection(
+            collection_name=config.collection_name,
+            vectors_config=models.VectorParams(
+                size=config.vector_size,
+                distance=models.Distance(config.distance),
+                on_disk=config.on_disk_vectors,
+            ),
+            hnsw_config=hnsw_config(config),
+            quantization_config=quantization_config(config),
+            on_disk_payload=config.on_disk_payload,
+        )
+        created = True
+    else:
+        info = await client.get_collection(config.collection_name)
+        update = collection_update(info, config)
+        changes = {name: repr(value) for name, value in sorted(update.items())}
+        if update and config.migrate:
+            await client.update_collection(collection_name=config.collection_name, **update)
+            updated = sorted(update)
+        else:
+            pending = sorted(update)
+
+    await client.create_payload_index(
+        collection_name=config.collection_name,
+        field_name=TENANT_FIELD,
+        field_schema=models.KeywordIndexParams(
+            type=models.KeywordIndexType.KEYWORD, is_tenant=config.multitenant
+        ),
+    )
+    await client.create_payload_index(
+        collection_name=config.collection_name,
+        field_name=DOCUMENT_FIELD,
+        field_schema=models.PayloadSchemaType.KEYWORD,
+    )
+    await client.create_payload_index(
+        collection_name=config.collection_name,
+        field_name=INGESTED_AT_FIELD,
+        field_schema=models.PayloadSchemaType.DATETIME,
+    )
+
+    return {"created": created, "updated": updated, "pending": pending, "changes": changes}
+
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+    from dataclasses import replace
+    from .qdrant import get_async_client, close_clients
+
+    async def main():
+        config = collection_config
+        if "--migrate" in sys.argv:
+            config = replace(config, migrate=True)
+        print(await provision_collection(get_async_client(), config))
+        await close_clients()
+
+    asyncio.run(main())
@@ -1,49 +1,172 @@
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from qdrant_client.models import PayloadSchemaType
-import getpass
 import os
 from dotenv import load_dotenv
+from ...utils import logger
+from .provisioning import collection_config, provision_collection
 
 
 load_dotenv()
 
-if not os.environ.get("GOOGLE_API_KEY"):
-    os.environ["GOOGLE_API_KEY"] = getpass.getpass("Enter API key for Google Gemini: ")
+QDRANT_URL = os.getenv(
+    "QDRANT_URL",
+    "https://311331ed-bc57-427a-bfcd-58d2f6082356.eu-west-1-0.aws.cloud.qdrant.io:6333",
+)
+
 
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+"""
+Lazily initializes the Qdrant clients and the embedding model for the
+`QDRANT_COLLECTION` collection.
 
+Nothing here touches the network or imports the Qdrant and Google GenAI SDKs at
+import time; each object is created on first use, so the app starts without
+waiting on (or failing because of) external services.
 
+- `get_embedding_model` builds the `GoogleGenerativeAIEmbeddings` model for
+  embedding generation, wrapped in `CachedEmbeddings` so repeated chunks and
+  questions skip the API. `GOOGLE_API_KEY` must be set.
+- `get_client` and `get_async_client` configure a `QdrantClient` and an
+  `AsyncQdrantClient` for `QDRANT_URL`. The async client is used from the event
+  loop (retrieval in the RAG graph).
+- `ensure_collection` creates or migrates the collection (quantization, on-disk
+  storage, HNSW) and its payload indices for 'metadata.user_id' and
+  'metadata.doc_id'. It is called from the FastAPI lifespan.
 """
-Initializes a Qdrant client and creates payload indices for a collection named 'chatpdf'.
-Sets up a vector store using Google Generative AI embeddings for the specified collection.
 
-- Initializes the `GoogleGenerativeAIEmbeddings` model for embedding generation.
-- Configures a `QdrantClient` with a specified URL, API key, and timeout.
-- Creates payload indices for 'metadata.user_id' and 'metadata.doc_id' fields in the 'chatpdf' collection.
-- Establishes a `QdrantVectorStore` with the client, collection name, and embedding model.
+_embedding_model = None
+_client = None
+_async_client = None
+
+
+def get_embedding_model():
+    global _embedding_model
+    if _embedding_model is None:
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        from ..embeddings import CachedEmbeddings, DiskEmbeddingStore
+
+        embedding_cache_path = os.getenv("EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3")
+        _embedding_model = CachedEmbeddings(
+            GoogleGenerativeAIEmbeddings(model="models/embedding-001"),
+            model_name="models/embedding-001",
+            max_entries=int(os.getenv("EMBEDDING_CACHE_MEMORY_MAX_ENTRIES", "10000")),
+            store=(
+                DiskEmbeddingStore(
+                    embedding_cache_path,
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ENTRIES", "200000")),
+                )
+                if embedding_cache_path
+                else None
+            ),
+        )
+    return _embedding_model
+
+
+"""
+Returns the embedding model if it has been built, without building it, so
+stats can be read without creating the Gemini client.
 """
+def peek_embedding_model():
+    return _embedding_model
 
-embedding_model = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-client = QdrantClient(
-    url="https://311331ed-bc57-427a-bfcd-58d2f6082356.eu-west-1-0.aws.cloud.qdrant.io:6333",
-    api_key=os.getenv("QDRANT_API_KEY"),
-    timeout=30.0,
-)
 
-client.create_payload_index(
-    collection_name="chatpdf",
-    field_name="metadata.user_id",
-    field_type=PayloadSchemaType.KEYWORD,
-)
+def get_client():
+    global _client
+    if _client is None:
+        from qdrant_client import QdrantClient
 
-client.create_payload_index(
-    collection_name="chatpdf",
-    field_name="metadata.doc_id",
-    field_type=PayloadSchemaType.KEYWORD,
-)
-vector_store = QdrantVectorStore(
-    client=client,
-    collection_name="chatpdf",
-    embedding=embedding_model,
-)
+        _client = QdrantClient(
+            url=QDRANT_URL,
+            api_key=os.getenv("QDRANT_API_KEY"),
+            timeout=30.0,
+        )
+    return _client
+
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        from qdrant_client import AsyncQdrantClient
+
+        _async_client = AsyncQdrantClient(
+            url=QDRANT_URL,
+            api_key=os.getenv("QDRANT_API_KEY"),
+            timeout=30.0,
+        )
+    return _async_client
+
+
+"""
+Creates or migrates the collection and its payload indices from the
+`QDRANT_*` settings (see `provisioning.py`).
+
+A connection failure is logged instead of raised: the API can serve
+authentication and queue uploads while Qdrant is unreachable, and provisioning
+runs again on the next start. A collection that does not match the
+configuration (vector size, distance or named vectors) raises `ValueError`,
+so the app refuses to start rather than fail on every upsert and query.
+
+Other settings of an existing collection are only changed with
+`QDRANT_MIGRATE_COLLECTION=true`; either way the differences are logged.
+"""
+async def ensure_collection():
+    name = collection_config.collection_name
+    try:
+        result = await provision_collection(get_async_client(), collection_config)
+        if result["updated"]:
+            logger.info(f"Migrated Qdrant collection {name!r}: {result['changes']}")
+        if result["pending"]:
+            logger.warning(
+                f"Qdrant collection {name!r} differs from the configuration: "
+                f"{result['changes']}; set QDRANT_MIGRATE_COLLECTION=true to apply it"
+            )
+        logger.info(f"Qdrant collection {name!r} provisioned (created: {result['created']})")
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.warning(f"Could not provision the Qdrant collection: {e}")
+
+
+"""
+Deletes every point matching a filter, one batch at a time, with the async client.
+
+The ids of up to `batch_size` matching points are scrolled and deleted by id
+until none match, so large deletions never block the event loop and are made
+of bounded requests. Safe to re-run after a failure.
+
+Args:
+    points_filter (Filter): Points to delete.
+    batch_size (int): Points deleted per request.
+
+Yields:
+    int: The number of points deleted by each batch.
+"""
+async def delete_points_in_batches(points_filter, batch_size: int):
+    from qdrant_client import models
+
+    client = get_async_client()
+    while True:
+        records, _ = await client.scroll(
+            collection_name=collection_config.collection_name,
+            scroll_filter=points_filter,
+            limit=batch_size,
+            with_payload=False,
+            with_vectors=False,
+        )
+        if not records:
+            return
+        await client.delete(
+            collection_name=collection_config.collection_name,
+            points_selector=models.PointIdsList(points=[record.id for record in records]),
+        )
+        yield len(records)
+
+
+"""
+Closes the Qdrant clients that were created. Called from the FastAPI lifespan on shutdown.
+"""
+async def close_clients():
+    global _client, _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
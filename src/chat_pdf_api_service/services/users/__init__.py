@@ -0,0 +1 @@
+from .cache import UserCache, get_user_cache, peek_user_cache, close_user_cache
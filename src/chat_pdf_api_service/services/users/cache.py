@@ -0,0 +1,182 @@
+from collections import OrderedDict
+from dotenv import load_dotenv
+from ...utils import logger
+import json
+import os
+import time
+
+load_dotenv()
+
+
+"""
+An in-process LRU of user projections with a per-entry TTL. Only the event
+loop touches it, so it needs no lock.
+
+Attributes:
+    max_entries (int): Maximum number of users kept.
+    ttl_seconds (float): Lifetime of an entry.
+"""
+class LocalUserCacheBackend:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    async def get(self, user_id: str) -> dict | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, projection = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return projection
+
+    async def set(self, user_id: str, projection: dict):
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, projection)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, user_id: str):
+        self._entries.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def close(self):
+        self._entries.clear()
+
+
+"""
+A Redis-backed store shared by every worker process, so an invalidation made
+by one worker is seen by all of them. Entries expire with `SETEX`; size is
+bounded by the Redis server's own eviction policy. `redis` is only needed for
+this backend, so it is imported here.
+
+Attributes:
+    url (str): Redis connection URL.
+    ttl_seconds (float): Lifetime of an entry.
+"""
+class RedisUserCacheBackend:
+    prefix = "chatpdf:user:"
+
+    def __init__(self, url: str, ttl_seconds: float):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "USER_CACHE_REDIS_URL is set but the redis package is not installed "
+                "(pip install redis)"
+            ) from e
+        self.ttl_seconds = ttl_seconds
+        self._client = redis.from_url(url)
+
+    async def get(self, user_id: str) -> dict | None:
+        value = await self._client.get(self.prefix + user_id)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, user_id: str, projection: dict):
+        await self._client.set(
+            self.prefix + user_id, json.dumps(projection), ex=max(1, int(self.ttl_seconds))
+        )
+
+    async def delete(self, user_id: str):
+        await self._client.delete(self.prefix + user_id)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+"""
+Caches the projection of the authenticated user (id, name, email, verified
+flag) per user id, so verifying a token does not cost a MongoDB round trip on
+every request and websocket connect. The JWT itself is still decoded and
+checked on every call; only the `User.get` lookup is cached.
+
+Entries are invalidated from the `User` document's save, replace, update and
+delete events, and otherwise expire after `USER_CACHE_TTL_SECONDS`. With the
+default in-process backend, another worker process may serve a stale
+projection until then; set `USER_CACHE_REDIS_URL` to share the cache, and its
+invalidations, between workers. Backend errors are logged and treated as
+misses, so authentication falls back to MongoDB rather than failing.
+
+Attributes:
+    backend (LocalUserCacheBackend | RedisUserCacheBackend): Where entries live.
+"""
+class UserCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, user_id: str) -> dict | None:
+        try:
+            projection = await self.backend.get(user_id)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"User cache lookup failed: {e}")
+            projection = None
+        if projection is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return projection
+
+    async def set(self, user_id: str, projection: dict):
+        try:
+            await self.backend.set(user_id, projection)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"User cache store failed: {e}")
+
+    async def invalidate(self, user_id: str):
+        try:
+            await self.backend.delete(user_id)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"User cache invalidation failed for {user_id}: {e}")
+
+    async def close(self):
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self.backend) if hasattr(self.backend, "__len__") else None,
+        }
+
+
+_user_cache: UserCache | None = None
+
+
+def get_user_cache() -> UserCache:
+    global _user_cache
+    if _user_cache is None:
+        ttl_seconds = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+        redis_url = os.getenv("USER_CACHE_REDIS_URL")
+        if redis_url:
+            backend = RedisUserCacheBackend(redis_url, ttl_seconds)
+        else:
+            backend = LocalUserCacheBackend(
+                int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000")), ttl_seconds
+            )
+        _user_cache = UserCache(backend)
+    return _user_cache
+
+
+def peek_user_cache() -> UserCache | None:
+    return _user_cache
+
+
+async def close_user_cache():
+    global _user_cache
+    if _user_cache is not None:
+        await _user_cache.close()
+        _user_cache = None
@@ -1,2 +1,7 @@
-from .logger import logger
-from ..helpers.database import connect_to_database
\ No newline at end of file
+from .logger import logger, set_correlation_id
+from ..helpers.database import (
+    connect_to_database,
+    init_database,
+    close_database,
+    database_status,
+)
@@ -1,28 +1,146 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+import random
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from uuid import uuid4
+from dotenv import load_dotenv
 
-log_dir = "log"
+load_dotenv()
+
+log_dir = os.getenv("LOG_DIR", "log")
 os.makedirs(log_dir, exist_ok=True)
 
 app_log_path = os.path.join(log_dir, "app.log")
 error_log_path = os.path.join(log_dir, "error.log")
 
-formatter = logging.Formatter(
-    "[%(asctime)s] [%(levelname)s] - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-)
+correlation_id: ContextVar[str | None] = ContextVar("correlation_id", default=None)
+
+
+"""
+Sets the correlation id attached to every log record emitted from the current
+context (an HTTP request, a websocket connection or a background job).
+
+Args:
+    value (str, optional): The id to use; a new random id is generated if omitted.
+
+Returns:
+    str: The correlation id now in effect.
+"""
+def set_correlation_id(value: str | None = None) -> str:
+    value = value or uuid4().hex
+    correlation_id.set(value)
+    return value
+
+
+"""
+Formats records as one JSON object per line with the timestamp, level,
+message, correlation id and, for exceptions, the formatted traceback.
+"""
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "correlation_id": getattr(record, "correlation_id", None),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
 
-app_handler = logging.FileHandler(app_log_path)
-app_handler.setLevel(logging.INFO)
-app_handler.setFormatter(formatter)
+"""
+Keeps a fraction of the records below WARNING; warnings and errors are always
+kept. The decision is made per correlation id, so the info logs of a request
+or job are either all kept or all dropped and sampled traces stay complete.
 
+Attributes:
+    rate (float): Fraction of info/debug records kept, between 0 and 1.
+"""
+class InfoSamplingFilter(logging.Filter):
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
 
-error_handler = logging.FileHandler(app_log_path)
-error_handler.setLevel(logging.ERROR)
-error_handler.setFormatter(formatter)
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1:
+            return True
+        key = correlation_id.get()
+        if key is None:
+            return random.random() < self.rate
+        return zlib.crc32(key.encode()) % 10000 < self.rate * 10000
+
+
+"""
+A `QueueHandler` that stamps the correlation id of the emitting context on the
+record before it leaves the event loop, and renders the message and traceback
+so the record can be formatted later on the listener thread.
+"""
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(record.__dict__)
+        record.correlation_id = correlation_id.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _file_handler(path: str, level: int) -> logging.Handler:
+    if os.getenv("LOG_ROTATION", "size").lower() == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path,
+            when=os.getenv("LOG_ROTATION_WHEN", "midnight"),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", "7")),
+            utc=True,
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", "7")),
+        )
+    handler.setLevel(level)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+"""
+Logging goes through a queue so the event loop never does disk I/O: the
+logger only enqueues records, and a `QueueListener` thread formats them as JSON
+and writes them to rotating files. `app.log` receives INFO and above (with
+INFO sampled by `LOG_INFO_SAMPLE_RATE`); `error.log` receives ERROR and above.
+Rotation is by size (`LOG_MAX_BYTES`) or, with `LOG_ROTATION=time`, by time
+(`LOG_ROTATION_WHEN`), keeping `LOG_BACKUP_COUNT` files. The listener is
+flushed and stopped at interpreter exit.
+"""
+app_handler = _file_handler(app_log_path, logging.INFO)
+error_handler = _file_handler(error_log_path, logging.ERROR)
+
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = ContextQueueHandler(log_queue)
+queue_handler.addFilter(InfoSamplingFilter(float(os.getenv("LOG_INFO_SAMPLE_RATE", "1.0"))))
+
+listener = logging.handlers.QueueListener(
+    log_queue, app_handler, error_handler, respect_handler_level=True
+)
 
 logger = logging.getLogger("my_logger")
 logger.setLevel(logging.DEBUG)
 
-if not logger.hasHandlers():
-    logger.addHandler(app_handler)
-    logger.addHandler(error_handler)
\ No newline at end of file
+if not logger.handlers:
+    logger.addHandler(queue_handler)
+    listener.start()
+    atexit.register(listener.stop)
@@ -0,0 +1,344 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable
+from .logger import logger
+
+
+"""
+A minimal in-process metrics registry rendered in the Prometheus text format
+(version 0.0.4), served at `/metrics`.
+
+Counters, gauges and histograms are updated from the event loop and from the
+worker threads that parse and split PDFs, so every update takes the metric's
+lock. Collectors are callables evaluated at scrape time, which lets existing
+`stats()` counters (caches, expiry, context builder) be exported without
+duplicating them.
+"""
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+"""
+Base of every metric: its name, help text, label names and lock, and the
+rendering of its samples. Subclasses define the metric type and `samples`.
+"""
+class _Metric(ABC):
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    """
+    Returns the current series as `(sample name, labels, value)` tuples.
+    """
+    @abstractmethod
+    def samples(self) -> list[tuple[str, dict, float]]:
+        pass
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+"""
+A metric holding one value per label set, shared by counters and gauges.
+"""
+class _ValueMetric(_Metric):
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def _add(self, amount: float, labels: dict):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Counter(_ValueMetric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError(f"{self.name} is a counter and cannot decrease")
+        self._add(amount, labels)
+
+
+class Gauge(_ValueMetric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1, **labels):
+        self._add(-amount, labels)
+
+
+"""
+A histogram with cumulative `_bucket`, `_sum` and `_count` series, in seconds.
+"""
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    """
+    Wraps an iterator, timing only the time spent producing its items (not the
+    time the consumer spends on them), and observes the total once it is
+    exhausted or closed.
+    """
+    def time_iteration(self, iterable: Iterable, **labels):
+        iterator = iter(iterable)
+        elapsed = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - started
+                    return
+                elapsed += time.perf_counter() - started
+                yield item
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+            self.observe(elapsed, **labels)
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append(
+                        (f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative)
+                    )
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], Iterable[_Metric]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    """
+    Registers a callable evaluated on every scrape that returns freshly built
+    metrics, e.g. gauges filled from a component's `stats()`. A collector that
+    raises is logged and skipped, so it cannot fail the whole scrape.
+    """
+    def register_collector(self, collector: Callable[[], Iterable[_Metric]]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                logger.error(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+document_load_seconds = registry.histogram(
+    "chatpdf_document_load_seconds",
+    "Time spent parsing a PDF into pages, per document.",
+    buckets=SLOW_BUCKETS,
+)
+document_split_seconds = registry.histogram(
+    "chatpdf_document_split_seconds",
+    "Time spent splitting a document's pages into chunks, per document.",
+)
+embedding_batch_seconds = registry.histogram(
+    "chatpdf_embedding_batch_seconds",
+    "Latency of one embedding API call for a batch of chunks.",
+    buckets=SLOW_BUCKETS,
+)
+vector_upsert_seconds = registry.histogram(
+    "chatpdf_vector_upsert_seconds",
+    "Latency of one Qdrant upsert of a batch of points.",
+)
+retrieval_seconds = registry.histogram(
+    "chatpdf_retrieval_seconds",
+    "Latency of the retrieve step: question embedding and vector search.",
+)
+llm_time_to_first_token_seconds = registry.histogram(
+    "chatpdf_llm_time_to_first_token_seconds",
+    "Time from the LLM request to its first streamed token.",
+    buckets=SLOW_BUCKETS,
+)
+llm_generation_seconds = registry.histogram(
+    "chatpdf_llm_generation_seconds",
+    "Total time of the LLM generation, until its last token.",
+    buckets=SLOW_BUCKETS,
+)
+mongo_command_seconds = registry.histogram(
+    "chatpdf_mongo_command_seconds",
+    "Latency of MongoDB commands, by command name and outcome.",
+    labelnames=("command", "outcome"),
+)
+websocket_connections_active = registry.gauge(
+    "chatpdf_websocket_connections_active",
+    "Websocket connections currently open.",
+)
+websocket_connections_total = registry.counter(
+    "chatpdf_websocket_connections_total",
+    "Websocket connections accepted since startup.",
+)
+websocket_connections_active.set(0)
+websocket_connections_total.inc(0)
+password_hash_seconds = registry.histogram(
+    "chatpdf_password_hash_seconds",
+    "Latency of bcrypt hashing and verification, including the wait for a pool worker.",
+    labelnames=("operation",),
+    buckets=SLOW_BUCKETS,
+)
+password_hash_rejected_total = registry.counter(
+    "chatpdf_password_hash_rejected_total",
+    "Password hashing requests shed with a 503 because the pool queue was full.",
+)
+password_hash_rejected_total.inc(0)
+http_request_seconds = registry.histogram(
+    "chatpdf_http_request_seconds",
+    "Latency of HTTP requests, by method, route template and status code.",
+    labelnames=("method", "route", "status"),
+)
+
+
+"""
+Builds metrics from a component's `stats()` dict for a scrape-time collector.
+Keys listed in `counters` are monotonic totals and become counters named
+`<prefix>_<key>_total`, so `rate()` handles a worker restart as a reset. Other
+numeric values become gauges named `<prefix>_<key>`; non-numeric values are
+skipped.
+
+Args:
+    prefix (str): Metric name prefix, e.g. `chatpdf_answer_cache`.
+    stats (dict): The component's counters.
+    documentation (str): Help text shared by the metrics.
+    counters (Iterable[str]): Keys that only ever increase.
+
+Returns:
+    list[_Metric]: One counter or gauge per numeric value.
+"""
+def stats_metrics(
+    prefix: str, stats: dict, documentation: str, counters: Iterable[str] = ()
+) -> list[_Metric]:
+    counters = set(counters)
+    metrics = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            metric = Counter(f"{prefix}_{key}_total", documentation)
+            metric.inc(value)
+        else:
+            metric = Gauge(f"{prefix}_{key}", documentation)
+            metric.set(value)
+        metrics.append(metric)
+    return metrics
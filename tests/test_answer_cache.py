@@ -0,0 +1,137 @@
+import unittest
+from unittest import mock
+from langchain_core.embeddings import Embeddings
+from src.chat_pdf_api_service.services.llm import answer_cache
+from src.chat_pdf_api_service.services.llm.answer_cache import AnswerCache
+
+
+"""
+Embeds the questions listed in `vectors` as given and any other text as an
+orthogonal axis, counting the calls.
+"""
+class TableEmbeddings(Embeddings):
+    def __init__(self, vectors: dict[str, list[float]]):
+        self.vectors = vectors
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self.vectors.get(text, [0.0, 0.0, 1.0])
+
+
+QUESTIONS = {
+    "What is the refund policy?": [1.0, 0.0, 0.0],
+    "whats the refund policy": [0.99, 0.1, 0.0],
+    "Who wrote the report?": [0.0, 1.0, 0.0],
+}
+
+
+class AnswerCacheTest(unittest.IsolatedAsyncioTestCase):
+    def cache(self, **settings) -> AnswerCache:
+        self.embeddings = TableEmbeddings(QUESTIONS)
+        return AnswerCache(self.embeddings, **settings)
+
+    async def test_exact_match_on_normalized_question(self):
+        cache = self.cache()
+        await cache.store("doc", "user", "What is the refund policy?", ["30 ", "days"])
+
+        answer = await cache.lookup("doc", "user", "  what is the REFUND policy ")
+
+        self.assertEqual(answer, ["30 ", "days"])
+        self.assertEqual(cache.stats()["exact_hits"], 1)
+
+    async def test_near_duplicate_above_threshold(self):
+        cache = self.cache(similarity_threshold=0.95)
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+
+        answer = await cache.lookup("doc", "user", "whats the refund policy")
+
+        self.assertEqual(answer, ["30 days"])
+        self.assertEqual(cache.stats()["semantic_hits"], 1)
+
+    async def test_below_threshold_is_a_miss(self):
+        cache = self.cache(similarity_threshold=0.999)
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+
+        self.assertIsNone(await cache.lookup("doc", "user", "whats the refund policy"))
+        self.assertIsNone(await cache.lookup("doc", "user", "Who wrote the report?"))
+        self.assertEqual(cache.stats()["misses"], 2)
+
+    async def test_threshold_above_one_disables_semantic_matching(self):
+        cache = self.cache(similarity_threshold=1.1)
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+
+        self.assertIsNone(await cache.lookup("doc", "user", "whats the refund policy"))
+        self.assertEqual(self.embeddings.calls, 0)
+
+    async def test_answers_are_scoped_by_document_and_user(self):
+        cache = self.cache()
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+
+        self.assertIsNone(await cache.lookup("doc", "other", "What is the refund policy?"))
+        self.assertIsNone(await cache.lookup("other", "user", "What is the refund policy?"))
+
+    async def test_lookup_only_embeds_when_the_scope_has_answers(self):
+        cache = self.cache()
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+        calls = self.embeddings.calls
+
+        await cache.lookup("other", "user", "whats the refund policy")
+
+        self.assertEqual(self.embeddings.calls, calls)
+
+    async def test_invalidate_drops_one_users_answers(self):
+        cache = self.cache()
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+        await cache.store("doc", "other", "What is the refund policy?", ["30 days"])
+        await cache.store("doc-2", "user", "What is the refund policy?", ["14 days"])
+
+        cache.invalidate("doc", "user")
+
+        self.assertIsNone(await cache.lookup("doc", "user", "What is the refund policy?"))
+        self.assertIsNotNone(await cache.lookup("doc", "other", "What is the refund policy?"))
+        self.assertIsNotNone(await cache.lookup("doc-2", "user", "What is the refund policy?"))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    async def test_invalidate_without_user_drops_the_whole_document(self):
+        cache = self.cache()
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+        await cache.store("doc", "other", "Who wrote the report?", ["Ada"])
+
+        cache.invalidate("doc")
+
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    async def test_expired_answers_are_dropped(self):
+        cache = self.cache(ttl_seconds=60)
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+
+        with mock.patch.object(answer_cache.time, "monotonic", return_value=1e12):
+            self.assertIsNone(await cache.lookup("doc", "user", "whats the refund policy"))
+
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    async def test_least_recently_used_answer_is_evicted(self):
+        cache = self.cache(max_entries=2)
+        await cache.store("doc", "user", "What is the refund policy?", ["30 days"])
+        await cache.store("doc-2", "user", "Who wrote the report?", ["Ada"])
+        await cache.lookup("doc", "user", "What is the refund policy?")
+
+        await cache.store("doc-3", "user", "Who wrote the report?", ["Bob"])
+
+        self.assertIsNotNone(await cache.lookup("doc", "user", "What is the refund policy?"))
+        self.assertIsNone(await cache.lookup("doc-2", "user", "Who wrote the report?"))
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    async def test_empty_answers_are_not_stored(self):
+        cache = self.cache()
+        await cache.store("doc", "user", "What is the refund policy?", ["", "  "])
+
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
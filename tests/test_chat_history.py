@@ -0,0 +1,98 @@
+import unittest
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from benchmarks.fakes import init_mock_database
+from src.chat_pdf_api_service.modules import Chat, User
+from src.chat_pdf_api_service.modules.rag.route import (
+    fetch_chat_history,
+    parse_history_cursor,
+)
+
+
+class ParseHistoryCursorTest(unittest.TestCase):
+    def test_parses_timestamp_and_id(self):
+        created_at, chat_id = parse_history_cursor(
+            "2026-01-02T03:04:05.678000_65a1b2c3d4e5f60718293a4b"
+        )
+
+        self.assertEqual(created_at, datetime(2026, 1, 2, 3, 4, 5, 678000))
+        self.assertEqual(str(chat_id), "65a1b2c3d4e5f60718293a4b")
+
+    def test_accepts_a_bare_timestamp(self):
+        self.assertEqual(
+            parse_history_cursor("2026-01-02T03:04:05"), (datetime(2026, 1, 2, 3, 4, 5), None)
+        )
+
+    def test_rejects_malformed_cursors(self):
+        for cursor in ("yesterday", "2026-01-02T03:04:05_not-an-id"):
+            with self.assertRaises(HTTPException) as raised:
+                parse_history_cursor(cursor)
+            self.assertEqual(raised.exception.status_code, 400)
+
+
+class FetchChatHistoryTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_mock_database()
+        self.user = User(fullname="Ada", email="ada@example.com", password="hash")
+        await self.user.insert()
+
+    async def chats(self, count: int, recipient=None, doc_id: str = "doc") -> list[Chat]:
+        chats = []
+        for i in range(count):
+            chat = Chat(
+                prompt=f"question {i}",
+                ai_response=f"answer {i}",
+                recipient=recipient or self.user,
+                doc_id=doc_id,
+            )
+            await chat.insert()
+            chats.append(chat)
+        return chats
+
+    async def pages(self, limit: int) -> list[list[str]]:
+        pages, cursor = [], None
+        while True:
+            chats, cursor = await fetch_chat_history("doc", self.user.id, cursor, limit)
+            pages.append([chat.prompt for chat in chats])
+            if cursor is None:
+                return pages
+
+    async def test_pages_from_newest_in_chronological_order(self):
+        await self.chats(5)
+
+        pages = await self.pages(limit=2)
+
+        self.assertEqual(
+            pages,
+            [["question 3", "question 4"], ["question 1", "question 2"], ["question 0"]],
+        )
+
+    async def test_chats_saved_at_the_same_time_are_neither_skipped_nor_repeated(self):
+        await self.chats(7)
+        same_time = datetime.now(timezone.utc).replace(microsecond=123000)
+        await Chat.get_motor_collection().update_many(
+            {"doc_id": "doc"}, {"$set": {"created_at": same_time}}
+        )
+
+        pages = await self.pages(limit=3)
+
+        prompts = [prompt for page in pages for prompt in page]
+        self.assertEqual(len(prompts), 7)
+        self.assertCountEqual(prompts, [f"question {i}" for i in range(7)])
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+
+    async def test_only_the_users_chats_about_the_document(self):
+        other = User(fullname="Bob", email="bob@example.com", password="hash")
+        await other.insert()
+        await self.chats(2)
+        await self.chats(2, recipient=other)
+        await self.chats(2, doc_id="other-doc")
+
+        chats, cursor = await fetch_chat_history("doc", self.user.id, None, 10)
+
+        self.assertEqual(len(chats), 2)
+        self.assertIsNone(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+from unittest import mock
+from langchain_core.documents import Document
+from src.chat_pdf_api_service.helpers import estimate_tokens
+from src.chat_pdf_api_service.helpers.chunking import (
+    CHUNKING_STRATEGIES,
+    ChunkingConfig,
+    chunking_config,
+    get_chunker,
+    register_chunking_strategy,
+)
+
+SENTENCES = " ".join(f"Sentence number {i} ends here." for i in range(40))
+
+
+def page(text: str) -> Document:
+    return Document(page_content=text, metadata={"page": 3})
+
+
+def chunks_of(strategy: str, text: str, chunk_size: int, chunk_overlap: int) -> list[Document]:
+    return get_chunker(ChunkingConfig(strategy, chunk_size, chunk_overlap))(page(text))
+
+
+class ChunkingConfigTest(unittest.TestCase):
+    @mock.patch.dict("os.environ", {}, clear=True)
+    def test_defaults_to_the_recursive_strategy(self):
+        self.assertEqual(chunking_config(), ChunkingConfig("recursive", 1000, 200))
+
+    @mock.patch.dict(
+        "os.environ", {"CHUNKING_STRATEGY": "page", "CHUNK_SIZE": "3000", "CHUNK_OVERLAP": "100"}
+    )
+    def test_environment_only_overrides_the_configured_strategy(self):
+        self.assertEqual(chunking_config(), ChunkingConfig("page", 3000, 100))
+        self.assertEqual(chunking_config("token"), ChunkingConfig("token", 256, 32))
+
+    @mock.patch.dict("os.environ", {}, clear=True)
+    def test_default_overlap_is_capped_to_a_fifth_of_the_size(self):
+        self.assertEqual(chunking_config("page", 100).chunk_overlap, 20)
+        self.assertEqual(chunking_config("recursive", 5000).chunk_overlap, 200)
+
+    def test_rejects_unknown_strategy(self):
+        with self.assertRaisesRegex(ValueError, "Unknown chunking strategy"):
+            chunking_config("paragraph")
+
+    def test_rejects_overlap_not_below_size(self):
+        with self.assertRaises(ValueError):
+            chunking_config("recursive", 100, 100)
+
+
+class ChunkingStrategiesTest(unittest.TestCase):
+    def test_recursive_respects_the_size(self):
+        chunks = chunks_of("recursive", SENTENCES, 200, 40)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk.page_content) <= 200 for chunk in chunks))
+
+    def test_page_keeps_short_pages_whole(self):
+        chunks = chunks_of("page", "A short page.", 4000, 200)
+
+        self.assertEqual([chunk.page_content for chunk in chunks], ["A short page."])
+        self.assertEqual(chunks[0].metadata["start_index"], 0)
+
+    def test_page_splits_long_pages_and_skips_blank_ones(self):
+        self.assertGreater(len(chunks_of("page", SENTENCES, 300, 50)), 1)
+        self.assertEqual(chunks_of("page", "   \n ", 300, 50), [])
+
+    def test_token_measures_chunks_in_estimated_tokens(self):
+        chunks = chunks_of("token", SENTENCES, 50, 10)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk.page_content), 50)
+            start = chunk.metadata["start_index"]
+            self.assertEqual(SENTENCES[start : start + len(chunk.page_content)], chunk.page_content)
+
+    def test_sentence_window_keeps_sentences_whole_and_overlapping(self):
+        chunks = chunks_of("sentence-window", SENTENCES, 200, 60)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            start = chunk.metadata["start_index"]
+            self.assertEqual(SENTENCES[start : start + len(chunk.page_content)], chunk.page_content)
+            self.assertTrue(chunk.page_content.startswith("Sentence"))
+            self.assertTrue(chunk.page_content.endswith("here."))
+            self.assertLessEqual(len(chunk.page_content), 200)
+        for previous, current in zip(chunks, chunks[1:]):
+            previous_end = previous.metadata["start_index"] + len(previous.page_content)
+            self.assertLess(current.metadata["start_index"], previous_end)
+
+    def test_sentence_window_keeps_an_oversized_sentence_as_one_chunk(self):
+        sentence = "word " * 100 + "end."
+
+        chunks = chunks_of("sentence-window", sentence, 50, 10)
+
+        self.assertEqual([chunk.page_content for chunk in chunks], [sentence])
+
+    def test_chunks_carry_the_config_and_page_metadata(self):
+        chunks = chunks_of("recursive", SENTENCES, 200, 40)
+
+        for chunk in chunks:
+            self.assertEqual(chunk.metadata["page"], 3)
+            self.assertEqual(
+                chunk.metadata["chunking"],
+                {"strategy": "recursive", "chunk_size": 200, "chunk_overlap": 40},
+            )
+
+    def test_registered_strategies_can_be_selected(self):
+        @register_chunking_strategy("lines", chunk_size=10, chunk_overlap=0)
+        def lines_chunker(chunk_size, chunk_overlap):
+            return lambda page: [
+                Document(page_content=line, metadata=dict(page.metadata))
+                for line in page.page_content.splitlines()
+            ]
+
+        self.addCleanup(CHUNKING_STRATEGIES.pop, "lines")
+
+        config = chunking_config("lines")
+        chunks = get_chunker(config)(page("one\ntwo"))
+
+        self.assertEqual([chunk.page_content for chunk in chunks], ["one", "two"])
+        self.assertEqual(chunks[0].metadata["chunking"]["strategy"], "lines")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from langchain_core.documents import Document
+from src.chat_pdf_api_service.services.llm.context import ContextBuilder
+
+PAGE = "".join(f"Line {i:02d} of the page. " for i in range(40))
+
+
+def chunk(start: int, end: int, score: float | None, page: int = 1, text: str | None = None):
+    metadata = {"doc_id": "doc", "source": "doc.pdf", "page": page}
+    if start is not None:
+        metadata["start_index"] = start
+    if score is not None:
+        metadata["score"] = score
+    return Document(page_content=text if text is not None else PAGE[start:end], metadata=metadata)
+
+
+class ContextBuilderTest(unittest.TestCase):
+    def test_overlapping_chunks_of_a_page_are_merged(self):
+        builder = ContextBuilder(token_budget=10_000)
+
+        context = builder.build([chunk(0, 300, 0.9), chunk(200, 500, 0.8)])
+
+        self.assertEqual(context.text, PAGE[0:500])
+        self.assertEqual(context.blocks, 1)
+        self.assertEqual(context.chunks_used, 2)
+        self.assertLess(context.tokens_used, context.tokens_retrieved)
+
+    def test_touching_chunks_are_merged_and_contained_ones_absorbed(self):
+        builder = ContextBuilder(token_budget=10_000)
+
+        context = builder.build(
+            [chunk(0, 200, 0.9), chunk(200, 400, 0.8), chunk(50, 150, 0.7)]
+        )
+
+        self.assertEqual(context.text, PAGE[0:400])
+        self.assertEqual(context.chunks_used, 3)
+
+    def test_chunks_of_other_pages_stay_separate_in_score_order(self):
+        builder = ContextBuilder(token_budget=10_000)
+
+        context = builder.build([chunk(0, 100, 0.5, page=1), chunk(0, 100, 0.9, page=2)])
+
+        self.assertEqual(context.blocks, 2)
+        self.assertEqual(context.text, PAGE[0:100] + "\n\n" + PAGE[0:100])
+
+    def test_chunks_without_start_index_are_not_merged(self):
+        builder = ContextBuilder(token_budget=10_000)
+
+        context = builder.build(
+            [chunk(None, None, 0.9, text="first"), chunk(None, None, 0.8, text="first")]
+        )
+
+        self.assertEqual(context.blocks, 2)
+
+    def test_chunks_over_the_budget_are_skipped(self):
+        builder = ContextBuilder(token_budget=60)
+
+        context = builder.build(
+            [chunk(0, 200, 0.9), chunk(400, 600, 0.8), chunk(800, 880, 0.7, page=2)]
+        )
+
+        self.assertEqual(context.chunks_used, 2)
+        self.assertLessEqual(context.tokens_used, 60)
+        self.assertNotIn(PAGE[400:600], context.text)
+
+    def test_best_chunk_is_kept_even_above_the_budget(self):
+        builder = ContextBuilder(token_budget=10)
+
+        context = builder.build([chunk(0, 400, 0.9), chunk(500, 540, 0.8)])
+
+        self.assertEqual(context.text, PAGE[0:400])
+
+    def test_low_scoring_chunks_are_dropped(self):
+        builder = ContextBuilder(token_budget=10_000, score_threshold=0.5)
+
+        context = builder.build([chunk(0, 100, 0.9), chunk(500, 600, 0.2)])
+
+        self.assertEqual(context.chunks_used, 1)
+
+    def test_best_chunk_is_kept_even_below_the_threshold(self):
+        builder = ContextBuilder(token_budget=10_000, score_threshold=0.5)
+
+        context = builder.build([chunk(0, 100, 0.1)])
+
+        self.assertEqual(context.text, PAGE[0:100])
+
+    def test_totals_accumulate_across_queries(self):
+        builder = ContextBuilder(token_budget=10_000)
+
+        builder.build([chunk(0, 300, 0.9), chunk(200, 500, 0.8)])
+        builder.build([chunk(0, 100, 0.9)])
+
+        stats = builder.stats()
+        self.assertEqual(stats["queries"], 2)
+        self.assertEqual(stats["chunks_retrieved"], 3)
+        self.assertEqual(stats["tokens_saved"], 25)
+
+
+if __name__ == "__main__":
+    unittest.main()
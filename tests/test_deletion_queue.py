@@ -0,0 +1,125 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+from bson import ObjectId
+from benchmarks.fakes import init_mock_database
+from src.chat_pdf_api_service.modules import Chat, DeletionJob, IngestionJob, User
+from src.chat_pdf_api_service.services.deletion import worker
+from src.chat_pdf_api_service.services.llm import answer_cache
+
+
+async def no_points(points_filter, batch_size):
+    return
+    yield
+
+
+class DeletionQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_mock_database()
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        patch = mock.patch.object(worker, "delete_points_in_batches", no_points)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.queue = worker.DeletionQueue()
+        self.queue.poll_interval = 0.01
+
+    async def ingestion(self, doc_id: str, status: str = "queued"):
+        path = os.path.join(self.spool.name, f"{doc_id}.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4")
+        job = IngestionJob(doc_id=doc_id, user_id=str(ObjectId()), file_path=path, status=status)
+        await job.insert()
+        return job
+
+    async def deletion(self, doc_id: str, user_id: str):
+        job = DeletionJob(doc_id=doc_id, user_id=user_id)
+        await job.insert()
+        return job
+
+    async def test_cancels_queued_ingestion_and_marks_it_deleted(self):
+        ingestion = await self.ingestion("doc")
+        job = await self.deletion("doc", ingestion.user_id)
+
+        await self.queue._process(job)
+
+        self.assertEqual(job.status, "completed")
+        self.assertEqual((await IngestionJob.get(ingestion.id)).status, "deleted")
+        self.assertFalse(os.path.exists(ingestion.file_path))
+
+    async def test_deletes_the_users_chats(self):
+        user = User(fullname="Ada", email="ada@example.com", password="hash")
+        await user.insert()
+        other = User(fullname="Bob", email="bob@example.com", password="hash")
+        await other.insert()
+        for recipient in (user, user, other):
+            await Chat(prompt="q", ai_response="a", recipient=recipient, doc_id="doc").insert()
+        await self.ingestion("doc", status="completed")
+        job = await self.deletion("doc", str(user.id))
+
+        await self.queue._process(job)
+
+        self.assertEqual(job.chats_deleted, 2)
+        self.assertEqual(await Chat.find({"doc_id": "doc"}).count(), 1)
+
+    async def test_waits_for_running_ingestion_even_if_requeued(self):
+        ingestion = await self.ingestion("doc", status="processing")
+        job = await self.deletion("doc", ingestion.user_id)
+
+        deleting = asyncio.create_task(self.queue._process(job))
+        await asyncio.sleep(0.05)
+        self.assertFalse(deleting.done())
+
+        # The running attempt fails and is put back on the queue.
+        await IngestionJob.get_motor_collection().update_one(
+            {"_id": ingestion.id}, {"$set": {"status": "queued"}}
+        )
+        await asyncio.wait_for(deleting, timeout=5)
+
+        self.assertEqual(job.status, "completed")
+        self.assertEqual((await IngestionJob.get(ingestion.id)).status, "deleted")
+
+    async def test_failed_deletion_is_retried_then_failed(self):
+        async def broken(points_filter, batch_size):
+            raise RuntimeError("qdrant down")
+            yield
+
+        ingestion = await self.ingestion("doc", status="completed")
+        job = await self.deletion("doc", ingestion.user_id)
+        self.queue.max_attempts = 2
+
+        with mock.patch.object(worker, "delete_points_in_batches", broken):
+            await self.queue._process(job)
+            await asyncio.gather(*self.queue._tasks)
+
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.error, "qdrant down")
+
+    async def test_does_not_build_the_answer_cache(self):
+        ingestion = await self.ingestion("doc", status="completed")
+        job = await self.deletion("doc", ingestion.user_id)
+
+        with mock.patch.object(answer_cache, "_answer_cache", None), mock.patch.object(
+            answer_cache, "get_embedding_model", side_effect=AssertionError("built")
+        ):
+            await self.queue._process(job)
+            self.assertIsNone(answer_cache.peek_answer_cache())
+
+        self.assertEqual(job.status, "completed")
+
+    async def test_invalidates_a_built_answer_cache(self):
+        ingestion = await self.ingestion("doc", status="completed")
+        job = await self.deletion("doc", ingestion.user_id)
+        cache = mock.Mock()
+
+        with mock.patch.object(worker, "peek_answer_cache", return_value=cache):
+            await self.queue._process(job)
+
+        cache.invalidate.assert_called_once_with("doc", ingestion.user_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
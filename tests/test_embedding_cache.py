@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from langchain_core.embeddings import Embeddings
+from src.chat_pdf_api_service.services.embeddings import CachedEmbeddings, DiskEmbeddingStore
+
+
+"""
+Embeds a text as `[len(text), 1.0]` for documents and `[len(text), 2.0]` for
+queries, recording the texts of every call.
+"""
+class RecordingEmbeddings(Embeddings):
+    def __init__(self):
+        self.document_calls = []
+        self.query_calls = []
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return [float(len(text)), 2.0]
+
+
+class CachedEmbeddingsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "cache", "embeddings.sqlite3")
+
+    def cached(self, store=None, max_entries=100) -> CachedEmbeddings:
+        self.model = RecordingEmbeddings()
+        return CachedEmbeddings(self.model, "test-model", max_entries=max_entries, store=store)
+
+    def store(self, max_entries=100) -> DiskEmbeddingStore:
+        store = DiskEmbeddingStore(self.path, max_entries=max_entries)
+        self.addCleanup(store.close)
+        return store
+
+    def test_only_missing_texts_reach_the_model(self):
+        cache = self.cached()
+        cache.embed_documents(["a", "bb"])
+
+        vectors = cache.embed_documents(["bb", "ccc", "a"])
+
+        self.assertEqual(vectors, [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]])
+        self.assertEqual(self.model.document_calls, [["a", "bb"], ["ccc"]])
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_repeated_texts_in_one_batch_are_embedded_once(self):
+        cache = self.cached()
+
+        vectors = cache.embed_documents(["a", "a", "bb"])
+
+        self.assertEqual(vectors, [[1.0, 1.0], [1.0, 1.0], [2.0, 1.0]])
+        self.assertEqual(self.model.document_calls, [["a", "bb"]])
+
+    def test_queries_and_documents_are_cached_separately(self):
+        cache = self.cached()
+        cache.embed_documents(["question"])
+
+        self.assertEqual(cache.embed_query("question"), [8.0, 2.0])
+        self.assertEqual(cache.embed_query("question"), [8.0, 2.0])
+        self.assertEqual(self.model.query_calls, ["question"])
+
+    def test_memory_tier_is_bounded(self):
+        cache = self.cached(max_entries=2)
+        cache.embed_documents(["a", "bb", "ccc"])
+
+        cache.embed_documents(["a"])
+
+        self.assertEqual(cache.stats()["memory_entries"], 2)
+        self.assertEqual(self.model.document_calls[-1], ["a"])
+
+    def test_disk_tier_survives_a_new_process(self):
+        self.cached(store=self.store()).embed_documents(["a", "bb"])
+
+        cache = self.cached(store=self.store())
+        vectors = cache.embed_documents(["a", "bb"])
+
+        self.assertEqual(vectors, [[1.0, 1.0], [2.0, 1.0]])
+        self.assertEqual(self.model.document_calls, [])
+        self.assertEqual(cache.stats()["disk_hits"], 2)
+
+    def test_disk_tier_evicts_least_recently_used(self):
+        store = self.store(max_entries=10)
+        store.set_many({f"key-{i}": [float(i)] for i in range(10)})
+        store.get_many(["key-0"])
+
+        store.set_many({"key-10": [10.0]})
+
+        kept = store.get_many([f"key-{i}" for i in range(11)])
+        self.assertEqual(len(kept), 9)
+        self.assertIn("key-0", kept)
+        self.assertIn("key-10", kept)
+
+
+class CachedEmbeddingsAsyncTest(unittest.IsolatedAsyncioTestCase):
+    async def test_async_calls_use_the_cache(self):
+        model = RecordingEmbeddings()
+        cache = CachedEmbeddings(model, "test-model")
+
+        await cache.aembed_documents(["a"])
+        await cache.aembed_documents(["a"])
+        await cache.aembed_query("a")
+        await cache.aembed_query("a")
+
+        self.assertEqual(model.document_calls, [["a"]])
+        self.assertEqual(model.query_calls, ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+from fastapi import FastAPI, HTTPException, Request, UploadFile
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers
+from benchmarks.fixtures import write_pdf
+from src.chat_pdf_api_service.dependencies import file_validation
+from src.chat_pdf_api_service.dependencies.file_validation import (
+    FileValidator,
+    UploadSizeLimitMiddleware,
+)
+
+
+def upload(content: bytes, content_type: str = "application/pdf") -> UploadFile:
+    return UploadFile(
+        io.BytesIO(content),
+        filename="upload.pdf",
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+class FileValidatorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patch = mock.patch.dict("os.environ", {"INGESTION_SPOOL_DIR": self.tmp.name})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def pdf(self, pages: int) -> bytes:
+        path = os.path.join(self.tmp.name, "source.pdf")
+        write_pdf(path, pages)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_spools_and_fingerprints_a_valid_pdf(self):
+        content = self.pdf(3)
+
+        validator = FileValidator(upload(content))
+
+        self.assertEqual(validator.page_count, 3)
+        self.assertEqual(validator.size, len(content))
+        with open(validator.path, "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_counts_pages_from_a_mapping_not_the_path(self):
+        readers = []
+        real_reader = file_validation.PdfReader
+
+        def reader(stream):
+            readers.append(stream)
+            return real_reader(stream)
+
+        with mock.patch.object(file_validation, "PdfReader", side_effect=reader):
+            FileValidator(upload(self.pdf(1)))
+
+        self.assertNotIsInstance(readers[0], str)
+
+    def test_rejects_non_pdf_content(self):
+        with self.assertRaises(HTTPException) as raised:
+            FileValidator(upload(b"hello world"))
+
+        self.assertEqual(raised.exception.status_code, 400)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_rejects_wrong_content_type(self):
+        with self.assertRaises(HTTPException) as raised:
+            FileValidator(upload(self.pdf(1), content_type="text/plain"))
+
+        self.assertEqual(raised.exception.status_code, 400)
+
+    def test_rejects_too_many_pages_and_discards_the_spool(self):
+        content = self.pdf(3)
+        os.remove(os.path.join(self.tmp.name, "source.pdf"))
+
+        with mock.patch.object(file_validation, "MAX_UPLOAD_PAGES", 2):
+            with self.assertRaises(HTTPException) as raised:
+                FileValidator(upload(content))
+
+        self.assertEqual(raised.exception.status_code, 413)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_rejects_unreadable_pdf(self):
+        with self.assertRaises(HTTPException) as raised:
+            FileValidator(upload(b"%PDF-1.4 truncated"))
+
+        self.assertEqual(raised.exception.status_code, 400)
+
+
+class UploadSizeLimitMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+
+        @app.post("/upload")
+        async def receive_upload(request: Request):
+            return {"size": len(await request.body())}
+
+        app.add_middleware(UploadSizeLimitMiddleware, paths=["/upload"], max_body_size=1024)
+        # The app sees a disconnect once the limit is hit; only the 413 reaches the client.
+        self.client = TestClient(app, raise_server_exceptions=False)
+
+    def test_accepts_small_bodies(self):
+        response = self.client.post("/upload", content=b"x" * 100)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_rejects_declared_oversized_bodies(self):
+        response = self.client.post(
+            "/upload", content=b"x", headers={"content-length": str(10 * 1024 * 1024)}
+        )
+
+        self.assertEqual(response.status_code, 413)
+
+    def test_rejects_malformed_content_length(self):
+        response = self.client.post("/upload", content=b"x", headers={"content-length": "abc"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {"detail": {"message": "Invalid Content-Length header"}}
+        )
+
+    def test_rejects_streamed_bodies_over_the_limit(self):
+        def chunks():
+            for _ in range(200):
+                yield b"x" * 1024
+
+        response = self.client.post("/upload", content=chunks())
+
+        self.assertEqual(response.status_code, 413)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone, timedelta
+from bson import ObjectId
+from benchmarks.fakes import init_mock_database
+from src.chat_pdf_api_service.modules import IngestionJob
+from src.chat_pdf_api_service.services.ingestion.worker import IngestionQueue
+
+
+class IngestionQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_mock_database()
+        self.spool = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool.cleanup)
+        self.queue = IngestionQueue()
+
+    async def ingestion(self, doc_id: str, status: str = "queued", **fields):
+        path = os.path.join(self.spool.name, f"{doc_id}.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4")
+        job = IngestionJob(
+            doc_id=doc_id, user_id=str(ObjectId()), file_path=path, status=status, **fields
+        )
+        await job.insert()
+        return job
+
+    async def test_claims_oldest_queued_job(self):
+        first = await self.ingestion("first")
+        await self.ingestion("second")
+        await self.ingestion("done", status="completed")
+
+        job = await self.queue._claim()
+
+        self.assertEqual(job.doc_id, first.doc_id)
+        self.assertEqual(job.status, "processing")
+        self.assertEqual(job.attempts, 1)
+
+    async def test_claims_each_job_once(self):
+        for i in range(3):
+            await self.ingestion(f"doc-{i}")
+
+        claimed = await asyncio.gather(*[self.queue._claim() for _ in range(5)])
+
+        doc_ids = [job.doc_id for job in claimed if job is not None]
+        self.assertCountEqual(doc_ids, ["doc-0", "doc-1", "doc-2"])
+        self.assertIsNone(await self.queue._claim())
+
+    async def test_requeues_stale_jobs(self):
+        stale = await self.ingestion("stale", status="processing")
+        await IngestionJob.get_motor_collection().update_one(
+            {"_id": stale.id},
+            {"$set": {"updated_at": datetime.now(timezone.utc) - timedelta(hours=1)}},
+        )
+        await self.ingestion("running", status="processing")
+
+        await self.queue.requeue_stale_jobs()
+
+        self.assertEqual((await IngestionJob.get(stale.id)).status, "queued")
+        running = await IngestionJob.find_one({"doc_id": "running"})
+        self.assertEqual(running.status, "processing")
+
+    async def test_pinned_queue_claims_only_local_jobs(self):
+        await self.ingestion("elsewhere", host="other-host")
+        local = await self.ingestion("local", host=self.queue.host)
+        legacy = await self.ingestion("legacy")
+        self.queue.pin_to_host = True
+
+        claimed = [await self.queue._claim() for _ in range(3)]
+
+        self.assertCountEqual(
+            [job.doc_id for job in claimed if job is not None],
+            [local.doc_id, legacy.doc_id],
+        )
+        self.assertEqual((await IngestionJob.find_one({"doc_id": "elsewhere"})).status, "queued")
+
+    async def test_missing_spooled_file_fails_without_retrying(self):
+        await self.ingestion("doc", host="other-host")
+        job = await self.queue._claim()
+        os.remove(job.file_path)
+
+        await self.queue._process(job)
+
+        job = await IngestionJob.get(job.id)
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("other-host", job.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
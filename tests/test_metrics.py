@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+from src.chat_pdf_api_service.utils import metrics
+from src.chat_pdf_api_service.utils.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    stats_metrics,
+)
+
+
+class MetricsTest(unittest.TestCase):
+    def test_metric_base_is_abstract(self):
+        with self.assertRaises(TypeError):
+            metrics._Metric("chatpdf_base", "Base.")
+
+    def test_counter_renders_per_label_set(self):
+        counter = Counter("chatpdf_requests_total", "Requests.", labelnames=("route",))
+        counter.inc(route="/a")
+        counter.inc(2, route="/a")
+        counter.inc(route="/b")
+
+        self.assertEqual(
+            counter.render(),
+            "# HELP chatpdf_requests_total Requests.\n"
+            "# TYPE chatpdf_requests_total counter\n"
+            'chatpdf_requests_total{route="/a"} 3\n'
+            'chatpdf_requests_total{route="/b"} 1',
+        )
+
+    def test_counter_cannot_decrease(self):
+        counter = Counter("chatpdf_requests_total", "Requests.")
+
+        with self.assertRaises(ValueError):
+            counter.inc(-1)
+
+    def test_labels_must_match(self):
+        counter = Counter("chatpdf_requests_total", "Requests.", labelnames=("route",))
+
+        with self.assertRaises(ValueError):
+            counter.inc(method="GET")
+
+    def test_gauge_goes_up_and_down(self):
+        gauge = Gauge("chatpdf_open", "Open connections.")
+        gauge.set(5)
+        gauge.inc()
+        gauge.dec(2)
+
+        self.assertEqual(gauge.samples(), [("chatpdf_open", {}, 4)])
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("chatpdf_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        samples = {(name, labels.get("le")): value for name, labels, value in histogram.samples()}
+
+        self.assertEqual(samples[("chatpdf_seconds_bucket", "0.1")], 1)
+        self.assertEqual(samples[("chatpdf_seconds_bucket", "1")], 3)
+        self.assertEqual(samples[("chatpdf_seconds_bucket", "+Inf")], 4)
+        self.assertEqual(samples[("chatpdf_seconds_count", None)], 4)
+        self.assertAlmostEqual(samples[("chatpdf_seconds_sum", None)], 6.05)
+
+    def test_time_iteration_observes_once_when_exhausted(self):
+        histogram = Histogram("chatpdf_seconds", "Latency.")
+
+        self.assertEqual(list(histogram.time_iteration(range(3))), [0, 1, 2])
+        self.assertEqual(histogram.samples()[-1], ("chatpdf_seconds_count", {}, 1))
+
+
+class MetricsRegistryTest(unittest.TestCase):
+    def test_rejects_duplicate_names(self):
+        registry = MetricsRegistry()
+        registry.counter("chatpdf_requests_total", "Requests.")
+
+        with self.assertRaises(ValueError):
+            registry.gauge("chatpdf_requests_total", "Requests.")
+
+    def test_failing_collector_is_skipped(self):
+        registry = MetricsRegistry()
+        registry.gauge("chatpdf_open", "Open connections.").set(1)
+
+        def broken():
+            raise RuntimeError("stats unavailable")
+
+        registry.register_collector(broken)
+        registry.register_collector(
+            lambda: stats_metrics("chatpdf_cache", {"hits": 2}, "Cache.", counters=("hits",))
+        )
+
+        with mock.patch.object(metrics.logger, "error") as error:
+            output = registry.render()
+
+        error.assert_called_once()
+        self.assertIn("chatpdf_open 1\n", output)
+        self.assertIn("chatpdf_cache_hits_total 2\n", output)
+
+    def test_stats_metrics_splits_counters_and_gauges(self):
+        built = stats_metrics(
+            "chatpdf_cache",
+            {"hits": 3, "entries": 7, "enabled": True, "backend": "local"},
+            "Cache.",
+            counters=("hits",),
+        )
+
+        self.assertEqual(
+            [(type(metric), metric.name) for metric in built],
+            [(Counter, "chatpdf_cache_hits_total"), (Gauge, "chatpdf_cache_entries")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from benchmarks.fakes import init_mock_database
+from src.chat_pdf_api_service.modules import OTP
+from src.chat_pdf_api_service.modules.authentication import model
+
+
+class OTPTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_mock_database()
+        self.OTP = OTP
+        self.code = await OTP.issue("ada@example.com", "verification")
+
+    async def consume(self, code: str, purpose: str = "verification") -> str:
+        return await self.OTP.consume("ada@example.com", purpose, code)
+
+    def wrong(self) -> str:
+        return "0" if self.code != "0" else "1"
+
+    async def test_verified_once(self):
+        self.assertEqual(await self.consume(self.code), "verified")
+        self.assertEqual(await self.consume(self.code), "missing")
+
+    async def test_invalid_keeps_the_code(self):
+        self.assertEqual(await self.consume(self.wrong()), "invalid")
+        self.assertEqual(await self.consume(self.code), "verified")
+
+    async def test_codes_are_scoped_by_purpose(self):
+        self.assertEqual(await self.consume(self.code, "password_reset"), "missing")
+        self.assertEqual(await self.consume(self.code), "verified")
+
+    async def test_reissue_replaces_the_code_and_resets_attempts(self):
+        await self.consume(self.wrong())
+        code = await self.OTP.issue("ada@example.com", "verification")
+
+        otps = await self.OTP.find({"email": "ada@example.com"}).to_list()
+        self.assertEqual(len(otps), 1)
+        self.assertEqual(otps[0].attempts, 0)
+        self.assertEqual(await self.consume(code), "verified")
+
+    @mock.patch.dict("os.environ", {"OTP_MAX_ATTEMPTS": "3"})
+    async def test_too_many_attempts(self):
+        self.assertEqual(await self.consume(self.wrong()), "invalid")
+        self.assertEqual(await self.consume(self.wrong()), "invalid")
+        self.assertEqual(await self.consume(self.wrong()), "too_many_attempts")
+        self.assertEqual(await self.consume(self.code), "missing")
+
+    async def test_expired(self):
+        # Moves the clock instead of the expiry: the in-memory Mongo applies
+        # the TTL index as soon as `expires_at` is in the past.
+        class Later(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.now(tz) + timedelta(days=1)
+
+        with mock.patch.object(model, "datetime", Later):
+            self.assertEqual(await self.consume(self.code), "expired")
+        self.assertEqual(await self.consume(self.code), "missing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import unittest
+from unittest import mock
+from src.chat_pdf_api_service.services.qdrant import qdrant
+from src.chat_pdf_api_service.services.ingestion import worker
+from src.chat_pdf_api_service.services.qdrant.provisioning import (
+    CollectionConfig,
+    collection_config,
+    load_collection_config,
+    provision_collection,
+)
+
+
+class ProvisionCollectionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        from qdrant_client import AsyncQdrantClient
+
+        self.client = AsyncQdrantClient(location=":memory:")
+        self.config = CollectionConfig(collection_name="test", vector_size=8)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_creates_collection(self):
+        result = await provision_collection(self.client, self.config)
+
+        self.assertTrue(result["created"])
+        info = await self.client.get_collection("test")
+        self.assertEqual(info.config.params.vectors.size, 8)
+        self.assertEqual(info.config.params.vectors.distance.value, "Cosine")
+
+    async def test_existing_collection_is_not_recreated(self):
+        await provision_collection(self.client, self.config)
+
+        result = await provision_collection(self.client, self.config)
+
+        self.assertFalse(result["created"])
+
+    async def test_existing_collection_is_not_migrated_by_default(self):
+        await provision_collection(self.client, self.config)
+        changed = CollectionConfig(collection_name="test", vector_size=8, quantization="none")
+
+        with mock.patch.object(self.client, "update_collection") as update_collection:
+            result = await provision_collection(self.client, changed)
+
+        update_collection.assert_not_called()
+        self.assertEqual(result["updated"], [])
+        self.assertIn("hnsw_config", result["pending"])
+        self.assertIn("m=0", result["changes"]["hnsw_config"])
+
+    async def test_migrate_updates_existing_collection(self):
+        await provision_collection(self.client, self.config)
+        changed = CollectionConfig(collection_name="test", vector_size=8, migrate=True)
+
+        with mock.patch.object(
+            self.client, "update_collection", wraps=self.client.update_collection
+        ) as update_collection:
+            result = await provision_collection(self.client, changed)
+
+        update_collection.assert_called_once()
+        self.assertEqual(result["pending"], [])
+        self.assertEqual(result["updated"], sorted(result["changes"]))
+
+    async def test_vector_size_mismatch_raises(self):
+        await provision_collection(self.client, self.config)
+
+        with self.assertRaisesRegex(ValueError, "8-d Cosine"):
+            await provision_collection(
+                self.client, CollectionConfig(collection_name="test", vector_size=16)
+            )
+
+    async def test_distance_mismatch_raises(self):
+        await provision_collection(self.client, self.config)
+
+        with self.assertRaises(ValueError):
+            await provision_collection(
+                self.client,
+                CollectionConfig(collection_name="test", vector_size=8, distance="Dot"),
+            )
+
+    async def test_named_vectors_raise(self):
+        from qdrant_client import models
+
+        await self.client.create_collection(
+            collection_name="test",
+            vectors_config={"text": models.VectorParams(size=8, distance=models.Distance.COSINE)},
+        )
+
+        with self.assertRaisesRegex(ValueError, "named vectors"):
+            await provision_collection(self.client, self.config)
+
+    async def test_unknown_quantization_raises(self):
+        with self.assertRaises(ValueError):
+            await provision_collection(
+                self.client,
+                CollectionConfig(collection_name="test", vector_size=8, quantization="zip"),
+            )
+
+
+class EnsureCollectionTest(unittest.IsolatedAsyncioTestCase):
+    async def test_mismatch_stops_startup(self):
+        with mock.patch.object(
+            qdrant, "provision_collection", side_effect=ValueError("mismatch")
+        ), mock.patch.object(qdrant, "get_async_client"):
+            with self.assertRaises(ValueError):
+                await qdrant.ensure_collection()
+
+    async def test_pending_changes_are_logged(self):
+        result = {
+            "created": False,
+            "updated": [],
+            "pending": ["hnsw_config"],
+            "changes": {"hnsw_config": "HnswConfigDiff(m=0)"},
+        }
+        with mock.patch.object(
+            qdrant, "provision_collection", return_value=result
+        ), mock.patch.object(qdrant, "get_async_client"), mock.patch.object(
+            qdrant.logger, "warning"
+        ) as warning:
+            await qdrant.ensure_collection()
+
+        self.assertIn("HnswConfigDiff(m=0)", warning.call_args.args[0])
+        self.assertIn("QDRANT_MIGRATE_COLLECTION", warning.call_args.args[0])
+
+    async def test_unreachable_server_is_logged(self):
+        with mock.patch.object(
+            qdrant, "provision_collection", side_effect=ConnectionError("refused")
+        ), mock.patch.object(qdrant, "get_async_client"), mock.patch.object(
+            qdrant.logger, "warning"
+        ) as warning:
+            await qdrant.ensure_collection()
+
+        warning.assert_called_once()
+
+
+class CollectionNameTest(unittest.IsolatedAsyncioTestCase):
+    @mock.patch.dict("os.environ", {"QDRANT_COLLECTION": "custom"})
+    def test_name_is_read_from_the_environment(self):
+        self.assertEqual(load_collection_config().collection_name, "custom")
+
+    async def test_ingestion_writes_to_the_configured_collection(self):
+        from langchain_core.documents import Document
+
+        client = mock.Mock()
+        with mock.patch.object(collection_config, "collection_name", "custom"), mock.patch.object(
+            worker, "get_client", return_value=client
+        ):
+            await worker.upsert_points([Document(page_content="text")], [[0.1, 0.2]])
+            worker.delete_document_points("doc", "user")
+
+        self.assertEqual(client.upsert.call_args.kwargs["collection_name"], "custom")
+        self.assertEqual(client.delete.call_args.kwargs["collection_name"], "custom")
+
+
+if __name__ == "__main__":
+    unittest.main()
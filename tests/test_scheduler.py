@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import unittest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from src.chat_pdf_api_service.services.ingestion import EmbeddingScheduler
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+"""
+Embeds every text as `[len(text)]` and raises the queued errors, one per call,
+before answering normally.
+"""
+class ScriptedEmbeddings(Embeddings):
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text))]
+
+    async def aembed_documents(self, texts):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.embed_documents(texts)
+
+
+def make_batches(count: int, size: int = 2) -> list[list[Document]]:
+    return [
+        [Document(page_content=f"batch {i} chunk {j}") for j in range(size)]
+        for i in range(count)
+    ]
+
+
+class EmbeddingSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.upserted = []
+
+    async def upsert(self, documents, vectors):
+        self.upserted.append(([doc.page_content for doc in documents], vectors))
+
+    async def test_upserts_batches_in_order(self):
+        batches = make_batches(5)
+        scheduler = EmbeddingScheduler(ScriptedEmbeddings(), self.upsert, concurrency=1)
+
+        stats = await scheduler.run(iter(batches))
+
+        self.assertEqual(
+            [texts for texts, _ in self.upserted],
+            [[doc.page_content for doc in batch] for batch in batches],
+        )
+        for texts, vectors in self.upserted:
+            self.assertEqual(vectors, [[float(len(text))] for text in texts])
+        self.assertEqual(stats.batches, 5)
+        self.assertEqual(stats.chunks_embedded, 10)
+        self.assertEqual(stats.points_upserted, 10)
+
+    async def test_upserts_every_batch_once_when_concurrent(self):
+        batches = make_batches(8)
+        scheduler = EmbeddingScheduler(ScriptedEmbeddings(), self.upsert, concurrency=3)
+
+        stats = await scheduler.run(iter(batches))
+
+        self.assertCountEqual(
+            [tuple(texts) for texts, _ in self.upserted],
+            [tuple(doc.page_content for doc in batch) for batch in batches],
+        )
+        self.assertEqual(stats.points_upserted, 16)
+
+    async def test_retries_rate_limit_errors(self):
+        embeddings = ScriptedEmbeddings(
+            [RateLimited("quota"), Exception("429 RESOURCE_EXHAUSTED")]
+        )
+        scheduler = EmbeddingScheduler(
+            embeddings, self.upsert, concurrency=1, backoff_seconds=0
+        )
+
+        stats = await scheduler.run(iter(make_batches(2)))
+
+        self.assertEqual(stats.retries, 2)
+        self.assertEqual(embeddings.calls, 4)
+        self.assertEqual(stats.points_upserted, 4)
+
+    async def test_gives_up_after_max_retries(self):
+        embeddings = ScriptedEmbeddings([RateLimited("quota")] * 3)
+        scheduler = EmbeddingScheduler(
+            embeddings, self.upsert, concurrency=1, max_retries=2, backoff_seconds=0
+        )
+
+        with self.assertRaises(RateLimited):
+            await scheduler.run(iter(make_batches(1)))
+        self.assertEqual(embeddings.calls, 3)
+        self.assertEqual(self.upserted, [])
+
+    async def test_propagates_other_errors_without_retrying(self):
+        embeddings = ScriptedEmbeddings([ValueError("bad input")])
+        scheduler = EmbeddingScheduler(
+            embeddings, self.upsert, concurrency=1, backoff_seconds=0
+        )
+
+        with self.assertRaises(ValueError):
+            await scheduler.run(iter(make_batches(3)))
+        self.assertEqual(embeddings.calls, 1)
+        self.assertEqual(self.upserted, [])
+
+    async def test_propagates_upsert_errors(self):
+        async def failing_upsert(documents, vectors):
+            raise RuntimeError("qdrant down")
+
+        scheduler = EmbeddingScheduler(ScriptedEmbeddings(), failing_upsert, concurrency=2)
+
+        with self.assertRaises(RuntimeError):
+            await scheduler.run(iter(make_batches(4)))
+
+    async def test_cancel_while_parsing_closes_the_batches(self):
+        parsing = threading.Event()
+        release = threading.Event()
+        closed = []
+
+        def slow_batches():
+            try:
+                parsing.set()
+                release.wait(5)
+                yield from make_batches(1)
+            finally:
+                closed.append(True)
+
+        scheduler = EmbeddingScheduler(ScriptedEmbeddings(), self.upsert)
+        running = asyncio.create_task(scheduler.run(slow_batches()))
+        await asyncio.to_thread(parsing.wait, 5)
+
+        running.cancel()
+        await asyncio.sleep(0.05)
+        release.set()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await running
+        self.assertEqual(closed, [True])
+        self.assertEqual(self.upserted, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest import mock
+from benchmarks.fakes import init_mock_database
+from src.chat_pdf_api_service.dependencies.jwt_verification import load_authenticated_user
+from src.chat_pdf_api_service.modules import User
+from src.chat_pdf_api_service.services.users import UserCache, cache
+
+
+"""
+A backend whose every call fails, to check that cache errors never reach the
+caller.
+"""
+class BrokenBackend:
+    async def get(self, user_id):
+        raise ConnectionError("down")
+
+    async def set(self, user_id, projection):
+        raise ConnectionError("down")
+
+    async def delete(self, user_id):
+        raise ConnectionError("down")
+
+
+class UserCacheTest(unittest.IsolatedAsyncioTestCase):
+    def user_cache(self, max_entries: int = 10, ttl_seconds: float = 60) -> UserCache:
+        return UserCache(cache.LocalUserCacheBackend(max_entries, ttl_seconds))
+
+    async def test_set_get_and_invalidate(self):
+        users = self.user_cache()
+        await users.set("a", {"email": "a@example.com"})
+
+        self.assertEqual(await users.get("a"), {"email": "a@example.com"})
+        await users.invalidate("a")
+        self.assertIsNone(await users.get("a"))
+        self.assertEqual(users.stats()["hits"], 1)
+        self.assertEqual(users.stats()["misses"], 1)
+
+    async def test_entries_expire(self):
+        users = self.user_cache(ttl_seconds=60)
+        with mock.patch.object(cache.time, "monotonic", return_value=1000.0):
+            await users.set("a", {"email": "a@example.com"})
+        with mock.patch.object(cache.time, "monotonic", return_value=1061.0):
+            self.assertIsNone(await users.get("a"))
+        self.assertEqual(users.stats()["entries"], 0)
+
+    async def test_least_recently_used_entry_is_evicted(self):
+        users = self.user_cache(max_entries=2)
+        await users.set("a", {})
+        await users.set("b", {})
+        await users.get("a")
+
+        await users.set("c", {})
+
+        self.assertIsNone(await users.get("b"))
+        self.assertIsNotNone(await users.get("a"))
+        self.assertEqual(users.stats()["entries"], 2)
+
+    async def test_backend_errors_are_misses(self):
+        users = UserCache(BrokenBackend())
+
+        await users.set("a", {})
+        self.assertIsNone(await users.get("a"))
+        await users.invalidate("a")
+
+        self.assertEqual(users.stats()["errors"], 3)
+        self.assertIsNone(users.stats()["entries"])
+
+
+class UserCacheInvalidationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await init_mock_database()
+        self.users = UserCache(cache.LocalUserCacheBackend(10, 60))
+        patch = mock.patch.object(cache, "_user_cache", self.users)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.user = User(fullname="Ada", email="ada@example.com", password="hash")
+        await self.user.insert()
+        self.user_id = str(self.user.id)
+
+    async def test_authenticated_user_is_loaded_once(self):
+        with mock.patch.object(User, "get", wraps=User.get) as get:
+            first = await load_authenticated_user(self.user_id)
+            second = await load_authenticated_user(self.user_id)
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first.email, "ada@example.com")
+
+    async def test_saving_the_user_invalidates_the_cached_projection(self):
+        await load_authenticated_user(self.user_id)
+
+        self.user.verified = True
+        await self.user.save()
+
+        self.assertIsNone(await self.users.backend.get(self.user_id))
+        self.assertTrue((await load_authenticated_user(self.user_id)).verified)
+
+    async def test_deleting_the_user_invalidates_the_cached_projection(self):
+        await load_authenticated_user(self.user_id)
+
+        await self.user.delete()
+
+        self.assertIsNone(await load_authenticated_user(self.user_id))
+
+    async def test_unknown_users_are_not_cached(self):
+        missing = "65a1b2c3d4e5f60718293a4b"
+
+        self.assertIsNone(await load_authenticated_user(missing))
+        self.assertIsNone(await self.users.backend.get(missing))
+
+
+if __name__ == "__main__":
+    unittest.main()